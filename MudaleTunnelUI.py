@@ -10,7 +10,7 @@ from rich import print
 from rich.progress import Progress, SpinnerColumn, TextColumn, track
 from rich.table import Table
 from tunnel_manager import TunnelManager
-from nmap_parser import parse_nmap_services
+from nmap_parser import parse_nmap_services, services_to_forwards
 
 
 class MudaleTunnelUI:
@@ -111,16 +111,47 @@ class MudaleTunnelUI:
         result = subprocess.run(["nmap", "-p-", "-sV", target], stdout=subprocess.PIPE, text=True)
         output = result.stdout
         self.display_open_services(output)
-        self.interactive_shell(output)
+        self.interactive_shell(output, target)
 
     def display_open_services(self, nmap_output: str):
+        services = parse_nmap_services(nmap_output)
+        multi_host = len({svc.get("host") for svc in services}) > 1
+
         table = Table(title="Open Ports and Services")
+        if multi_host:
+            table.add_column("Host", style="white")
         table.add_column("Port", style="cyan")
         table.add_column("State", style="green")
         table.add_column("Service", style="magenta")
 
-        for svc in parse_nmap_services(nmap_output):
-            table.add_row(svc["port"], svc["state"], svc["service"])
+        for svc in services:
+            row = [svc["port"], svc["state"], svc["service"]]
+            table.add_row(*([svc.get("host", "")] + row if multi_host else row))
+        print(table)
+
+    def display_benchmark_results(self, results: list):
+        table = Table(title="Tunnel Benchmark")
+        table.add_column("Path", style="white")
+        table.add_column("Mode", style="cyan")
+        table.add_column("Throughput", style="green")
+        table.add_column("Setup p50/p90", style="magenta")
+        table.add_column("RTT p50/p90/p99", style="magenta")
+
+        for result in results:
+            throughput, setup, latency = result["throughput"], result["setup"], result["latency"]
+            path = result.get("path") or f"127.0.0.1:{result['port']}" + (f" -> {result['destination']}" if result["destination"] else "")
+            if result.get("transport"):
+                path += f" ({result['transport']})"
+            rate = f"{throughput['mbit_per_s']} Mbit/s"
+            if not throughput["confirmed"]:
+                rate += " (unconfirmed)"
+            table.add_row(
+                path,
+                f"{result['mode']} x{throughput['streams']}",
+                rate,
+                f"{setup['p50_ms']} / {setup['p90_ms']} ms" if setup else "-",
+                f"{latency['p50_ms']} / {latency['p90_ms']} / {latency['p99_ms']} ms" if latency else "-",
+            )
         print(table)
 
     def choose_tunnel_mode(self):
@@ -135,6 +166,8 @@ class MudaleTunnelUI:
         print("[cyan]4.[/cyan] Remote dynamic tunneling (Reverse SOCKS - ssh -R port)")
         print("   └─ Use when: You can SSH out and need flexible reverse access (OpenSSH 7.6+)")
         print("[cyan]5.[/cyan] Manage existing tunnels")
+        print("[cyan]6.[/cyan] Static tunnels for ALL discovered services")
+        print("   └─ Use when: You want every open port forwarded at once (shared SSH connection)")
         print("[cyan]0.[/cyan] Exit")
         
         while True:
@@ -153,17 +186,37 @@ class MudaleTunnelUI:
                 elif choice == 5:
                     self.manage_tunnels_menu()
                     return self.choose_tunnel_mode()
+                elif choice == 6:
+                    return "static_all"
                 else:
-                    print("[red]Invalid selection. Please choose 0-5.[/red]")
+                    print("[red]Invalid selection. Please choose 0-6.[/red]")
             except ValueError:
                 print("[red]Invalid input. Please enter a number.[/red]")
     
-    def create_static_tunnel(self, ssh_user: str, ssh_host: str, target_host: str, remote_port: int, local_port: int = None, execute: bool = True):
+    def _print_jump_selection(self, tunnel_id: str):
+        """Show the jump host candidates probed for a tunnel and the one it uses."""
+        tunnel = self.tunnel_manager.get_tunnel(tunnel_id) if tunnel_id else None
+        selection = (tunnel or {}).get("jump_selection")
+        if not selection:
+            return  # No via candidates, or not executed (the command names the host)
+        table = Table(title="Jump Host Candidates")
+        table.add_column("Host", style="cyan")
+        table.add_column("Handshake", style="green")
+        table.add_column("Status", style="bold")
+        for result in selection["candidates"]:
+            rtt = f"{result['rtt_ms']} ms" if result.get("rtt_ms") is not None else "-"
+            status = "[green]ok[/green]" if result["ok"] else f"[red]{result.get('error') or 'pending'}[/red]"
+            table.add_row(result["host"], rtt, status)
+        print(table)
+        print(f"[cyan]Using fastest jump host: {selection['selected']}[/cyan]")
+
+    def create_static_tunnel(self, ssh_user: str, ssh_host: str, target_host: str, remote_port: int, local_port: int = None, execute: bool = True, via: list = None, transport: str = None):
         """Create a static tunnel using TunnelManager."""
         try:
             tunnel_id, ssh_command = self.tunnel_manager.create_static_tunnel(
-                ssh_user, ssh_host, target_host, remote_port, local_port, execute
+                ssh_user, ssh_host, target_host, remote_port, local_port, execute, via, transport
             )
+            self._print_jump_selection(tunnel_id)
             if execute:
                 print(f"[green]✓ Static tunnel created successfully![/green]")
                 print(f"[cyan]Tunnel ID: {tunnel_id}[/cyan]")
@@ -179,12 +232,13 @@ class MudaleTunnelUI:
             print(f"[red]Failed to create tunnel: {e}[/red]")
             return None, None
     
-    def create_dynamic_tunnel(self, ssh_user: str, ssh_host: str, local_port: int = None, execute: bool = True):
+    def create_dynamic_tunnel(self, ssh_user: str, ssh_host: str, local_port: int = None, execute: bool = True, via: list = None, transport: str = None):
         """Create a dynamic tunnel using TunnelManager."""
         try:
             tunnel_id, ssh_command = self.tunnel_manager.create_dynamic_tunnel(
-                ssh_user, ssh_host, local_port, execute
+                ssh_user, ssh_host, local_port, execute, via, transport
             )
+            self._print_jump_selection(tunnel_id)
             if execute:
                 print(f"[green]✓ Dynamic tunnel (SOCKS proxy) created successfully![/green]")
                 print(f"[cyan]Tunnel ID: {tunnel_id}[/cyan]")
@@ -207,12 +261,75 @@ class MudaleTunnelUI:
             print(f"[red]Failed to create tunnel: {e}[/red]")
             return None, None
 
-    def create_remote_tunnel(self, ssh_user: str, ssh_host: str, remote_bind_port: int, target_host: str, target_port: int, bind_address: str = "127.0.0.1", execute: bool = True):
+    def create_chain_tunnel(self, hops: list, forward_type: str = "dynamic", local_port: int = None, target_host: str = None, target_port: int = None, ssh_user: str = None, execute: bool = True, transport: str = None):
+        """Create a multi-hop chain tunnel (ProxyJump) using TunnelManager."""
+        try:
+            tunnel_id, ssh_command = self.tunnel_manager.create_chain_tunnel(
+                hops, forward_type, local_port, target_host, target_port, ssh_user, execute, transport
+            )
+            if execute:
+                tunnel = self.tunnel_manager.get_tunnel(tunnel_id)
+                print(f"[green]✓ Chain tunnel created successfully![/green]")
+                print(f"[cyan]Tunnel ID: {tunnel_id}[/cyan]")
+                print(f"[cyan]Chain: {tunnel['chain']}[/cyan]")
+                if forward_type == "dynamic":
+                    print(f"[cyan]SOCKS proxy listening on port: {tunnel['local_port']}[/cyan]")
+                    print(f"  Add to /etc/proxychains4.conf: socks5 127.0.0.1 {tunnel['local_port']}")
+                else:
+                    print(f"[cyan]Local port {tunnel['local_port']} -> {target_host}:{target_port}[/cyan]")
+            else:
+                print(f"[yellow]SSH Command (not executed):[/yellow]")
+                print(f"[cyan]{ssh_command}[/cyan]")
+            return tunnel_id, ssh_command
+        except ValueError as e:
+            print(f"[red]Error: {e}[/red]")
+            return None, None
+        except Exception as e:
+            print(f"[red]Failed to create tunnel: {e}[/red]")
+            return None, None
+
+    def create_bulk_static_tunnels(self, ssh_user: str, ssh_host: str, forwards: list, local_port_start: int = None, execute: bool = True, via: list = None, transport: str = None):
+        """Forward many services at once and print the local port mapping."""
+        try:
+            result = self.tunnel_manager.create_bulk_static_tunnels(
+                ssh_user, ssh_host, forwards, local_port_start, execute, via, transport
+            )
+        except ValueError as e:
+            print(f"[red]Error: {e}[/red]")
+            return None
+        except Exception as e:
+            print(f"[red]Failed to create tunnels: {e}[/red]")
+            return None
+
+        table = Table(title=f"Service Mapping via {result['ssh_host']}")
+        table.add_column("Local", style="cyan")
+        table.add_column("Remote", style="green")
+        table.add_column("Service", style="magenta")
+        for entry in result["mapping"]:
+            table.add_row(
+                f"127.0.0.1:{entry['local_port']}",
+                f"{entry['remote_host']}:{entry['remote_port']}",
+                entry.get("service") or "",
+            )
+        print(table)
+
+        if execute:
+            print(f"[green]✓ {len(result['mapping'])} forward(s) over {len(result['tunnels'])} SSH connection(s)[/green]")
+        else:
+            print(f"[yellow]SSH Command(s) (not executed):[/yellow]")
+            for tunnel in result["tunnels"]:
+                print(f"[cyan]{tunnel['command']}[/cyan]")
+        for error in result["errors"]:
+            print(f"[red]{error['forwards']} forward(s) failed: {error['error']}[/red]")
+        return result
+
+    def create_remote_tunnel(self, ssh_user: str, ssh_host: str, remote_bind_port: int, target_host: str, target_port: int, bind_address: str = "127.0.0.1", execute: bool = True, via: list = None, transport: str = None):
         """Create a remote tunnel using TunnelManager."""
         try:
             tunnel_id, ssh_command = self.tunnel_manager.create_remote_tunnel(
-                ssh_user, ssh_host, remote_bind_port, target_host, target_port, bind_address, execute
+                ssh_user, ssh_host, remote_bind_port, target_host, target_port, bind_address, execute, via, transport
             )
+            self._print_jump_selection(tunnel_id)
             if execute:
                 print(f"[green]✓ Remote tunnel created successfully![/green]")
                 print(f"[cyan]Tunnel ID: {tunnel_id}[/cyan]")
@@ -230,12 +347,13 @@ class MudaleTunnelUI:
             print(f"[red]Failed to create tunnel: {e}[/red]")
             return None, None
 
-    def create_remote_dynamic_tunnel(self, ssh_user: str, ssh_host: str, remote_socks_port: int, bind_address: str = "127.0.0.1", execute: bool = True):
+    def create_remote_dynamic_tunnel(self, ssh_user: str, ssh_host: str, remote_socks_port: int, bind_address: str = "127.0.0.1", execute: bool = True, via: list = None, transport: str = None):
         """Create a remote dynamic tunnel using TunnelManager."""
         try:
             tunnel_id, ssh_command = self.tunnel_manager.create_remote_dynamic_tunnel(
-                ssh_user, ssh_host, remote_socks_port, bind_address, execute
+                ssh_user, ssh_host, remote_socks_port, bind_address, execute, via, transport
             )
+            self._print_jump_selection(tunnel_id)
             if execute:
                 print(f"[green]✓ Remote dynamic tunnel (SOCKS proxy) created successfully![/green]")
                 print(f"[cyan]Tunnel ID: {tunnel_id}[/cyan]")
@@ -357,6 +475,10 @@ class MudaleTunnelUI:
                         print(f"  Healthy: {health.get('healthy', False)}")
                         print(f"  Process Running: {health.get('process_running', False)}")
                         print(f"  Port Listening: {health.get('port_listening', False)}")
+                        remote_bind = health.get("remote_bind")
+                        if remote_bind:
+                            verified = {True: "yes", False: "no", None: "unknown"}[remote_bind.get("verified")]
+                            print(f"  Remote Bind Verified: {verified} ({remote_bind.get('source') or 'n/a'})")
                         if health.get('reason'):
                             print(f"  Reason: {health.get('reason')}")
                 else:
@@ -364,7 +486,7 @@ class MudaleTunnelUI:
             except ValueError:
                 print("[red]Invalid input. Please enter a number.[/red]")
     
-    def interactive_shell(self, nmap_output: str):
+    def interactive_shell(self, nmap_output: str, target: str = None):
         """Enhanced interactive shell with static/dynamic tunneling support."""
         parsed = parse_nmap_services(nmap_output)
         services = [(svc["port"], svc["service"]) for svc in parsed]
@@ -421,6 +543,11 @@ class MudaleTunnelUI:
                 
                 self.create_dynamic_tunnel(ssh_user, ssh_host, local_port, execute)
 
+            elif mode == "static_all":
+                execute_choice = input("Execute tunnels automatically? (yes/no, default: no): ").strip().lower()
+                forwards = services_to_forwards(parsed, target or self.myip)
+                self.create_bulk_static_tunnels(ssh_user, ssh_host, forwards, execute=execute_choice == "yes")
+
     def run_with_args(self, target, username=None, ssh_host=None, port=None, local_port=None):
         """Run with command line arguments instead of interactive mode."""
         os_type = self.check_os()
@@ -0,0 +1,174 @@
+"""
+AdmissionController - Caps on ssh processes and concurrent handshakes.
+
+Two limits apply to every executed tunnel:
+
+- a global cap (MAX_CONCURRENT_TUNNELS): a slot is held from admission until
+  the tunnel is stopped or its ssh process is found dead
+- per jump host, a cap on in-flight handshakes (spawn until the readiness
+  wait ends), so bursts don't trip sshd's MaxStartups on the pivot
+
+Callers over either limit wait in FIFO order instead of failing; only a full
+queue or a wait longer than ADMISSION_QUEUE_TIMEOUT raises AdmissionRejected.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional
+
+import config
+
+
+class AdmissionRejected(RuntimeError):
+    """The tunnel was not admitted: queue full or waited too long."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("kind", "host", "since", "stage")
+
+    def __init__(self, kind: str, host: Optional[str], stage: str):
+        self.kind = kind
+        self.host = host
+        self.since = time.monotonic()
+        self.stage = stage
+
+
+class AdmissionController:
+    """Global tunnel slots plus per-host handshake limits, with FIFO wait queues."""
+
+    def __init__(
+        self,
+        max_tunnels: Optional[int] = None,
+        handshakes_per_host: Optional[int] = None,
+        queue_max: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        self.max_tunnels = config.MAX_CONCURRENT_TUNNELS if max_tunnels is None else max_tunnels
+        self.handshakes_per_host = config.ADMISSION_HANDSHAKES_PER_HOST if handshakes_per_host is None else handshakes_per_host
+        self.queue_max = config.ADMISSION_QUEUE_MAX if queue_max is None else queue_max
+        self.queue_timeout = config.ADMISSION_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        # Never held while taking TunnelManager.lock (the reverse order is fine)
+        self._cond = threading.Condition(threading.Lock())
+        self._active = 0
+        self._queue: Deque[_Waiter] = deque()
+        self._handshakes: Dict[str, int] = {}
+        self._host_queues: Dict[str, Deque[_Waiter]] = {}
+        self.stats = {"admitted": 0, "queued": 0, "rejected_full": 0, "timed_out": 0, "max_wait_ms": 0.0}
+
+    def _wait_turn(self, queue: Deque[_Waiter], waiter: _Waiter, ready, deadline: float, what: str):
+        """Wait (holding _cond) until waiter heads queue and ready() is true."""
+        queue.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            while not (queue[0] is waiter and ready()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats["timed_out"] += 1
+                    raise AdmissionRejected(
+                        f"Timed out after {self.queue_timeout:g}s waiting for {what}",
+                        retry_after=self.queue_timeout,
+                    )
+                self._cond.wait(remaining)
+            waited_ms = (time.monotonic() - waiter.since) * 1000
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], round(waited_ms, 1))
+        finally:
+            queue.remove(waiter)
+            self._cond.notify_all()  # Next in line may now be at the head
+
+    def _queued(self) -> int:
+        return len(self._queue) + sum(len(q) for q in self._host_queues.values())
+
+    def acquire(self, kind: str, host: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """Take a tunnel slot, waiting in line if all are in use.
+
+        Returns the deadline (time.monotonic) to pass on to handshake().
+        Raises AdmissionRejected if the queue is full or the wait times out.
+        """
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        with self._cond:
+            if self._active < self.max_tunnels and not self._queue:
+                self._active += 1
+                self.stats["admitted"] += 1
+                return deadline
+            if self._queued() >= self.queue_max:
+                self.stats["rejected_full"] += 1
+                raise AdmissionRejected(
+                    f"Tunnel limit reached ({self.max_tunnels} active) and {self.queue_max} requests are already waiting",
+                    retry_after=self.queue_timeout,
+                )
+            self._wait_turn(
+                self._queue, _Waiter(kind, host, "slot"),
+                lambda: self._active < self.max_tunnels, deadline,
+                f"a tunnel slot ({self.max_tunnels} active)",
+            )
+            self._active += 1
+            self.stats["admitted"] += 1
+            return deadline
+
+    def release(self):
+        """Give back a slot (tunnel stopped, died, or failed to start)."""
+        with self._cond:
+            self._active = max(0, self._active - 1)
+            self._cond.notify_all()
+
+    def reclaim(self):
+        """Count a tunnel that came back to life; may exceed the cap briefly."""
+        with self._cond:
+            self._active += 1
+
+    @contextmanager
+    def handshake(self, host: Optional[str], deadline: float, kind: str = "tunnel"):
+        """Hold one of host's handshake slots for the duration of the block."""
+        if not host or self.handshakes_per_host <= 0:
+            yield
+            return
+        with self._cond:
+            if self._handshakes.get(host, 0) >= self.handshakes_per_host or self._host_queues.get(host):
+                queue = self._host_queues.setdefault(host, deque())
+                try:
+                    self._wait_turn(
+                        queue, _Waiter(kind, host, "handshake"),
+                        lambda: self._handshakes.get(host, 0) < self.handshakes_per_host, deadline,
+                        f"a handshake slot on {host} ({self.handshakes_per_host} in flight)",
+                    )
+                finally:
+                    if not queue:
+                        self._host_queues.pop(host, None)
+            self._handshakes[host] = self._handshakes.get(host, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._handshakes[host] -= 1
+                if not self._handshakes[host]:
+                    del self._handshakes[host]
+                self._cond.notify_all()
+
+    def snapshot(self) -> Dict:
+        now = time.monotonic()
+        with self._cond:
+            waiting: List[_Waiter] = list(self._queue) + [w for q in self._host_queues.values() for w in q]
+            return {
+                "max_tunnels": self.max_tunnels,
+                "active": self._active,
+                "available": max(0, self.max_tunnels - self._active),
+                "queue": {
+                    "length": len(waiting),
+                    "max": self.queue_max,
+                    "timeout_s": self.queue_timeout,
+                    "waiting": [
+                        {"kind": w.kind, "host": w.host, "stage": w.stage, "waited_s": round(now - w.since, 2)}
+                        for w in sorted(waiting, key=lambda w: w.since)
+                    ],
+                },
+                "handshakes": {
+                    "per_host_limit": self.handshakes_per_host,
+                    "in_flight": dict(self._handshakes),
+                },
+                "stats": dict(self.stats),
+            }
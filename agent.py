@@ -0,0 +1,156 @@
+"""
+Lightweight MudaleTunnel agent.
+
+Exposes the tunnel API of the machine it runs on so a coordinator
+(python main.py web --agent name=url) can manage tunnels on several
+operator boxes from one dashboard. No dashboard, no scanning.
+"""
+import asyncio
+import hmac
+import platform
+from typing import Dict, List, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Request
+from pydantic import BaseModel
+
+from admission import AdmissionRejected
+from remote_verify import REMOTE_TUNNEL_TYPES
+from tunnel_manager import TunnelManager
+from api_models import (
+    StaticTunnelRequest, DynamicTunnelRequest,
+    RemoteTunnelRequest, RemoteDynamicTunnelRequest, ChainTunnelRequest,
+)
+from api_responses import CompressionMiddleware, FastJSONResponse
+from node_pool import AGENT_TOKEN_HEADER
+import config
+
+
+# URL tunnel kind -> (request model, TunnelManager method name)
+_TUNNEL_KINDS = {
+    "static": (StaticTunnelRequest, "create_static_tunnel"),
+    "dynamic": (DynamicTunnelRequest, "create_dynamic_tunnel"),
+    "remote": (RemoteTunnelRequest, "create_remote_tunnel"),
+    "remote-dynamic": (RemoteDynamicTunnelRequest, "create_remote_dynamic_tunnel"),
+    "chain": (ChainTunnelRequest, "create_chain_tunnel"),
+}
+
+
+def create_agent_app(
+    tunnel_manager: TunnelManager,
+    node_name: Optional[str] = None,
+    token: Optional[str] = None,
+) -> FastAPI:
+    """Build the agent ASGI app around a TunnelManager."""
+    node_name = node_name or platform.node() or "agent"
+    token = config.AGENT_TOKEN if token is None else token
+
+    def require_token(request: Request):
+        if token and not hmac.compare_digest(request.headers.get(AGENT_TOKEN_HEADER, ""), token):
+            raise HTTPException(status_code=401, detail="Invalid agent token")
+
+    app = FastAPI(
+        title="MudaleTunnel Agent",
+        default_response_class=FastJSONResponse,
+        dependencies=[Depends(require_token)],
+    )
+    if config.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+
+    @app.get("/agent/state")
+    async def agent_state():
+        """All tunnels with health and metrics, in one round trip for the coordinator."""
+        if config.REMOTE_VERIFY_ENABLED:
+            # One listener check per server up front; the health checks below reuse it
+            await asyncio.to_thread(tunnel_manager.verify_remote_tunnels)
+
+        def tunnel_states() -> List[Dict]:
+            # Port checks, and remote bind checks once their cache expires, block
+            tunnels = tunnel_manager.list_tunnels()
+            for tunnel in tunnels:
+                if tunnel.get("status") == "active":
+                    tunnel["health"] = tunnel_manager.check_tunnel_health(tunnel["id"])
+                tunnel["metrics"] = tunnel_manager.get_tunnel_metrics(tunnel["id"])
+            return tunnels
+
+        tunnels = await asyncio.to_thread(tunnel_states)
+        return {
+            "node": node_name,
+            "revision": tunnel_manager.revision,
+            "tunnels": tunnels,
+            "admission": tunnel_manager.admission.snapshot(),
+        }
+
+    @app.get("/api/tunnels")
+    async def list_tunnels():
+        return {"tunnels": tunnel_manager.list_tunnels()}
+
+    @app.get("/api/admission")
+    async def get_admission_state():
+        return tunnel_manager.admission.snapshot()
+
+    @app.post("/api/tunnels/{kind}")
+    async def create_tunnel(kind: str, body: Dict):
+        if kind not in _TUNNEL_KINDS:
+            raise HTTPException(status_code=404, detail=f"Unknown tunnel type: {kind}")
+        model, method_name = _TUNNEL_KINDS[kind]
+        try:
+            tunnel_request: BaseModel = model(**body)
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+        try:
+            # In a thread: the request may wait in the admission queue
+            tunnel_id, ssh_command = await asyncio.to_thread(
+                getattr(tunnel_manager, method_name), **tunnel_request.model_dump()
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except AdmissionRejected as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to create tunnel: {str(e)}")
+        return {
+            "success": True,
+            "tunnel_id": tunnel_id,
+            "command": ssh_command,
+            "tunnel": tunnel_manager.get_tunnel(tunnel_id),
+        }
+
+    @app.get("/api/tunnels/{tunnel_id}")
+    async def get_tunnel(tunnel_id: str):
+        tunnel = tunnel_manager.get_tunnel(tunnel_id)
+        if not tunnel:
+            raise HTTPException(status_code=404, detail="Tunnel not found")
+        return tunnel
+
+    @app.delete("/api/tunnels/{tunnel_id}")
+    async def stop_tunnel(tunnel_id: str):
+        if not tunnel_manager.stop_tunnel(tunnel_id):
+            raise HTTPException(status_code=404, detail="Tunnel not found")
+        return {"success": True, "message": "Tunnel stopped"}
+
+    @app.delete("/api/tunnels")
+    async def stop_all_tunnels():
+        return {"success": True, "count": tunnel_manager.stop_all_tunnels()}
+
+    @app.get("/api/tunnels/{tunnel_id}/logs")
+    async def get_tunnel_logs(tunnel_id: str, limit: Optional[int] = None):
+        return {"tunnel_id": tunnel_id, "logs": tunnel_manager.get_tunnel_logs(tunnel_id, limit)}
+
+    @app.get("/api/tunnels/{tunnel_id}/metrics")
+    async def get_tunnel_metrics(tunnel_id: str):
+        metrics = tunnel_manager.get_tunnel_metrics(tunnel_id)
+        if not metrics:
+            raise HTTPException(status_code=404, detail="Tunnel not found")
+        return metrics
+
+    @app.get("/api/tunnels/{tunnel_id}/health")
+    async def check_tunnel_health(tunnel_id: str):
+        tunnel = tunnel_manager.get_tunnel(tunnel_id)
+        if tunnel and tunnel.get("type") == "chain":
+            return await asyncio.to_thread(tunnel_manager.check_chain_health, tunnel_id)
+        if tunnel and tunnel.get("type") in REMOTE_TUNNEL_TYPES:
+            return await asyncio.to_thread(tunnel_manager.check_tunnel_health, tunnel_id)
+        return tunnel_manager.check_tunnel_health(tunnel_id)
+
+    return app
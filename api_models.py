@@ -0,0 +1,134 @@
+"""
+Request models shared by the web interface (web_app) and the node agent (agent).
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ScanRequest(BaseModel):
+    target: str
+    scan_type: str = "full"  # quick, full, service, stealth, udp, socks_quick, socks_service, socks_full, connect, connect_full
+    tunnel_ids: Optional[List[str]] = None  # socks_* scans: dynamic tunnels to use (default: all active); connect scans: scan through these
+    ports: Optional[str] = None  # socks_*/connect scans: port spec overriding the profile, e.g. "22,80,8000-8100"
+    exclude: Optional[str] = None  # targets to leave out (IPs, CIDRs, ranges, hostnames)
+    dedupe: bool = True  # skip targets already covered by a queued/running scan of the same type and ports
+
+
+class StaticTunnelRequest(BaseModel):
+    ssh_user: str
+    ssh_host: Optional[str] = None
+    target_host: str
+    remote_port: int
+    local_port: Optional[int] = None
+    execute: bool = True
+    via: Optional[List[str]] = None  # candidate jump hosts; the fastest reachable one is used
+    transport: Optional[str] = None  # ssh transport profile (throughput, lossy-link, fail-fast)
+
+
+class DynamicTunnelRequest(BaseModel):
+    ssh_user: str
+    ssh_host: Optional[str] = None
+    local_port: Optional[int] = None
+    execute: bool = True
+    via: Optional[List[str]] = None  # candidate jump hosts; the fastest reachable one is used
+    transport: Optional[str] = None  # ssh transport profile (throughput, lossy-link, fail-fast)
+
+
+class RemoteTunnelRequest(BaseModel):
+    ssh_user: str
+    ssh_host: Optional[str] = None
+    remote_bind_port: int
+    target_host: str
+    target_port: int
+    bind_address: str = "127.0.0.1"
+    execute: bool = True
+    via: Optional[List[str]] = None  # candidate jump hosts; the fastest reachable one is used
+    transport: Optional[str] = None  # ssh transport profile (throughput, lossy-link, fail-fast)
+
+
+class RemoteDynamicTunnelRequest(BaseModel):
+    ssh_user: str
+    ssh_host: Optional[str] = None
+    remote_socks_port: int
+    bind_address: str = "127.0.0.1"
+    execute: bool = True
+    via: Optional[List[str]] = None  # candidate jump hosts; the fastest reachable one is used
+    transport: Optional[str] = None  # ssh transport profile (throughput, lossy-link, fail-fast)
+
+
+class ChainTunnelRequest(BaseModel):
+    hops: List[str]  # ordered [user@]host[:port]; the last hop carries the forward
+    forward_type: str = "dynamic"  # dynamic, static
+    local_port: Optional[int] = None
+    target_host: Optional[str] = None  # static chains only
+    target_port: Optional[int] = None
+    ssh_user: Optional[str] = None  # default user for hops without one
+    execute: bool = True
+    transport: Optional[str] = None  # ssh transport profile (throughput, lossy-link, fail-fast)
+
+
+class BulkTunnelRequest(BaseModel):
+    ssh_user: str
+    ssh_host: Optional[str] = None
+    via: Optional[List[str]] = None  # candidate jump hosts; the fastest reachable one is used
+    ports: Optional[List[int]] = None  # only tunnel these remote ports (default: all open TCP)
+    local_port_start: Optional[int] = None  # place forwards sequentially from here instead of reusing service ports
+    execute: bool = True
+    transport: Optional[str] = None  # ssh transport profile (throughput, lossy-link, fail-fast)
+
+
+class JumpHostProbeRequest(BaseModel):
+    candidates: List[str]
+
+
+class BenchmarkRequest(BaseModel):
+    mode: str = "echo"  # echo (destination echoes), sink (destination discards and closes on EOF)
+    target_host: Optional[str] = None  # destination for dynamic tunnels (SOCKS CONNECT)
+    target_port: Optional[int] = None
+    megabytes: float = 16
+    streams: int = 1  # parallel connections for the transfer
+    connections: int = 10  # connection setup samples
+    pings: int = 50  # echo round trips for the latency distribution
+
+
+class OfflineBenchmarkRequest(BaseModel):
+    ssh_user: Optional[str] = None  # ssh -L to ssh_host (this machine); omit for a direct baseline
+    ssh_host: str = "localhost"
+    transport: Optional[str] = None  # ssh transport profile to measure
+    mode: str = "echo"
+    megabytes: float = 16
+    streams: int = 1
+    connections: int = 10
+    pings: int = 50
+
+
+class SocksPoolRequest(BaseModel):
+    ssh_user: str
+    ssh_hosts: List[str]  # members are spread round-robin across these hosts
+    size: int = 2
+    listen_port: Optional[int] = None
+    strategy: str = "least_conn"  # least_conn, latency
+    min_size: Optional[int] = None  # autoscale between min_size and max_size
+    max_size: Optional[int] = None
+
+
+class SocksPoolScaleRequest(BaseModel):
+    size: int
+
+
+class ProxychainsConfig(BaseModel):
+    proxy_type: str = "socks5"  # socks4, socks5, http
+    proxy_host: Optional[str] = None  # manual entry; live dynamic tunnels are used when omitted
+    proxy_port: Optional[int] = None
+    chain_type: str = "auto"  # auto, strict_chain, dynamic_chain, random_chain, round_robin_chain
+    max_proxies: Optional[int] = None  # ranked tunnel proxies to list (default: PROXYCHAINS_MAX_PROXIES)
+    include_unhealthy: bool = False
+    write: bool = False  # also write PROXYCHAINS_OUTPUT_PATH atomically
+
+
+class ProxychainsSyncRequest(BaseModel):
+    enabled: bool
+    chain_type: str = "auto"
+    max_proxies: Optional[int] = None
+    include_unhealthy: bool = False
@@ -0,0 +1,209 @@
+"""
+Fast JSON serialization and response compression for the web interface.
+
+orjson and brotli are optional: without them serialization falls back to the
+standard library and compression to gzip only.
+"""
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+from fastapi.responses import JSONResponse
+
+import config
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+FAST_JSON_ACTIVE = config.FAST_JSON and orjson is not None
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+# ── Serialization ───────────────────────────────────────────
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to compact UTF-8 JSON bytes."""
+    if FAST_JSON_ACTIVE:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when enabled.
+
+    Returning an instance directly from a route also skips FastAPI's
+    jsonable_encoder pass, which dominates the cost of large payloads.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+async def send_json(websocket: WebSocket, message: Dict):
+    """Send a JSON message over a WebSocket using the fast serializer."""
+    await websocket.send_text(dumps(message).decode("utf-8"))
+
+
+# ── Compression ─────────────────────────────────────────────
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.lower().startswith(_COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported content-coding from an Accept-Encoding header."""
+    accepted = set()
+    for token in accept_encoding.lower().split(","):
+        name, _, params = token.strip().partition(";")
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+
+    if brotli is not None and config.COMPRESSION_BROTLI and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental gzip/brotli compressor with a common interface."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=config.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so streaming clients see it immediately."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the final chunk and close the stream."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses above a size threshold.
+
+    Negotiates brotli (if installed) or gzip per request. Whole responses
+    below COMPRESSION_MIN_SIZE, already-encoded responses and non-text
+    content types pass through untouched; streaming responses are
+    compressed chunk by chunk.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = config.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingResponder:
+    """Wraps an ASGI send callable, compressing the response body."""
+
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Dict] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _is_compressible(self) -> bool:
+        headers = dict(self.start_message.get("headers", []))
+        if b"content-encoding" in headers:
+            return False
+        return is_compressible(headers.get(b"content-type", b"").decode("latin-1"))
+
+    def _encoded_headers(self, content_length: Optional[int]):
+        headers = [
+            (name, value) for name, value in self.start_message.get("headers", [])
+            if name not in (b"content-length", b"vary")
+        ]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+    async def __call__(self, message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not self._is_compressible() or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding)
+            if not more_body:
+                compressed = self.compressor.finish(body)
+                await self.send({**self.start_message, "headers": self._encoded_headers(len(compressed))})
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            await self.send({**self.start_message, "headers": self._encoded_headers(None)})
+
+        if more_body:
+            await self.send({"type": "http.response.body", "body": self.compressor.chunk(body), "more_body": True})
+        else:
+            await self.send({"type": "http.response.body", "body": self.compressor.finish(body)})
@@ -0,0 +1,132 @@
+"""
+Benchmark API payload serialization and compression.
+
+Compares the stock FastAPI path (jsonable_encoder + json.dumps) against
+FastJSONResponse with orjson, and the wire size of identity/gzip/brotli
+encodings, for a large completed scan status and a tunnel list.
+
+Usage:
+    python benchmarks/api_payload_bench.py [--services 2000] [--output-kb 2048] [--iterations 50]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import api_responses  # noqa: E402
+import config  # noqa: E402
+
+
+def build_scan_status(service_count: int, output_kb: int) -> dict:
+    """Synthetic completed scan status shaped like /api/scan/status/{id}."""
+    services = [
+        {"port": f"{1000 + i}/tcp", "state": "open", "service": "http", "host": f"10.0.{i // 250}.{i % 250}"}
+        for i in range(service_count)
+    ]
+    line = "1000/tcp open  http    Apache httpd 2.4.41 ((Ubuntu))\n"
+    output = line * (output_kb * 1024 // len(line))
+    return {
+        "id": "bench",
+        "target": "10.0.0.0/16",
+        "status": "completed",
+        "progress": "Scan completed",
+        "scan_type": "service",
+        "created_at": "2026-01-01T00:00:00",
+        "output": output,
+        "services": services,
+        "service_count": len(services),
+    }
+
+
+def build_tunnel_list(count: int) -> dict:
+    """Synthetic /api/tunnels payload."""
+    return {"tunnels": [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "type": "static",
+            "pid": 10000 + i,
+            "command": f"ssh -L {20000 + i}:10.0.0.{i % 250}:80 user@jump -N -f",
+            "ssh_user": "user",
+            "ssh_host": "jump",
+            "status": "active",
+            "created_at": "2026-01-01T00:00:00",
+            "local_port": 20000 + i,
+            "remote_host": f"10.0.0.{i % 250}",
+            "remote_port": 80,
+        }
+        for i in range(count)
+    ]}
+
+
+def cpu_per_call(func, iterations: int) -> float:
+    """Average CPU time per call in milliseconds."""
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) * 1000 / iterations
+
+
+def stock_render(payload: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def fast_render(payload: dict) -> bytes:
+    if api_responses.orjson is not None:
+        return api_responses.orjson.dumps(payload)
+    return api_responses.dumps(payload)
+
+
+def gzip_bytes(body: bytes) -> bytes:
+    compressor = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def brotli_bytes(body: bytes) -> bytes:
+    return api_responses.brotli.compress(body, quality=config.COMPRESSION_BROTLI_QUALITY)
+
+
+def report(name: str, payload: dict, iterations: int):
+    body = stock_render(payload)
+    print(f"\n== {name} ==")
+    print(f"{'path':<34}{'bytes':>12}{'cpu ms/req':>14}")
+    print(f"{'stock (jsonable_encoder+json)':<34}{len(body):>12}{cpu_per_call(lambda: stock_render(payload), iterations):>14.2f}")
+
+    fast_label = "fast (orjson)" if api_responses.orjson is not None else "fast (orjson missing: stdlib)"
+    print(f"{fast_label:<34}{len(fast_render(payload)):>12}{cpu_per_call(lambda: fast_render(payload), iterations):>14.2f}")
+
+    gz_cpu = cpu_per_call(lambda: gzip_bytes(fast_render(payload)), iterations)
+    print(f"{'fast + gzip':<34}{len(gzip_bytes(body)):>12}{gz_cpu:>14.2f}")
+
+    if api_responses.brotli is not None:
+        br_cpu = cpu_per_call(lambda: brotli_bytes(fast_render(payload)), iterations)
+        print(f"{'fast + brotli':<34}{len(brotli_bytes(body)):>12}{br_cpu:>14.2f}")
+    else:
+        print(f"{'fast + brotli':<34}{'(brotli not installed)':>26}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=2000)
+    parser.add_argument("--output-kb", type=int, default=2048)
+    parser.add_argument("--tunnels", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    report(f"scan status ({args.services} services, {args.output_kb} KiB output)",
+           build_scan_status(args.services, args.output_kb), args.iterations)
+    report(f"tunnel list ({args.tunnels} tunnels)", build_tunnel_list(args.tunnels), args.iterations)
+
+    # Sanity check: both paths must produce equivalent JSON
+    payload = build_tunnel_list(3)
+    assert json.loads(stock_render(payload)) == json.loads(fast_render(payload))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,609 @@
+"""
+Load test for the web API and WebSocket updates.
+
+Starts web_app in a subprocess with stub ssh and nmap binaries on PATH, then
+simulates dashboards the way static/app.js drives the server:
+
+- page load: GET /, /api/tunnels, /api/scans, then a /ws/tunnels connection
+- polling: /api/tunnels every 5 s, /api/scans every 3 s, revalidated with
+  If-None-Match like the browser cache does; a WebSocket ping every 30 s
+- every tunnel_* message triggers a /api/tunnels refresh
+
+while a churn driver creates and stops tunnels (and optionally starts scans,
+polling their status every 2 s until done).
+
+Reports request latency percentiles per route, WebSocket broadcast delivery
+latency (request start -> message received) and fan-out spread (first ->
+last client), server event-loop lag and RSS. The client's own loop lag is
+reported too: if it is high, the harness rather than the server is the
+bottleneck. --max-p95-ms / --max-lag-ms turn it into a pass/fail check.
+
+Usage:
+    python benchmarks/web_load_test.py [--clients 50] [--duration 30] [--churn 2] [--scans 0.2]
+    python benchmarks/web_load_test.py --clients 200 --max-p95-ms 250 --max-lag-ms 100 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import websockets
+except ImportError:  # declared dependency, but only needed with --clients > 0 and --ws
+    websockets = None
+
+# Intervals used by static/app.js, in seconds
+TUNNELS_POLL = 5.0
+SCANS_POLL = 3.0
+SCAN_STATUS_POLL = 2.0
+WS_PING = 30.0
+
+LAG_INTERVAL = 0.05  # event-loop lag probe period
+
+STUB_SSH = """#!/bin/sh
+# Load-test stand-in for ssh: stays alive like a connected tunnel
+exec sleep 600
+"""
+
+STUB_NMAP = """#!/bin/sh
+# Load-test stand-in for nmap
+sleep "${MUDALETUNNEL_STUB_NMAP_SECONDS:-1}"
+echo "Nmap scan report for 10.0.0.1"
+echo "PORT     STATE SERVICE"
+echo "22/tcp   open  ssh"
+echo "80/tcp   open  http"
+echo "443/tcp  open  https"
+"""
+
+
+# ── Measurements ────────────────────────────────────────────
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(values)
+
+    def pick(p: float) -> Optional[float]:
+        if not ordered:
+            return None
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+    return {"count": len(ordered), "p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": pick(1.0)}
+
+
+async def monitor_loop_lag(samples: List[float]):
+    """Record how late the loop wakes up a sleeping task, in ms."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, (time.perf_counter() - started - LAG_INTERVAL) * 1000))
+
+
+def current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Recorder:
+    """Client-side results: request latencies by route, errors, WebSocket events."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.not_modified = 0
+        self.churn_started: Dict[Tuple[str, str], float] = {}  # (message type, tunnel id) -> request start
+        self.ws_events: List[Tuple[Tuple[str, str], float]] = []
+        self.ws_connected = 0
+        self.ws_failures = 0
+        self.client_lag: List[float] = []
+
+    def request(self, route: str, started: float, status: int):
+        self.latencies.setdefault(route, []).append((time.perf_counter() - started) * 1000)
+        if status == 304:
+            self.not_modified += 1
+        elif status >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def error(self, route: str):
+        self.errors[route] = self.errors.get(route, 0) + 1
+
+    def broadcast_stats(self) -> Dict:
+        delivery, by_key = [], {}
+        for key, received in self.ws_events:
+            started = self.churn_started.get(key)
+            if started is not None:
+                delivery.append((received - started) * 1000)
+            by_key.setdefault(key, []).append(received)
+        spread = [(max(times) - min(times)) * 1000 for times in by_key.values() if len(times) > 1]
+        return {
+            "clients_connected": self.ws_connected,
+            "connect_failures": self.ws_failures,
+            "messages": len(self.ws_events),
+            "delivery_ms": percentiles(delivery),
+            "fanout_spread_ms": percentiles(spread),
+        }
+
+
+# ── Minimal HTTP/1.1 client ─────────────────────────────────
+
+class HttpClient:
+    """Keep-alive HTTP/1.1 client on asyncio streams, one request at a time.
+
+    Like a browser tab: one connection reused across polls.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def request(self, method: str, path: str, body=None, headers: Optional[Dict[str, str]] = None):
+        """Returns (status, headers, body bytes)."""
+        async with self._lock:
+            for attempt in range(2):
+                if self._writer is None:
+                    self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                try:
+                    return await self._exchange(method, path, body, headers or {})
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self.close()  # Server closed an idle keep-alive connection: reconnect once
+                    if attempt:
+                        raise
+
+    async def _exchange(self, method: str, path: str, body, headers: Dict[str, str]):
+        payload = json.dumps(body).encode() if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Accept: application/json"]
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(payload)}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await self._writer.drain()
+
+        status_line = await self._reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunks.append(await self._reader.readexactly(size + 2))
+                if size == 0:
+                    break
+            data = b"".join(c[:-2] for c in chunks)
+        else:
+            data = await self._reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection") == "close":
+            self.close()
+        return status, response_headers, data
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+# ── Simulated dashboards ────────────────────────────────────
+
+class Dashboard:
+    """One browser tab running static/app.js."""
+
+    def __init__(self, host: str, port: int, recorder: Recorder, use_ws: bool):
+        self.http = HttpClient(host, port)
+        self.ws_url = f"ws://{host}:{port}/ws/tunnels"
+        self.recorder = recorder
+        self.use_ws = use_ws
+        self._etags: Dict[str, str] = {}
+
+    async def get(self, path: str, route: Optional[str] = None):
+        """GET with browser-style revalidation of the cached copy."""
+        headers = {"If-None-Match": self._etags[path]} if path in self._etags else {}
+        started = time.perf_counter()
+        try:
+            status, response_headers, _ = await self.http.request("GET", path, headers=headers)
+        except (OSError, asyncio.IncompleteReadError):
+            self.recorder.error(route or f"GET {path}")
+            return
+        self.recorder.request(route or f"GET {path}", started, status)
+        if "etag" in response_headers:
+            self._etags[path] = response_headers["etag"]
+
+    async def poll(self, path: str, interval: float):
+        await asyncio.sleep(random.uniform(0, interval))  # Tabs aren't opened in lockstep
+        while True:
+            await self.get(path)
+            await asyncio.sleep(interval)
+
+    async def websocket(self):
+        try:
+            async with websockets.connect(self.ws_url, ping_interval=None, max_size=None) as ws:
+                self.recorder.ws_connected += 1
+                pinger = asyncio.create_task(self._ping(ws))
+                try:
+                    async for message in ws:
+                        if not message.startswith("{"):
+                            continue  # "ping"/"pong" keepalive
+                        data = json.loads(message)
+                        if data.get("type") in ("tunnel_created", "tunnel_stopped"):
+                            self.recorder.ws_events.append(((data["type"], data.get("tunnel_id")), time.perf_counter()))
+                        if data.get("type", "").startswith(("tunnel", "all_tunnels")):
+                            asyncio.ensure_future(self.get("/api/tunnels"))
+                finally:
+                    pinger.cancel()
+        except (OSError, websockets.exceptions.WebSocketException):
+            self.recorder.ws_failures += 1
+
+    @staticmethod
+    async def _ping(ws):
+        while True:
+            await asyncio.sleep(WS_PING)
+            await ws.send("ping")
+
+    async def run(self, ramp: float):
+        await asyncio.sleep(random.uniform(0, ramp))
+        await self.get("/", "GET / (page)")
+        await self.get("/api/tunnels")
+        await self.get("/api/scans")
+        tasks = [self.poll("/api/tunnels", TUNNELS_POLL), self.poll("/api/scans", SCANS_POLL)]
+        if self.use_ws:
+            tasks.append(self.websocket())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.http.close()
+
+
+# ── Churn driver ────────────────────────────────────────────
+
+async def create_and_stop_tunnel(host: str, port: int, recorder: Recorder, local_port: int, lifetime: float):
+    http = HttpClient(host, port)
+    try:
+        started = time.perf_counter()
+        status, _, data = await http.request("POST", "/api/tunnels/static", {
+            "ssh_user": "load",
+            "ssh_host": "stub-jump",
+            "target_host": "10.0.0.1",
+            "remote_port": 80,
+            "local_port": local_port,
+        })
+        recorder.request("POST /api/tunnels/static", started, status)
+        if status != 200:
+            return
+        tunnel_id = json.loads(data)["tunnel_id"]
+        recorder.churn_started[("tunnel_created", tunnel_id)] = started
+
+        await asyncio.sleep(lifetime)
+        started = time.perf_counter()
+        recorder.churn_started[("tunnel_stopped", tunnel_id)] = started
+        status, _, _ = await http.request("DELETE", f"/api/tunnels/{tunnel_id}")
+        recorder.request("DELETE /api/tunnels/{tunnel_id}", started, status)
+    except (OSError, asyncio.IncompleteReadError):
+        recorder.error("tunnel churn")
+    finally:
+        http.close()
+
+
+async def run_scan(host: str, port: int, recorder: Recorder, target: str):
+    http = HttpClient(host, port)
+    try:
+        started = time.perf_counter()
+        status, _, data = await http.request("POST", "/api/scan", {"target": target, "scan_type": "quick", "dedupe": False})
+        recorder.request("POST /api/scan", started, status)
+        if status != 200:
+            return
+        scan_id = json.loads(data)["scan_id"]
+        while True:
+            await asyncio.sleep(SCAN_STATUS_POLL)
+            started = time.perf_counter()
+            status, _, data = await http.request("GET", f"/api/scan/status/{scan_id}")
+            recorder.request("GET /api/scan/status/{scan_id}", started, status)
+            if status != 200 or json.loads(data).get("status") in ("completed", "failed"):
+                return
+    except (OSError, asyncio.IncompleteReadError):
+        recorder.error("scan churn")
+    finally:
+        http.close()
+
+
+async def churn(host: str, port: int, recorder: Recorder, rate: float, action, make_args):
+    """Start action(*make_args(index)) at rate per second (Poisson arrivals) until cancelled."""
+    tasks = set()
+    index = 0
+    try:
+        while True:
+            await asyncio.sleep(random.expovariate(rate))
+            task = asyncio.ensure_future(action(host, port, recorder, *make_args(index)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            index += 1
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+# ── Server process ──────────────────────────────────────────
+
+def serve(port: int, stats_path: str):
+    """--serve: run web_app under uvicorn, recording loop lag and memory for the report."""
+    import uvicorn
+    import web_app
+
+    lag: List[float] = []
+    rss: List[float] = []
+    tasks = []
+
+    async def start_monitor():
+        tasks.append(asyncio.create_task(monitor_loop_lag(lag)))
+
+        async def sample_rss():
+            while True:
+                value = current_rss_mb()
+                if value is not None:
+                    rss.append(value)
+                await asyncio.sleep(1.0)
+        tasks.append(asyncio.create_task(sample_rss()))
+
+    async def write_stats():
+        for task in tasks:
+            task.cancel()
+        with open(stats_path, "w") as f:
+            json.dump({
+                "loop_lag_ms": percentiles(lag),
+                "rss_mb": {
+                    "start": round(rss[0], 1) if rss else None,
+                    "end": round(rss[-1], 1) if rss else None,
+                    "peak": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                },
+                "tunnels_left": len(web_app.tunnel_manager.active_tunnels),
+            }, f)
+
+    web_app.app.add_event_handler("startup", start_monitor)
+    web_app.app.add_event_handler("shutdown", write_stats)
+    uvicorn.run(web_app.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir: str, port: int, stats_path: str, ssh_delay: float, nmap_seconds: float) -> subprocess.Popen:
+    stub_dir = os.path.join(workdir, "bin")
+    os.makedirs(stub_dir)
+    for name, script in (("ssh", STUB_SSH), ("nmap", STUB_NMAP)):
+        path = os.path.join(stub_dir, name)
+        with open(path, "w") as f:
+            f.write(script)
+        os.chmod(path, 0o755)
+
+    env = {
+        **os.environ,
+        "PATH": stub_dir + os.pathsep + os.environ.get("PATH", ""),
+        "MUDALETUNNEL_SSH_DELAY": str(ssh_delay),
+        "MUDALETUNNEL_STUB_NMAP_SECONDS": str(nmap_seconds),
+        "MUDALETUNNEL_SCAN_SPILL_DIR": os.path.join(workdir, "scans"),
+        "MUDALETUNNEL_TRACE_EXPORT": "1",
+        "MUDALETUNNEL_TRACE_PATH": os.path.join(workdir, "traces.jsonl"),
+    }
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port), "--stats", stats_path],
+        cwd=ROOT, env=env,
+    )
+
+
+async def wait_until_up(port: int, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        http = HttpClient("127.0.0.1", port)
+        try:
+            status, _, _ = await http.request("GET", "/api/tunnels")
+            if status == 200:
+                return
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            http.close()
+        if time.monotonic() > deadline:
+            raise RuntimeError("web_app did not start")
+        await asyncio.sleep(0.2)
+
+
+# ── Run and report ──────────────────────────────────────────
+
+async def run_load(args, port: int) -> Recorder:
+    recorder = Recorder()
+    await wait_until_up(port)
+    host = "127.0.0.1"
+    use_ws = args.ws and args.clients > 0
+
+    tasks = [asyncio.ensure_future(monitor_loop_lag(recorder.client_lag))]
+    tasks += [
+        asyncio.ensure_future(Dashboard(host, port, recorder, use_ws).run(args.ramp))
+        for _ in range(args.clients)
+    ]
+    if args.churn > 0:
+        tasks.append(asyncio.ensure_future(churn(
+            host, port, recorder, args.churn, create_and_stop_tunnel,
+            lambda i: (args.local_port_base + i % 20000, args.tunnel_lifetime),
+        )))
+    if args.scans > 0:
+        tasks.append(asyncio.ensure_future(churn(
+            host, port, recorder, args.scans, run_scan, lambda i: (args.scan_target,),
+        )))
+
+    await asyncio.sleep(args.ramp + args.duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    http = HttpClient(host, port)
+    try:
+        await http.request("DELETE", "/api/tunnels")  # Stop stub ssh processes still running
+    finally:
+        http.close()
+    return recorder
+
+
+def build_report(args, recorder: Recorder, server: Dict) -> Dict:
+    routes = {
+        route: {**percentiles(values), "errors": recorder.errors.get(route, 0)}
+        for route, values in sorted(recorder.latencies.items(), key=lambda item: -len(item[1]))
+    }
+    total = sum(len(v) for v in recorder.latencies.values())
+    return {
+        "config": {
+            "clients": args.clients, "duration_s": args.duration, "churn_per_s": args.churn,
+            "scans_per_s": args.scans, "websocket": args.ws and args.clients > 0,
+        },
+        "requests": {
+            "total": total,
+            "per_s": round(total / (args.ramp + args.duration), 1),
+            "not_modified": recorder.not_modified,
+            "errors": dict(recorder.errors),
+            "routes": routes,
+        },
+        "websocket": recorder.broadcast_stats(),
+        "server": server,
+        "client_loop_lag_ms": percentiles(recorder.client_lag),
+    }
+
+
+def print_report(report: Dict):
+    def ms(value) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    config = report["config"]
+    print(f"\n{config['clients']} dashboards, {config['duration_s']}s, "
+          f"{config['churn_per_s']} tunnel creations/s, {config['scans_per_s']} scans/s")
+
+    requests = report["requests"]
+    print(f"\n== requests: {requests['total']} ({requests['per_s']}/s), {requests['not_modified']} not modified ==")
+    print(f"{'route':<36}{'count':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'errors':>8}")
+    for route, stats in requests["routes"].items():
+        print(f"{route:<36}{stats['count']:>8}{ms(stats['p50']):>9}{ms(stats['p95']):>9}"
+              f"{ms(stats['p99']):>9}{ms(stats['max']):>9}{stats['errors']:>8}")
+
+    ws = report["websocket"]
+    if config["websocket"]:
+        print(f"\n== websocket: {ws['clients_connected']} connected, {ws['connect_failures']} failed, "
+              f"{ws['messages']} tunnel messages ==")
+        for label, key in (("delivery (request -> client)", "delivery_ms"), ("fan-out spread (first -> last)", "fanout_spread_ms")):
+            stats = ws[key]
+            print(f"{label:<36}{stats['count']:>8}{ms(stats['p50']):>9}{ms(stats['p95']):>9}"
+                  f"{ms(stats['p99']):>9}{ms(stats['max']):>9}")
+
+    server = report["server"]
+    print("\n== server ==")
+    if server:
+        lag = server["loop_lag_ms"]
+        print(f"event loop lag ms      p50 {ms(lag['p50'])}  p99 {ms(lag['p99'])}  max {ms(lag['max'])}")
+        rss = server["rss_mb"]
+        print(f"rss MiB                start {ms(rss['start'])}  end {ms(rss['end'])}  peak {ms(rss['peak'])}")
+    else:
+        print("(no stats: server did not shut down cleanly)")
+    client_lag = report["client_loop_lag_ms"]
+    print(f"client loop lag ms     p99 {ms(client_lag['p99'])}  max {ms(client_lag['max'])}"
+          f"{'  (harness saturated: results understate capacity)' if (client_lag['p99'] or 0) > 50 else ''}")
+
+
+def check_limits(args, report: Dict) -> List[str]:
+    failures = []
+    if args.max_p95_ms is not None:
+        for route, stats in report["requests"]["routes"].items():
+            if stats["p95"] is not None and stats["p95"] > args.max_p95_ms:
+                failures.append(f"{route}: p95 {stats['p95']} ms > {args.max_p95_ms} ms")
+    if args.max_lag_ms is not None and report["server"]:
+        p99 = report["server"]["loop_lag_ms"]["p99"]
+        if p99 is not None and p99 > args.max_lag_ms:
+            failures.append(f"server event loop lag p99 {p99} ms > {args.max_lag_ms} ms")
+    if report["requests"]["errors"]:
+        failures.append(f"request errors: {report['requests']['errors']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50, help="simulated dashboards")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of steady load after the ramp")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which dashboards connect")
+    parser.add_argument("--churn", type=float, default=2.0, help="tunnel creations per second")
+    parser.add_argument("--tunnel-lifetime", type=float, default=10.0, help="seconds before a churned tunnel is stopped")
+    parser.add_argument("--local-port-base", type=int, default=30000)
+    parser.add_argument("--scans", type=float, default=0.0, help="scans started per second")
+    parser.add_argument("--scan-target", default="10.0.0.0/28")
+    parser.add_argument("--nmap-seconds", type=float, default=1.0, help="stub nmap run time")
+    parser.add_argument("--ssh-delay", type=float, default=0.05, help="MUDALETUNNEL_SSH_DELAY for the server")
+    parser.add_argument("--no-ws", dest="ws", action="store_false", help="poll only, no WebSocket clients")
+    parser.add_argument("--max-p95-ms", type=float, help="fail if any route's p95 exceeds this")
+    parser.add_argument("--max-lag-ms", type=float, help="fail if server loop lag p99 exceeds this")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--stats", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.stats)
+        return
+    if args.ws and args.clients > 0 and websockets is None:
+        parser.error("the websockets package is required for WebSocket clients (or pass --no-ws)")
+
+    # Each dashboard holds one HTTP and one WebSocket connection
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < args.clients * 2 + 256:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, args.clients * 2 + 256), hard))
+
+    with tempfile.TemporaryDirectory(prefix="mudaletunnel-load-") as workdir:
+        port = free_port()
+        stats_path = os.path.join(workdir, "server-stats.json")
+        server = start_server(workdir, port, stats_path, args.ssh_delay, args.nmap_seconds)
+        try:
+            recorder = asyncio.run(run_load(args, port))
+        finally:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        server_stats = {}
+        if os.path.exists(stats_path):
+            with open(stats_path) as f:
+                server_stats = json.load(f)
+
+    report = build_report(args, recorder, server_stats)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    failures = check_limits(args, report)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
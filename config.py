@@ -16,9 +16,13 @@ SOCKS_PORT_START = 1080
 # SSH Configuration
 SSH_STARTUP_DELAY = float(os.getenv("MUDALETUNNEL_SSH_DELAY", "0.5"))  # seconds to wait for SSH process startup
 SSH_PROCESS_TIMEOUT = int(os.getenv("MUDALETUNNEL_SSH_TIMEOUT", "5"))  # seconds to wait for process termination
+SSH_TRANSPORT_PROFILE = os.getenv("MUDALETUNNEL_SSH_PROFILE", "")  # default transport profile (throughput, lossy-link, fail-fast; "" = plain ssh)
 
 # Nmap Configuration
 NMAP_SCAN_TIMEOUT = int(os.getenv("MUDALETUNNEL_NMAP_TIMEOUT", "300"))  # seconds
+NMAP_PARALLEL_SHARDS = int(os.getenv("MUDALETUNNEL_NMAP_PARALLEL_SHARDS", "4"))  # nmap processes for one large scan
+NMAP_SHARD_MIN_HOSTS = int(os.getenv("MUDALETUNNEL_NMAP_SHARD_MIN_HOSTS", "64"))  # don't split below this many hosts per shard
+NMAP_INLINE_TARGETS_MAX = int(os.getenv("MUDALETUNNEL_NMAP_INLINE_TARGETS", "1000"))  # more target specs go to nmap via -iL file
 NMAP_DNS_SERVER = "8.8.8.8"
 NMAP_DNS_PORT = 53
 
@@ -33,8 +37,143 @@ WEBSOCKET_TIMEOUT = int(os.getenv("MUDALETUNNEL_WS_TIMEOUT", "30"))  # seconds
 # Performance Configuration
 PORT_CHECK_CACHE_TTL = float(os.getenv("MUDALETUNNEL_PORT_CACHE_TTL", "1.0"))  # seconds to cache port availability
 PORT_CHECK_TIMEOUT = float(os.getenv("MUDALETUNNEL_PORT_TIMEOUT", "0.1"))  # seconds for socket timeout during port check
-MAX_CONCURRENT_TUNNELS = int(os.getenv("MUDALETUNNEL_MAX_TUNNELS", "100"))
+MAX_CONCURRENT_TUNNELS = int(os.getenv("MUDALETUNNEL_MAX_TUNNELS", "100"))  # running ssh processes; more wait in the admission queue
 MAX_PORT_SEARCH_ATTEMPTS = int(os.getenv("MUDALETUNNEL_MAX_PORT_SEARCH", "1000"))  # Max attempts to find free port
 
+# Admission Control Configuration
+ADMISSION_HANDSHAKES_PER_HOST = int(os.getenv("MUDALETUNNEL_HANDSHAKES_PER_HOST", "4"))  # concurrent ssh startups per jump host (0 = no limit)
+ADMISSION_QUEUE_MAX = int(os.getenv("MUDALETUNNEL_ADMISSION_QUEUE", "200"))  # tunnel requests allowed to wait
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("MUDALETUNNEL_ADMISSION_TIMEOUT", "30"))  # seconds a request waits before failing
+
 # Health Check Configuration
 HEALTH_CHECK_INTERVAL = int(os.getenv("MUDALETUNNEL_HEALTH_INTERVAL", "30"))  # seconds between health checks
+
+# Remote Bind Verification Configuration
+REMOTE_VERIFY_ENABLED = os.getenv("MUDALETUNNEL_REMOTE_VERIFY", "1").lower() in ("1", "true", "yes")  # confirm -R binds in health checks
+REMOTE_CHECK_INTERVAL = float(os.getenv("MUDALETUNNEL_REMOTE_CHECK_INTERVAL", "30"))  # seconds a server's listener list is reused
+REMOTE_CHECK_TIMEOUT = float(os.getenv("MUDALETUNNEL_REMOTE_CHECK_TIMEOUT", "10"))  # ssh connect timeout for the listener check
+REMOTE_CHECK_WORKERS = int(os.getenv("MUDALETUNNEL_REMOTE_CHECK_WORKERS", "16"))  # servers checked in parallel
+
+# Service Catalog Configuration
+SERVICE_PAGE_SIZE = int(os.getenv("MUDALETUNNEL_SERVICE_PAGE_SIZE", "500"))  # default services per /api/services page
+SERVICE_PAGE_SIZE_MAX = int(os.getenv("MUDALETUNNEL_SERVICE_PAGE_MAX", "5000"))  # upper bound for ?limit=
+LIST_WINDOW_MAX = int(os.getenv("MUDALETUNNEL_LIST_WINDOW_MAX", "500"))  # rows per windowed /api/tunnels or scan services request
+
+# API Response Configuration
+FAST_JSON = os.getenv("MUDALETUNNEL_FAST_JSON", "0").lower() in ("1", "true", "yes")  # orjson serialization (requires orjson)
+COMPRESSION_ENABLED = os.getenv("MUDALETUNNEL_COMPRESSION", "1").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("MUDALETUNNEL_COMPRESSION_MIN_SIZE", "1024"))  # bytes; smaller responses are sent as-is
+COMPRESSION_BROTLI = os.getenv("MUDALETUNNEL_BROTLI", "1").lower() in ("1", "true", "yes")  # prefer br when brotli is installed
+COMPRESSION_GZIP_LEVEL = int(os.getenv("MUDALETUNNEL_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("MUDALETUNNEL_BROTLI_QUALITY", "4"))
+
+# Static Assets Configuration
+STATIC_MAX_AGE = int(os.getenv("MUDALETUNNEL_STATIC_MAX_AGE", str(365 * 24 * 3600)))  # seconds; content-hashed URLs only
+
+# Scan Storage Configuration
+MAX_SCAN_HISTORY = int(os.getenv("MUDALETUNNEL_MAX_SCANS", "500"))  # finished scans kept before oldest are dropped
+SCAN_OUTPUT_CACHE_BYTES = int(os.getenv("MUDALETUNNEL_SCAN_CACHE_BYTES", str(32 * 1024 * 1024)))  # compressed raw output kept in memory
+SCAN_SPILL_DIR = os.getenv("MUDALETUNNEL_SCAN_SPILL_DIR", "")  # default: <tmpdir>/mudaletunnel-scans-<uid> (0700); each store writes to its own subdirectory
+
+# Multi-node Agent Configuration
+DEFAULT_AGENT_PORT = int(os.getenv("MUDALETUNNEL_AGENT_PORT", "8100"))
+AGENT_TOKEN = os.getenv("MUDALETUNNEL_AGENT_TOKEN", "")  # shared secret sent as X-MudaleTunnel-Token; empty disables auth
+AGENT_NODES = [n for n in os.getenv("MUDALETUNNEL_AGENTS", "").split(",") if n.strip()]  # coordinator: name=url,...
+LOCAL_NODE_NAME = "local"  # node name used for the coordinator's own tunnels
+AGENT_TIMEOUT = float(os.getenv("MUDALETUNNEL_AGENT_TIMEOUT", "5.0"))  # seconds per agent request
+AGENT_POOL_SIZE = int(os.getenv("MUDALETUNNEL_AGENT_POOL_SIZE", "4"))  # keep-alive connections per agent
+AGENT_MAX_WORKERS = int(os.getenv("MUDALETUNNEL_AGENT_WORKERS", "32"))  # parallel fan-out threads
+AGENT_CACHE_TTL = float(os.getenv("MUDALETUNNEL_AGENT_CACHE_TTL", "2.0"))  # seconds to reuse an agent's last state
+
+# Data-plane Probe Configuration
+PROBE_ENABLED = os.getenv("MUDALETUNNEL_PROBE", "1").lower() in ("1", "true", "yes")  # periodic probes in web mode
+PROBE_INTERVAL = float(os.getenv("MUDALETUNNEL_PROBE_INTERVAL", "30"))  # seconds between probe rounds
+PROBE_TIMEOUT = float(os.getenv("MUDALETUNNEL_PROBE_TIMEOUT", "5.0"))  # seconds per probe
+PROBE_CLOSE_WAIT = float(os.getenv("MUDALETUNNEL_PROBE_CLOSE_WAIT", "0.3"))  # seconds to watch a static forward for an immediate close
+PROBE_CONCURRENCY = int(os.getenv("MUDALETUNNEL_PROBE_CONCURRENCY", "64"))  # max probes in flight
+PROBE_WINDOW = int(os.getenv("MUDALETUNNEL_PROBE_WINDOW", "60"))  # RTT samples kept per tunnel
+PROBE_SOCKS_TARGET_HOST = os.getenv("MUDALETUNNEL_PROBE_SOCKS_HOST", "127.0.0.1")  # far-side CONNECT target for dynamic tunnels
+PROBE_SOCKS_TARGET_PORT = int(os.getenv("MUDALETUNNEL_PROBE_SOCKS_PORT", "22"))
+
+# Resource Accounting Configuration
+RESOURCE_ENABLED = os.getenv("MUDALETUNNEL_RESOURCES", "1").lower() in ("1", "true", "yes")  # /proc sampling in web mode (Linux)
+RESOURCE_INTERVAL = float(os.getenv("MUDALETUNNEL_RESOURCE_INTERVAL", "15"))  # seconds between /proc passes
+RESOURCE_WINDOW = int(os.getenv("MUDALETUNNEL_RESOURCE_WINDOW", "240"))  # samples kept per tunnel (1 h at 15 s)
+RESOURCE_CPU_PERCENT_MAX = float(os.getenv("MUDALETUNNEL_RESOURCE_CPU_MAX", "80"))  # per tunnel process group; 0 disables
+RESOURCE_RSS_MAX_MB = float(os.getenv("MUDALETUNNEL_RESOURCE_RSS_MAX_MB", "256"))
+RESOURCE_FDS_MAX = int(os.getenv("MUDALETUNNEL_RESOURCE_FDS_MAX", "512"))
+
+# Benchmark Configuration
+BENCH_DEFAULT_BYTES = int(os.getenv("MUDALETUNNEL_BENCH_BYTES", str(16 * 1024 * 1024)))  # data pushed per benchmark
+BENCH_MAX_BYTES = int(os.getenv("MUDALETUNNEL_BENCH_MAX_BYTES", str(1024 * 1024 * 1024)))
+BENCH_MAX_STREAMS = int(os.getenv("MUDALETUNNEL_BENCH_MAX_STREAMS", "16"))  # parallel connections for the transfer
+BENCH_CHUNK_SIZE = 64 * 1024  # bytes per write
+BENCH_TIMEOUT = float(os.getenv("MUDALETUNNEL_BENCH_TIMEOUT", "120"))  # seconds for the whole transfer
+BENCH_SINK_CLOSE_WAIT = float(os.getenv("MUDALETUNNEL_BENCH_SINK_CLOSE_WAIT", "5"))  # seconds to wait for a sink to close after EOF
+
+# Export Configuration
+EXPORT_BATCH_SIZE = int(os.getenv("MUDALETUNNEL_EXPORT_BATCH", "500"))  # records fetched (under one lock) and encoded per chunk
+
+# Jump Host Selection Configuration
+SSH_PORT = int(os.getenv("MUDALETUNNEL_SSH_PORT", "22"))  # port probed on candidate jump hosts
+JUMP_PROBE_TIMEOUT = float(os.getenv("MUDALETUNNEL_JUMP_PROBE_TIMEOUT", "3.0"))  # seconds per handshake probe
+JUMP_PROBE_WORKERS = int(os.getenv("MUDALETUNNEL_JUMP_PROBE_WORKERS", "16"))  # parallel handshake probes
+JUMP_HOST_CACHE_TTL = float(os.getenv("MUDALETUNNEL_JUMP_CACHE_TTL", "60"))  # seconds to reuse a probe result
+
+# SOCKS Pool Configuration
+SOCKS_POOL_LISTEN_PORT = int(os.getenv("MUDALETUNNEL_SOCKS_POOL_PORT", "1081"))  # default front-end port
+SOCKS_POOL_PORT_START = int(os.getenv("MUDALETUNNEL_SOCKS_POOL_PORT_START", "11080"))  # first port tried for member tunnels
+SOCKS_POOL_MAX_MEMBERS = int(os.getenv("MUDALETUNNEL_SOCKS_POOL_MAX_MEMBERS", "32"))
+SOCKS_POOL_CONNECT_TIMEOUT = float(os.getenv("MUDALETUNNEL_SOCKS_POOL_CONNECT_TIMEOUT", "2.0"))  # seconds to reach a member
+SOCKS_POOL_RETRY_AFTER = float(os.getenv("MUDALETUNNEL_SOCKS_POOL_RETRY_AFTER", "10"))  # seconds a member is skipped after a connect failure
+SOCKS_POOL_MAX_PROBE_FAILURES = int(os.getenv("MUDALETUNNEL_SOCKS_POOL_MAX_PROBE_FAILURES", "2"))  # consecutive probe failures before a member is skipped
+SOCKS_POOL_CHECK_INTERVAL = float(os.getenv("MUDALETUNNEL_SOCKS_POOL_CHECK_INTERVAL", "5"))  # seconds between health/autoscale passes
+SOCKS_POOL_SCALE_UP_CONNS = float(os.getenv("MUDALETUNNEL_SOCKS_POOL_SCALE_UP", "8"))  # avg active connections per member to grow
+SOCKS_POOL_SCALE_DOWN_CONNS = float(os.getenv("MUDALETUNNEL_SOCKS_POOL_SCALE_DOWN", "1"))  # avg active connections per member to shrink
+SOCKS_POOL_DRAIN_TIMEOUT = float(os.getenv("MUDALETUNNEL_SOCKS_POOL_DRAIN_TIMEOUT", "30"))  # seconds to let a retired member finish
+
+# Chain Tunnel Configuration
+MAX_CHAIN_HOPS = int(os.getenv("MUDALETUNNEL_MAX_CHAIN_HOPS", "8"))  # ProxyJump hops per chain
+
+# Proxychains Configuration
+PROXYCHAINS_OUTPUT_PATH = os.getenv("MUDALETUNNEL_PROXYCHAINS_PATH", "~/.proxychains/proxychains.conf")  # file kept in sync (proxychains-ng reads this by default)
+PROXYCHAINS_AUTO_WRITE = os.getenv("MUDALETUNNEL_PROXYCHAINS_AUTO_WRITE", "0").lower() in ("1", "true", "yes")  # sync the file in web mode
+PROXYCHAINS_SYNC_INTERVAL = float(os.getenv("MUDALETUNNEL_PROXYCHAINS_SYNC_INTERVAL", "5"))  # seconds between change checks
+PROXYCHAINS_MAX_PROXIES = int(os.getenv("MUDALETUNNEL_PROXYCHAINS_MAX_PROXIES", "1"))  # ranked proxies listed (rest become fallbacks)
+PROXYCHAINS_CONNECT_TIMEOUT_MS = int(os.getenv("MUDALETUNNEL_PROXYCHAINS_CONNECT_TIMEOUT_MS", "8000"))
+PROXYCHAINS_READ_TIMEOUT_MS = int(os.getenv("MUDALETUNNEL_PROXYCHAINS_READ_TIMEOUT_MS", "15000"))
+
+# Bulk Tunnel Configuration
+BULK_PORT_START = int(os.getenv("MUDALETUNNEL_BULK_PORT_START", "20000"))  # first local port when a service's own port is taken
+BULK_FORWARDS_PER_SSH = int(os.getenv("MUDALETUNNEL_BULK_FORWARDS_PER_SSH", "100"))  # -L forwards sharing one SSH connection
+BULK_MAX_PARALLEL = int(os.getenv("MUDALETUNNEL_BULK_MAX_PARALLEL", "8"))  # ssh processes started at once
+
+# SOCKS Scan Configuration
+SOCKS_SCAN_WORKERS_PER_TUNNEL = int(os.getenv("MUDALETUNNEL_SOCKS_SCAN_WORKERS", "2"))  # concurrent nmap shards per tunnel
+SOCKS_SCAN_SHARDS_PER_TUNNEL = int(os.getenv("MUDALETUNNEL_SOCKS_SCAN_SHARDS_PER_TUNNEL", "4"))  # work split finer than workers so fast tunnels take more
+SOCKS_SCAN_MIN_SHARD_PORTS = int(os.getenv("MUDALETUNNEL_SOCKS_SCAN_MIN_SHARD_PORTS", "16"))  # never cut a host's ports smaller than this
+
+# Connect Scanner Configuration
+PORTSCAN_CONCURRENCY = int(os.getenv("MUDALETUNNEL_PORTSCAN_CONCURRENCY", "2000"))  # connects in flight (capped by the fd limit)
+PORTSCAN_TIMEOUT = float(os.getenv("MUDALETUNNEL_PORTSCAN_TIMEOUT", "1.0"))  # seconds, until a host's RTT is known
+PORTSCAN_MIN_TIMEOUT = float(os.getenv("MUDALETUNNEL_PORTSCAN_MIN_TIMEOUT", "0.25"))  # adaptive timeout bounds
+PORTSCAN_MAX_TIMEOUT = float(os.getenv("MUDALETUNNEL_PORTSCAN_MAX_TIMEOUT", "3.0"))
+PORTSCAN_MAX_HOSTS = int(os.getenv("MUDALETUNNEL_PORTSCAN_MAX_HOSTS", "65536"))  # hosts per scan
+PORTSCAN_PROGRESS_INTERVAL = 0.5  # seconds between progress updates
+
+# Profiling Configuration
+PROFILING_ENABLED = os.getenv("MUDALETUNNEL_PROFILING", "0").lower() in ("1", "true", "yes")  # request timing, lock-wait timing, /api/admin/profile
+PROFILE_TOKEN = os.getenv("MUDALETUNNEL_PROFILE_TOKEN", "")  # required in X-MudaleTunnel-Token for /api/admin/* when set
+PROFILE_SLOW_REQUEST_MS = float(os.getenv("MUDALETUNNEL_PROFILE_SLOW_MS", "500"))  # requests slower than this are logged
+PROFILE_SLOW_REQUEST_HISTORY = 100  # slow requests kept for /api/admin/profiling
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("MUDALETUNNEL_PROFILE_INTERVAL_MS", "5"))  # stack sampling period
+PROFILE_MAX_SECONDS = 60  # longest capture /api/admin/profile accepts
+
+# Tracing Configuration
+TRACING_ENABLED = os.getenv("MUDALETUNNEL_TRACING", "1").lower() in ("1", "true", "yes")  # lifecycle spans for tunnels, scans, requests
+TRACE_BUFFER_SPANS = int(os.getenv("MUDALETUNNEL_TRACE_BUFFER", "5000"))  # recent spans kept for /api/traces
+TRACE_EXPORT = os.getenv("MUDALETUNNEL_TRACE_EXPORT", "0").lower() in ("1", "true", "yes")  # append spans to a file as OTLP/JSON lines
+TRACE_EXPORT_PATH = os.getenv("MUDALETUNNEL_TRACE_PATH", "")  # default: <tmpdir>/mudaletunnel-traces-<uid>.jsonl (0600)
+TRACE_EXPORT_MAX_BYTES = int(os.getenv("MUDALETUNNEL_TRACE_MAX_BYTES", str(50 * 1024 * 1024)))  # rotated to .1 beyond this
+TRACE_EXPORT_BATCH = 512  # spans per written line
+TRACE_EXPORT_INTERVAL = 1.0  # seconds the exporter waits for more spans
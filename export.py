@@ -0,0 +1,347 @@
+"""
+Streaming NDJSON/CSV export of services, scans and tunnels.
+
+Records are pulled lazily from the service catalog, scan store and tunnel
+registry, EXPORT_BATCH_SIZE at a time, and each batch is encoded into one
+chunk, so memory stays flat however large the dataset is.
+
+Every record can carry a resume cursor (include_cursor): pass the last one
+seen back as cursor= to continue an interrupted export right after it.
+"""
+import csv
+import io
+import json
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from api_responses import dumps
+import config
+
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+EXPORT_COLUMNS = {
+    "services": (
+        "host", "port", "port_number", "protocol", "state", "service",
+        "target", "scan_id", "scan_type", "last_seen",
+    ),
+    "scans": (
+        "id", "target", "scan_type", "status", "progress", "created_at",
+        "target_count", "service_count", "error",
+    ),
+    "tunnels": (
+        "id", "type", "status", "ssh_user", "ssh_host", "local_port",
+        "remote_host", "remote_port", "bind_address", "remote_bind_port",
+        "target_host", "target_port", "pid", "transport", "created_at",
+    ),
+}
+
+CURSOR_FIELD = "cursor"
+
+_DOWNLOAD_CHUNK = 64 * 1024
+
+Record = Tuple[str, Dict]  # (resume cursor, record)
+
+
+def _port_fields(port) -> Tuple[int, str]:
+    """'22/tcp' -> (22, 'tcp'); bare numbers are tcp, unparsable ones 0."""
+    number, _, protocol = str(port or "").partition("/")
+    return (int(number) if number.isdigit() else 0), (protocol or "tcp").lower()
+
+
+# ── Record sources ──────────────────────────────────────────
+
+def _catalog_services(catalog, cursor: Optional[str], filters: Dict) -> Iterator[Record]:
+    yield from catalog.iter_services(cursor=cursor, batch=config.EXPORT_BATCH_SIZE, **filters)
+
+
+def _scan_services(summary: Dict, start: int, filters: Dict) -> Iterator[Record]:
+    """One scan's own services; the cursor is the position in its service list."""
+    host, port, protocol, service = (filters.get(k) for k in ("host", "port", "protocol", "service"))
+    services = summary.get("services") or []
+    for index in range(start, len(services)):
+        entry = services[index]
+        port_number, entry_protocol = _port_fields(entry.get("port"))
+        record = {
+            "host": entry.get("host") or summary.get("target"),
+            "port": entry.get("port"),
+            "port_number": port_number,
+            "protocol": entry_protocol,
+            "state": entry.get("state", "open"),
+            "service": entry.get("service", "unknown"),
+            "target": summary.get("target"),
+            "scan_id": summary.get("id"),
+            "scan_type": summary.get("scan_type"),
+            "last_seen": summary.get("created_at"),
+        }
+        if host is not None and record["host"] != host:
+            continue
+        if port is not None and port_number != port:
+            continue
+        if protocol is not None and entry_protocol != protocol.lower():
+            continue
+        if service is not None and record["service"] != service:
+            continue
+        yield str(index), record
+
+
+def _scans(scan_store, cursor: Optional[str], status: Optional[str], scan_type: Optional[str]) -> Iterator[Record]:
+    for summary in scan_store.iter_scans(after=cursor, batch=config.EXPORT_BATCH_SIZE):
+        if status is not None and summary.get("status") != status:
+            continue
+        if scan_type is not None and summary.get("scan_type") != scan_type:
+            continue
+        record = {column: summary.get(column) for column in EXPORT_COLUMNS["scans"]}
+        record["service_count"] = summary.get("service_count", len(summary.get("services") or []))
+        yield summary["id"], record
+
+
+def _tunnels(tunnel_manager, cursor: Optional[str], status: Optional[str], tunnel_type: Optional[str]) -> Iterator[Record]:
+    for tunnel in tunnel_manager.iter_tunnels(after=cursor):
+        if status is not None and tunnel.get("status") != status:
+            continue
+        if tunnel_type is not None and tunnel.get("type") != tunnel_type:
+            continue
+        yield tunnel["id"], {column: tunnel.get(column) for column in EXPORT_COLUMNS["tunnels"]}
+
+
+def open_records(
+    dataset: str,
+    *,
+    catalog=None,
+    scan_store=None,
+    tunnel_manager=None,
+    cursor: Optional[str] = None,
+    scan_id: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    protocol: Optional[str] = None,
+    service: Optional[str] = None,
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+) -> Iterator[Record]:
+    """Validate an export request and return its lazy (cursor, record) iterator.
+
+    Problems are raised here rather than mid-stream: ValueError for a bad
+    dataset or cursor (including one whose scan or tunnel is gone, which
+    would otherwise end the export early), KeyError for an unknown scan_id. status and kind
+    (scan_type / tunnel type) filter scans and tunnels; the other filters
+    apply to services.
+    """
+    if dataset not in EXPORT_COLUMNS:
+        raise ValueError(f"Unknown dataset '{dataset}' (use {', '.join(EXPORT_COLUMNS)})")
+
+    if dataset == "services":
+        filters = {"host": host, "port": port, "protocol": protocol, "service": service}
+        if scan_id is not None:
+            summary = scan_store.get(scan_id)
+            if summary is None:
+                raise KeyError(scan_id)
+            if cursor and not cursor.isdigit():
+                raise ValueError(f"Invalid cursor: '{cursor}'")
+            records = _scan_services(summary, int(cursor) + 1 if cursor else 0, filters)
+        else:
+            if cursor:
+                catalog._decode_cursor(cursor)  # Raises ValueError now, not mid-stream
+            records = _catalog_services(catalog, cursor, filters)
+    elif dataset == "scans":
+        if cursor and cursor not in scan_store:
+            raise ValueError(f"Cursor '{cursor}' is no longer valid: that scan was evicted")
+        records = _scans(scan_store, cursor, status, kind)
+    else:
+        if cursor and tunnel_manager.get_tunnel(cursor) is None:
+            raise ValueError(f"Cursor '{cursor}' is no longer valid: that tunnel was deleted")
+        records = _tunnels(tunnel_manager, cursor, status, kind)
+    return records
+
+
+# ── Encoding ────────────────────────────────────────────────
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return dumps(value).decode()
+    if isinstance(value, str):
+        # One record per line, so resuming can read the cursor off the file's last line
+        return value.replace("\r", " ").replace("\n", " ")
+    return "" if value is None else value
+
+
+def encode(
+    records: Iterable[Record],
+    fmt: str,
+    columns: Tuple[str, ...],
+    include_cursor: bool = False,
+    limit: Optional[int] = None,
+) -> Iterator[bytes]:
+    """Encode records as NDJSON or CSV, one chunk per batch (the CSV header is its own chunk)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (use {', '.join(EXPORT_FORMATS)})")
+    if include_cursor:
+        columns = columns + (CURSOR_FIELD,)
+    if limit is not None:
+        records = islice(records, max(0, limit))
+    return _encode_csv(records, columns, include_cursor) if fmt == "csv" else _encode_ndjson(records, columns, include_cursor)
+
+
+def _batches(records: Iterable[Record]) -> Iterator[List[Record]]:
+    records = iter(records)
+    while True:
+        batch = list(islice(records, config.EXPORT_BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+
+def _encode_ndjson(records: Iterable[Record], columns: Tuple[str, ...], include_cursor: bool) -> Iterator[bytes]:
+    for batch in _batches(records):
+        lines = []
+        for cursor, record in batch:
+            row = {column: record.get(column) for column in columns}
+            if include_cursor:
+                row[CURSOR_FIELD] = cursor
+            lines.append(dumps(row))
+        yield b"\n".join(lines) + b"\n"
+
+
+def _encode_csv(records: Iterable[Record], columns: Tuple[str, ...], include_cursor: bool) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+    for batch in _batches(records):
+        buffer.seek(0)
+        buffer.truncate()
+        for cursor, record in batch:
+            row = [_csv_value(record.get(column)) for column in columns]
+            if include_cursor:
+                row[-1] = cursor
+            writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+
+
+# ── Downloading (CLI) ───────────────────────────────────────
+
+def download(
+    base_url: str,
+    dataset: str,
+    fmt: str,
+    path: str,
+    params: Optional[Dict] = None,
+    resume: bool = False,
+    timeout: float = 30.0,
+) -> Dict:
+    """Stream an export from a running web server into path, chunk by chunk.
+
+    Cursors are always requested, so an interrupted download can be resumed:
+    with resume=True a partial last line is cut off and the export continues
+    after the last complete record's cursor.
+
+    Returns:
+        Dict with keys: path, records (written this run), bytes, resumed_from
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}' (use {', '.join(EXPORT_FORMATS)})")
+    query = {k: v for k, v in (params or {}).items() if v is not None}
+    query["include_cursor"] = "true"
+
+    cursor, existing = None, 0
+    if resume and os.path.exists(path):
+        with open(path, "r+b") as f:
+            existing = complete_length(f)
+            f.truncate(existing)
+        cursor = last_cursor(path, fmt) if existing else None
+        if cursor:
+            query["cursor"] = cursor
+    url = f"{base_url.rstrip('/')}/api/export/{dataset}.{fmt}?{urlencode(query)}"
+
+    try:
+        response = urlopen(url, timeout=timeout)
+    except HTTPError as e:
+        try:
+            detail = json.loads(e.read()).get("detail", e.reason)
+        except (ValueError, AttributeError):
+            detail = e.reason
+        raise RuntimeError(f"Export failed ({e.code}): {detail}")
+    except URLError as e:
+        raise RuntimeError(f"Cannot reach {base_url}: {e.reason}")
+
+    # A resumed CSV already has its header
+    skip_header = fmt == "csv" and existing > 0
+    lines = written = 0
+    with response, open(path, "ab" if existing else "wb") as out:
+        while True:
+            chunk = response.read(_DOWNLOAD_CHUNK)
+            if not chunk:
+                break
+            if skip_header:
+                newline = chunk.find(b"\n")
+                if newline < 0:
+                    continue
+                chunk, skip_header = chunk[newline + 1:], False
+            out.write(chunk)
+            lines += chunk.count(b"\n")
+            written += len(chunk)
+
+    records = lines - 1 if fmt == "csv" and not existing and lines else lines
+    return {"path": path, "records": records, "bytes": written, "resumed_from": cursor}
+
+
+# ── Resuming ────────────────────────────────────────────────
+
+def last_cursor(path: str, fmt: str) -> Optional[str]:
+    """The resume cursor on the last complete record of an export file, if any.
+
+    Reads only the file's tail. A trailing partial line (interrupted write)
+    is ignored; cut it off at complete_length() before appending.
+    """
+    line = _last_line(path)
+    if not line:
+        return None
+    if fmt == "ndjson":
+        try:
+            return json.loads(line).get(CURSOR_FIELD)
+        except (ValueError, AttributeError):
+            return None
+    row = next(csv.reader([line.decode("utf-8")]), None)
+    if not row or row[-1] == CURSOR_FIELD:
+        return None  # Header only
+    return row[-1] or None
+
+
+def _last_line(path: str, block: int = 64 * 1024) -> Optional[bytes]:
+    """Last newline-terminated line of a file (without the newline)."""
+    with open(path, "rb") as f:
+        end = complete_length(f)
+        data = b""
+        position = end
+        while position > 0:
+            step = min(block, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+            lines = data[:-1].rsplit(b"\n", 1)  # data ends with the final newline
+            if len(lines) == 2 or position == 0:
+                return lines[-1] or None
+    return None
+
+
+def complete_length(f) -> int:
+    """Length of an open binary file up to and including its last newline."""
+    f.seek(0, io.SEEK_END)
+    position = f.tell()
+    while position > 0:
+        step = min(64 * 1024, position)
+        f.seek(position - step)
+        chunk = f.read(step)
+        newline = chunk.rfind(b"\n")
+        if newline >= 0:
+            return position - step + newline + 1
+        position -= step
+    return 0
@@ -1,13 +1,16 @@
 import typer
 import sys
 import signal
+from typing import List
 from MudaleTunnelUI import MudaleTunnelUI
-from tunnel_manager import TunnelManager
+from tunnel_manager import SSH_TRANSPORT_PROFILES, TunnelManager
 import config
 
 app = typer.Typer()
 tunnel_manager = TunnelManager()
 
+_TRANSPORT_HELP = f"SSH transport profile: {', '.join(SSH_TRANSPORT_PROFILES)} (default: MUDALETUNNEL_SSH_PROFILE)"
+
 
 def signal_handler(sig, frame):
     """Handle Ctrl+C gracefully."""
@@ -30,78 +33,93 @@ def cli():
 @app.command()
 def static(
     ssh_user: str = typer.Option(..., "--user", "-u", help="SSH username"),
-    ssh_host: str = typer.Option(..., "--host", "-h", help="SSH host"),
+    ssh_host: str = typer.Option(None, "--host", "-h", help="SSH host (optional with --via)"),
     target_host: str = typer.Option(..., "--target", "-t", help="Target host"),
     remote_port: int = typer.Option(..., "--port", "-p", help="Remote port"),
     local_port: int = typer.Option(None, "--local-port", "-l", help="Local port (default: same as remote)"),
-    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically")
+    via: List[str] = typer.Option([], "--via", help="Candidate jump host; the fastest reachable is used (repeatable)"),
+    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically"),
+    transport: str = typer.Option(None, "--transport", help=_TRANSPORT_HELP),
 ):
     """Create a static SSH tunnel (local port forwarding - ssh -L)."""
     signal.signal(signal.SIGINT, signal_handler)
     ui = MudaleTunnelUI(tunnel_manager)
-    ui.create_static_tunnel(ssh_user, ssh_host, target_host, remote_port, local_port, execute)
+    ui.create_static_tunnel(ssh_user, ssh_host, target_host, remote_port, local_port, execute, via, transport)
 
 
 @app.command()
 def dynamic(
     ssh_user: str = typer.Option(..., "--user", "-u", help="SSH username"),
-    ssh_host: str = typer.Option(..., "--host", "-h", help="SSH host"),
+    ssh_host: str = typer.Option(None, "--host", "-h", help="SSH host (optional with --via)"),
     local_port: int = typer.Option(None, "--port", "-p", help="Local SOCKS port (default: auto)"),
-    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically")
+    via: List[str] = typer.Option([], "--via", help="Candidate jump host; the fastest reachable is used (repeatable)"),
+    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically"),
+    transport: str = typer.Option(None, "--transport", help=_TRANSPORT_HELP),
 ):
     """Create a dynamic SSH tunnel (SOCKS proxy - ssh -D)."""
     signal.signal(signal.SIGINT, signal_handler)
     ui = MudaleTunnelUI(tunnel_manager)
-    ui.create_dynamic_tunnel(ssh_user, ssh_host, local_port, execute)
+    ui.create_dynamic_tunnel(ssh_user, ssh_host, local_port, execute, via, transport)
 
 
 @app.command()
 def remote(
     ssh_user: str = typer.Option(..., "--user", "-u", help="SSH username (on attacker machine)"),
-    ssh_host: str = typer.Option(..., "--host", "-h", help="SSH host (attacker IP)"),
+    ssh_host: str = typer.Option(None, "--host", "-h", help="SSH host (attacker IP; optional with --via)"),
     remote_bind_port: int = typer.Option(..., "--bind-port", "-b", help="Remote bind port (on attacker machine)"),
     target_host: str = typer.Option(..., "--target", "-t", help="Target host (internal service)"),
     target_port: int = typer.Option(..., "--target-port", "-p", help="Target port (internal service)"),
     bind_address: str = typer.Option("127.0.0.1", "--bind-addr", "-a", help="Bind address (default: 127.0.0.1)"),
-    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically")
+    via: List[str] = typer.Option([], "--via", help="Candidate jump host; the fastest reachable is used (repeatable)"),
+    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically"),
+    transport: str = typer.Option(None, "--transport", help=_TRANSPORT_HELP),
 ):
     """Create a remote SSH tunnel (reverse port forwarding - ssh -R)."""
     signal.signal(signal.SIGINT, signal_handler)
     ui = MudaleTunnelUI(tunnel_manager)
-    ui.create_remote_tunnel(ssh_user, ssh_host, remote_bind_port, target_host, target_port, bind_address, execute)
+    ui.create_remote_tunnel(ssh_user, ssh_host, remote_bind_port, target_host, target_port, bind_address, execute, via, transport)
 
 
 @app.command()
 def remote_dynamic(
     ssh_user: str = typer.Option(..., "--user", "-u", help="SSH username (on attacker machine)"),
-    ssh_host: str = typer.Option(..., "--host", "-h", help="SSH host (attacker IP)"),
+    ssh_host: str = typer.Option(None, "--host", "-h", help="SSH host (attacker IP; optional with --via)"),
     remote_socks_port: int = typer.Option(..., "--socks-port", "-p", help="Remote SOCKS port (on attacker machine)"),
     bind_address: str = typer.Option("127.0.0.1", "--bind-addr", "-a", help="Bind address (default: 127.0.0.1)"),
-    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically")
+    via: List[str] = typer.Option([], "--via", help="Candidate jump host; the fastest reachable is used (repeatable)"),
+    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically"),
+    transport: str = typer.Option(None, "--transport", help=_TRANSPORT_HELP),
 ):
     """Create a remote dynamic SSH tunnel (reverse SOCKS proxy - ssh -R port). Requires OpenSSH 7.6+."""
     signal.signal(signal.SIGINT, signal_handler)
     ui = MudaleTunnelUI(tunnel_manager)
-    ui.create_remote_dynamic_tunnel(ssh_user, ssh_host, remote_socks_port, bind_address, execute)
+    ui.create_remote_dynamic_tunnel(ssh_user, ssh_host, remote_socks_port, bind_address, execute, via, transport)
 
 
 @app.command()
 def web(
     port: int = typer.Option(config.DEFAULT_WEB_PORT, "--port", "-p", help="Port for web server"),
-    host: str = typer.Option(config.DEFAULT_WEB_HOST, "--host", "-h", help="Host for web server")
+    host: str = typer.Option(config.DEFAULT_WEB_HOST, "--host", "-h", help="Host for web server"),
+    agents: List[str] = typer.Option([], "--agent", "-a", help="Agent node to coordinate, as name=http://host:port (repeatable)"),
+    token: str = typer.Option(config.AGENT_TOKEN, "--token", help="Shared agent token (X-MudaleTunnel-Token)")
 ):
     """Run MudaleTunnel in web interface mode."""
     import uvicorn
-    from web_app import app as web_app
+    import web_app as web_module
+    from node_pool import NodePool
     
     # Share tunnel manager instance
-    web_app.tunnel_manager = tunnel_manager
+    web_module.tunnel_manager = tunnel_manager
+    if agents:
+        web_module.node_pool = NodePool.from_specs(agents, token=token or None)
     
     print(f"[green]Starting MudaleTunnel web interface...[/green]")
     print(f"[cyan]Open your browser at: http://{host}:{port}[/cyan]")
+    if web_module.node_pool:
+        print(f"[cyan]Coordinating {len(web_module.node_pool.nodes)} agent node(s)[/cyan]")
     
     try:
-        uvicorn.run(web_app, host=host, port=port)
+        uvicorn.run(web_module.app, host=host, port=port)
     except KeyboardInterrupt:
         print("\n[yellow]Shutting down web server...[/yellow]")
         tunnels = tunnel_manager.list_tunnels()
@@ -110,6 +128,235 @@ def web(
             tunnel_manager.stop_all_tunnels()
 
 
+@app.command()
+def tunnel_all(
+    target: str = typer.Option(..., "--target", "-t", help="Target to scan; every open TCP service is forwarded"),
+    ssh_user: str = typer.Option(..., "--user", "-u", help="SSH username"),
+    ssh_host: str = typer.Option(None, "--host", "-h", help="SSH host (optional with --via)"),
+    ports: List[int] = typer.Option([], "--port", "-p", help="Only forward these remote ports (repeatable)"),
+    local_port_start: int = typer.Option(None, "--local-port-start", "-l", help="Place forwards sequentially from this local port"),
+    via: List[str] = typer.Option([], "--via", help="Candidate jump host; the fastest reachable is used (repeatable)"),
+    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnels automatically"),
+    transport: str = typer.Option(None, "--transport", help=_TRANSPORT_HELP),
+):
+    """Scan a target and forward all open services at once (ssh -L, shared connection)."""
+    import subprocess
+    from nmap_parser import parse_nmap_services, services_to_forwards
+
+    signal.signal(signal.SIGINT, signal_handler)
+    ui = MudaleTunnelUI(tunnel_manager)
+    if not ui.check_nmap_installed():
+        print("[red]nmap is not installed[/red]")
+        raise typer.Exit(1)
+
+    print(f"Starting full nmap scan on {target}...")
+    result = subprocess.run(["nmap", "-p-", "-sV", target], stdout=subprocess.PIPE, text=True)
+    ui.display_open_services(result.stdout)
+    forwards = services_to_forwards(parse_nmap_services(result.stdout), target, ports or None)
+    ui.create_bulk_static_tunnels(ssh_user, ssh_host, forwards, local_port_start, execute, via, transport)
+
+
+@app.command()
+def portscan(
+    target: str = typer.Option(..., "--target", "-t", help="Hosts, CIDRs, ranges or hostnames (comma/space separated)"),
+    exclude: str = typer.Option(None, "--exclude", "-x", help="Targets to leave out (same syntax as --target)"),
+    ports: str = typer.Option(None, "--ports", "-p", help="Port spec, e.g. 22,80,8000-8100 (default: common ports)"),
+    full: bool = typer.Option(False, "--full", help="Scan all 65535 ports"),
+    concurrency: int = typer.Option(config.PORTSCAN_CONCURRENCY, "--concurrency", "-c", help="Connects in flight"),
+    socks: List[str] = typer.Option([], "--socks", "-s", help="Scan through a local SOCKS5 proxy, host:port (repeatable; probes are spread across them)")
+):
+    """Fast built-in TCP connect scan (no nmap needed), direct or through SOCKS tunnels."""
+    from port_scan import CONNECT_SCAN_PROFILES, expand_targets, run_connect_scan
+    from socks_scan import parse_ports
+    from target_set import TargetSet
+
+    try:
+        hosts = expand_targets(TargetSet.parse(target, exclude))
+        port_list = parse_ports(ports or CONNECT_SCAN_PROFILES["connect_full" if full else "connect"]["ports"])
+        proxies = []
+        for proxy in socks:
+            proxy_host, _, proxy_port = proxy.rpartition(":")
+            proxies.append((proxy_host or "127.0.0.1", int(proxy_port)))
+    except ValueError as e:
+        print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+    print(f"Scanning {len(hosts)} host(s) x {len(port_list)} port(s)...")
+    result = run_connect_scan(hosts, port_list, concurrency, proxies)
+    stats = result["stats"]
+    MudaleTunnelUI(tunnel_manager).display_open_services(result["output"])
+    print(
+        f"[cyan]{stats['open']} open, {stats['closed']} closed, {stats['filtered']} filtered "
+        f"in {stats['elapsed_s']}s ({stats['probes_per_s']} probes/s, {stats['transport']})[/cyan]"
+    )
+    if stats["unresolved"]:
+        print(f"[yellow]Could not resolve: {', '.join(stats['unresolved'])}[/yellow]")
+
+
+@app.command()
+def chain(
+    hops: List[str] = typer.Option(..., "--hop", "-j", help="Hop as [user@]host[:port], in order (repeatable; the last hop carries the forward)"),
+    ssh_user: str = typer.Option(None, "--user", "-u", help="Default SSH user for hops without one"),
+    local_port: int = typer.Option(None, "--port", "-p", help="Local SOCKS port, or local forward port with --target"),
+    target_host: str = typer.Option(None, "--target", "-t", help="Forward to this host from the last hop instead of a SOCKS proxy"),
+    target_port: int = typer.Option(None, "--target-port", help="Target port (with --target)"),
+    execute: bool = typer.Option(True, "--execute/--no-execute", help="Execute tunnel automatically"),
+    transport: str = typer.Option(None, "--transport", help=_TRANSPORT_HELP),
+):
+    """Create a multi-hop pivot chain as one ssh process (ProxyJump - ssh -J)."""
+    signal.signal(signal.SIGINT, signal_handler)
+    ui = MudaleTunnelUI(tunnel_manager)
+    forward_type = "static" if target_host else "dynamic"
+    ui.create_chain_tunnel(hops, forward_type, local_port, target_host, target_port, ssh_user, execute, transport)
+
+
+@app.command()
+def socks_pool(
+    ssh_user: str = typer.Option(..., "--user", "-u", help="SSH username"),
+    ssh_hosts: List[str] = typer.Option(..., "--host", "-h", help="SSH host for pool members (repeatable; members are spread across hosts)"),
+    size: int = typer.Option(2, "--size", "-n", help="Number of dynamic tunnels in the pool"),
+    listen_port: int = typer.Option(config.SOCKS_POOL_LISTEN_PORT, "--port", "-p", help="Local SOCKS5 front-end port"),
+    strategy: str = typer.Option("least_conn", "--strategy", "-s", help="Balancing strategy: least_conn or latency"),
+    min_size: int = typer.Option(None, "--min", help="Autoscale lower bound (default: size)"),
+    max_size: int = typer.Option(None, "--max", help="Autoscale upper bound (default: size)")
+):
+    """Run a load-balanced SOCKS5 front end over a pool of dynamic tunnels (until Ctrl+C)."""
+    import asyncio
+    from socks_pool import SocksPool
+    from tunnel_probe import TunnelProber
+
+    async def run_pool():
+        pool = SocksPool(
+            tunnel_manager, ssh_user, ssh_hosts, size=size, listen_port=listen_port,
+            strategy=strategy, min_size=min_size, max_size=max_size,
+        )
+        snapshot = await pool.start()
+        for error in snapshot.get("errors", []):
+            print(f"[red]Member failed: {error}[/red]")
+        print(f"[green]SOCKS5 pool listening on {snapshot['listen']} with {len(pool.members)} member(s)[/green]")
+        print(f"[cyan]proxychains: socks5 127.0.0.1 {pool.listen_port}[/cyan]")
+        try:
+            # Probes feed member health and the latency strategy
+            await TunnelProber(tunnel_manager).run()
+        finally:
+            await pool.stop()
+
+    try:
+        asyncio.run(run_pool())
+    except KeyboardInterrupt:
+        print("\n[yellow]Stopping SOCKS pool...[/yellow]")
+    except (ValueError, RuntimeError, OSError) as e:
+        print(f"[red]Error: {e}[/red]")
+    finally:
+        tunnel_manager.stop_all_tunnels()
+
+
+@app.command()
+def benchmark(
+    port: int = typer.Option(None, "--port", "-p", help="Local port of the tunnel (forward or SOCKS proxy)"),
+    dest: str = typer.Option(None, "--dest", "-d", help="host:port to CONNECT to through a SOCKS tunnel (omit for a port forward)"),
+    mode: str = typer.Option("echo", "--mode", "-m", help="echo (destination echoes) or sink (destination discards and closes on EOF)"),
+    megabytes: float = typer.Option(config.BENCH_DEFAULT_BYTES / (1024 * 1024), "--mb", help="Data to push through"),
+    streams: int = typer.Option(1, "--streams", "-s", help="Parallel connections for the transfer"),
+    connections: int = typer.Option(10, "--connections", "-c", help="Connection setup samples"),
+    pings: int = typer.Option(50, "--pings", help="Echo round trips for the latency distribution"),
+    offline: bool = typer.Option(False, "--offline", help="Benchmark against a local echo/sink server instead"),
+    ssh_user: str = typer.Option(None, "--user", "-u", help="Offline: go through ssh -L as this user (omit for a direct baseline)"),
+    ssh_host: str = typer.Option("localhost", "--host", "-h", help="Offline: SSH host, must be this machine"),
+    transports: List[str] = typer.Option([], "--transport", help=f"Offline: {_TRANSPORT_HELP} (repeatable; runs are compared side by side)"),
+):
+    """Measure throughput, connection setup time and latency through a tunnel."""
+    from tunnel_bench import BenchmarkError, run_benchmark, run_offline_benchmark
+
+    total_bytes = int(megabytes * 1024 * 1024)
+    results = []
+    try:
+        if offline:
+            if transports and not ssh_user:
+                raise ValueError("--transport needs --user (profiles only apply to ssh)")
+            for transport in transports or [None]:
+                print(f"Benchmarking {'ssh ' + ssh_host if ssh_user else 'direct'} ({transport or 'default'})...")
+                results.append(run_offline_benchmark(
+                    tunnel_manager, ssh_user, ssh_host, transport, mode, total_bytes, streams, connections, pings,
+                ))
+        else:
+            if port is None:
+                raise ValueError("--port is required (or use --offline)")
+            socks_dest = None
+            if dest:
+                dest_host, _, dest_port = dest.rpartition(":")
+                socks_dest = (dest_host, int(dest_port))
+            print(f"Benchmarking port {port}{' -> ' + dest if dest else ''}...")
+            results.append(run_benchmark(port, socks_dest, mode, total_bytes, streams, connections, pings))
+    except (ValueError, RuntimeError, BenchmarkError) as e:
+        print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+    finally:
+        tunnel_manager.stop_all_tunnels()
+
+    MudaleTunnelUI(tunnel_manager).display_benchmark_results(results)
+
+
+@app.command()
+def export(
+    dataset: str = typer.Argument(..., help="services, scans or tunnels"),
+    output: str = typer.Option(..., "--output", "-o", help="File to write"),
+    fmt: str = typer.Option("ndjson", "--format", "-f", help="ndjson or csv"),
+    url: str = typer.Option(f"http://localhost:{config.DEFAULT_WEB_PORT}", "--url", help="Running web interface to export from"),
+    resume: bool = typer.Option(False, "--resume", "-r", help="Continue an interrupted export into the same file"),
+    scan_id: str = typer.Option(None, "--scan", help="Services: only this scan's services"),
+    host: str = typer.Option(None, "--host", "-h", help="Services: only this host"),
+    port: int = typer.Option(None, "--port", "-p", help="Services: only this port"),
+    protocol: str = typer.Option(None, "--protocol", help="Services: only this protocol"),
+    service: str = typer.Option(None, "--service", help="Services: only this service name"),
+    status: str = typer.Option(None, "--status", help="Scans/tunnels: only this status"),
+    kind: str = typer.Option(None, "--type", help="Scans: scan type; tunnels: tunnel type"),
+):
+    """Stream services, scans or tunnels from the web interface to an NDJSON/CSV file."""
+    from export import download
+
+    params = {
+        "scan_id": scan_id, "host": host, "port": port, "protocol": protocol,
+        "service": service, "status": status, "type": kind,
+    }
+    try:
+        result = download(url, dataset, fmt, output, params, resume)
+    except (ValueError, RuntimeError, OSError) as e:
+        print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+    resumed = f" (resumed after {result['resumed_from']})" if result["resumed_from"] else ""
+    print(f"[green]Wrote {result['records']} {dataset} record(s) to {result['path']}{resumed}[/green]")
+
+
+@app.command()
+def agent(
+    port: int = typer.Option(config.DEFAULT_AGENT_PORT, "--port", "-p", help="Port for the agent API"),
+    host: str = typer.Option(config.DEFAULT_WEB_HOST, "--host", "-h", help="Host for the agent API"),
+    name: str = typer.Option(None, "--name", "-n", help="Node name reported to the coordinator (default: hostname)"),
+    token: str = typer.Option(config.AGENT_TOKEN, "--token", help="Shared token required in X-MudaleTunnel-Token")
+):
+    """Run a lightweight agent exposing this machine's tunnel API to a coordinator."""
+    import uvicorn
+    from agent import create_agent_app
+
+    agent_app = create_agent_app(tunnel_manager, node_name=name, token=token)
+
+    print(f"[green]Starting MudaleTunnel agent on {host}:{port}...[/green]")
+    if not token:
+        print("[yellow]No --token set: the agent API is unauthenticated.[/yellow]")
+
+    try:
+        uvicorn.run(agent_app, host=host, port=port)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        tunnels = tunnel_manager.list_tunnels()
+        if tunnels:
+            print(f"[yellow]Stopping {len(tunnels)} active tunnel(s)...[/yellow]")
+            tunnel_manager.stop_all_tunnels()
+
+
 if __name__ == "__main__":
     # Default to CLI mode if no arguments
     if len(sys.argv) == 1:
@@ -2,23 +2,33 @@
 Shared nmap output parser.
 Used by both CLI (MudaleTunnelUI) and web interface (web_app).
 """
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 def parse_nmap_services(output: str) -> List[Dict[str, str]]:
     """
     Parse nmap output and extract open services.
 
-    Returns list of dicts with keys: port, state, service
+    Returns list of dicts with keys: port, state, service, and host when the
+    output contains a "Nmap scan report for" header (multi-host scans).
     Example: [{"port": "22/tcp", "state": "open", "service": "ssh"}]
     """
     services = []
+    host = None
 
     for line in output.splitlines():
         line = line.strip()
         if not line:
             continue
 
+        # Track which host the following port lines belong to:
+        # "Nmap scan report for example.com (10.0.0.5)" or "... for 10.0.0.5"
+        if line.startswith("Nmap scan report for "):
+            report = line[len("Nmap scan report for "):].split()
+            if report:
+                host = report[-1].strip("()")
+            continue
+
         # Match nmap port output: "22/tcp open ssh" or "80/tcp open http Apache 2.4"
         if ("/tcp" not in line and "/udp" not in line) or "open" not in line:
             continue
@@ -40,10 +50,40 @@ def parse_nmap_services(output: str) -> List[Dict[str, str]]:
         if service in ("filtered", "closed", "unfiltered"):
             continue
 
-        services.append({
+        entry = {
             "port": port,
             "state": state,
             "service": service,
-        })
+        }
+        if host:
+            entry["host"] = host
+        services.append(entry)
 
     return services
+
+
+def services_to_forwards(
+    services: List[Dict[str, str]],
+    default_host: Optional[str] = None,
+    ports: Optional[List[int]] = None,
+) -> List[Dict]:
+    """
+    Turn parsed open TCP services into static forward specs
+    ({"remote_host", "remote_port", "service"}), one per host/port.
+
+    Services without a "host" key use default_host; they are skipped when
+    there is none. ports optionally restricts which ports are included.
+    """
+    forwards = []
+    seen = set()
+    for svc in services:
+        port_str, _, protocol = svc.get("port", "").partition("/")
+        if protocol != "tcp" or svc.get("state") != "open" or not port_str.isdigit():
+            continue
+        port = int(port_str)
+        host = svc.get("host") or default_host
+        if not host or (ports and port not in ports) or (host, port) in seen:
+            continue
+        seen.add((host, port))
+        forwards.append({"remote_host": host, "remote_port": port, "service": svc.get("service")})
+    return forwards
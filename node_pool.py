@@ -0,0 +1,239 @@
+"""
+NodePool - Coordinator-side client for remote MudaleTunnel agents.
+
+Each agent (see agent.py) exposes the tunnel API of the box it runs on.
+The pool keeps a small pool of keep-alive HTTP connections per agent,
+queries all agents in parallel and caches each agent's last-known state so
+one slow or offline node never blocks the dashboard.
+"""
+import http.client
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import config
+
+
+AGENT_TOKEN_HEADER = "X-MudaleTunnel-Token"
+
+
+class AgentError(Exception):
+    """Raised when an agent cannot be reached or returns an invalid response."""
+
+
+class AgentNode:
+    """One remote agent: pooled HTTP connections plus cached last-known state."""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        token: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        parts = urlsplit(base_url if "://" in base_url else f"http://{base_url}")
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid agent URL: '{base_url}'")
+
+        self.name = name
+        self.base_url = f"{parts.scheme}://{parts.netloc}"
+        self.token = token
+        self.timeout = config.AGENT_TIMEOUT if timeout is None else timeout
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(
+            maxsize=config.AGENT_POOL_SIZE if pool_size is None else pool_size
+        )
+
+        self.lock = threading.Lock()
+        self.state: Optional[Dict] = None
+        self.online = False
+        self.last_seen: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.latency_ms: Optional[float] = None
+        self._fetched_at = 0.0
+
+    # ── Connection pool ─────────────────────────────────────────
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Get a pooled connection. Returns (connection, reused)."""
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _release(self, connection: http.client.HTTPConnection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        """Close all pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # ── Requests ────────────────────────────────────────────────
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+        """Send a JSON request to the agent over a pooled keep-alive connection.
+
+        Returns:
+            Tuple of (status_code, decoded_json_body)
+        """
+        headers = {"Accept": "application/json"}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if self.token:
+            headers[AGENT_TOKEN_HEADER] = self.token
+
+        # A pooled connection may have been closed by the agent; retry once on a fresh one
+        for attempt in range(2):
+            connection, reused = self._acquire()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise AgentError(f"{self.name}: {e}") from e
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+
+            try:
+                return response.status, json.loads(data) if data else {}
+            except ValueError as e:
+                raise AgentError(f"{self.name}: invalid JSON response") from e
+
+        raise AgentError(f"{self.name}: request failed")  # pragma: no cover
+
+    def refresh(self) -> Dict:
+        """Fetch the agent's tunnel state, falling back to the cached copy on failure."""
+        started = time.monotonic()
+        try:
+            status, state = self.request("GET", "/agent/state")
+            if status != 200:
+                raise AgentError(f"{self.name}: HTTP {status} {state.get('detail', '')}".strip())
+        except AgentError as e:
+            with self.lock:
+                self.online = False
+                self.last_error = str(e)
+                self._fetched_at = time.monotonic()
+            return self.snapshot()
+
+        with self.lock:
+            self.state = state
+            self.online = True
+            self.last_error = None
+            self.last_seen = datetime.now().isoformat()
+            self.latency_ms = round((time.monotonic() - started) * 1000, 2)
+            self._fetched_at = time.monotonic()
+        return self.snapshot()
+
+    def is_fresh(self, max_age: float) -> bool:
+        with self.lock:
+            return bool(self._fetched_at) and (time.monotonic() - self._fetched_at) < max_age
+
+    def invalidate(self):
+        """Force the next refresh to query the agent."""
+        with self.lock:
+            self._fetched_at = 0.0
+
+    def snapshot(self) -> Dict:
+        """Cached node status; tunnels are the last-known list even when offline."""
+        with self.lock:
+            tunnels = list((self.state or {}).get("tunnels", []))
+            return {
+                "name": self.name,
+                "url": self.base_url,
+                "online": self.online,
+                "stale": not self.online and self.state is not None,
+                "last_seen": self.last_seen,
+                "last_error": self.last_error,
+                "latency_ms": self.latency_ms,
+                "tunnel_count": len(tunnels),
+                "tunnels": tunnels,
+            }
+
+
+class NodePool:
+    """Fan-out queries across agents with per-node caching."""
+
+    def __init__(self, nodes: Optional[List[AgentNode]] = None):
+        self.nodes: Dict[str, AgentNode] = {}
+        for node in nodes or []:
+            if node.name in self.nodes or node.name == config.LOCAL_NODE_NAME:
+                raise ValueError(f"Duplicate or reserved node name: '{node.name}'")
+            self.nodes[node.name] = node
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def from_specs(cls, specs: List[str], token: Optional[str] = None) -> "NodePool":
+        """Build a pool from 'name=url' (or bare 'url') specs."""
+        nodes = []
+        for index, spec in enumerate(s.strip() for s in specs):
+            if not spec:
+                continue
+            name, sep, url = spec.partition("=")
+            if not sep:
+                name, url = f"node{index + 1}", spec
+            nodes.append(AgentNode(name.strip(), url.strip(), token=token))
+        return cls(nodes)
+
+    def __bool__(self) -> bool:
+        return bool(self.nodes)
+
+    def get(self, name: str) -> Optional[AgentNode]:
+        return self.nodes.get(name)
+
+    def refresh(self, max_age: Optional[float] = None) -> List[Dict]:
+        """Query every node whose cached state is older than max_age, in parallel.
+
+        Concurrent callers share one fan-out instead of each hitting every agent.
+        """
+        if max_age is None:
+            max_age = config.AGENT_CACHE_TTL
+
+        with self._refresh_lock:
+            stale = [node for node in self.nodes.values() if not node.is_fresh(max_age)]
+            if stale:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=min(config.AGENT_MAX_WORKERS, len(self.nodes)),
+                        thread_name_prefix="agent-fanout",
+                    )
+                # Each node refresh swallows its own errors, so this never raises
+                list(self._executor.map(AgentNode.refresh, stale))
+
+        return [node.snapshot() for node in self.nodes.values()]
+
+    def close(self):
+        """Close pooled connections and the fan-out executor."""
+        for node in self.nodes.values():
+            node.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,283 @@
+"""
+ConnectScanner - Built-in asyncio TCP connect scanner.
+
+For the common "what is open on these hosts" question nmap's per-process
+startup and fixed timing are overkill, and it is not always installed. This
+scanner keeps thousands of non-blocking connects in flight on one event loop:
+
+- direct: plain TCP connect (refused = closed, no answer = filtered)
+- socks5: CONNECT through one or more local SOCKS proxies (dynamic tunnels),
+          probes spread round-robin across them; the proxy's reply code tells
+          open from closed
+
+Timeouts adapt per host from observed connect RTTs (SRTT + 4 * RTTVAR, as TCP
+does for retransmission), so responsive hosts are scanned quickly while slow
+links still get time to answer. Results use the parse_nmap_services shape.
+"""
+import asyncio
+import socket
+import struct
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from socks_scan import QUICK_PORTS
+from target_set import TargetSet
+from tunnel_probe import socks5_connect_request
+import config
+
+
+# scan_type -> port list (overridable per request)
+CONNECT_SCAN_PROFILES = {
+    "connect": {"ports": QUICK_PORTS},
+    "connect_full": {"ports": "1-65535"},
+}
+
+_SOCKS5_CLOSED_REPLY = 5  # "connection refused" from the far side
+
+_LINGER_RESET = struct.pack("ii", 1, 0)
+
+
+# ── Targets ─────────────────────────────────────────────────
+
+def expand_targets(target: Union[str, TargetSet]) -> List[str]:
+    """Expand targets (a string or compiled TargetSet) into individual hosts."""
+    targets = target if isinstance(target, TargetSet) else TargetSet.parse(target)
+    check_target_size(targets)
+    return list(targets.iter_hosts())
+
+
+def check_target_size(targets: TargetSet):
+    if targets.has_prefixed_hostnames():
+        raise ValueError("hostname/prefix targets (e.g. example.com/24) need an nmap scan type")
+    if targets.size > config.PORTSCAN_MAX_HOSTS:
+        raise ValueError(f"Too many hosts in target (limit {config.PORTSCAN_MAX_HOSTS})")
+
+
+def service_name(port: int) -> str:
+    try:
+        return socket.getservbyport(port, "tcp")
+    except OSError:
+        return "unknown"
+
+
+def format_output(services: List[Dict], hosts: Sequence[str], stats: Dict) -> str:
+    """Render results as nmap-style text so parse_nmap_services and the UI can read it."""
+    by_host: Dict[str, List[Dict]] = {}
+    for svc in services:
+        by_host.setdefault(svc["host"], []).append(svc)
+
+    lines = [f"# MudaleTunnel connect scan: {stats['probes']} probes in {stats['elapsed_s']}s ({stats['transport']})"]
+    for host in hosts:
+        if host not in by_host:
+            continue
+        lines += ["", f"Nmap scan report for {host}", "PORT      STATE SERVICE"]
+        for svc in by_host[host]:
+            lines.append(f"{svc['port']:<9} {svc['state']:<5} {svc['service']}")
+    lines += ["", f"# {stats['open']} open, {stats['closed']} closed, {stats['filtered']} filtered"]
+    return "\n".join(lines) + "\n"
+
+
+# ── Adaptive timeouts ───────────────────────────────────────
+
+class _RttEstimator:
+    """Per-host connect timeout from smoothed RTT (RFC 6298 style)."""
+
+    __slots__ = ("srtt", "rttvar")
+
+    def __init__(self):
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+
+    def sample(self, rtt: float):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return config.PORTSCAN_TIMEOUT
+        return min(config.PORTSCAN_MAX_TIMEOUT, max(config.PORTSCAN_MIN_TIMEOUT, self.srtt + 4 * self.rttvar))
+
+
+# ── Scanner ─────────────────────────────────────────────────
+
+def _fd_limited(concurrency: int) -> int:
+    """Keep in-flight sockets under the process file descriptor limit."""
+    try:
+        import resource
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    except (ImportError, ValueError, OSError):
+        return concurrency
+    if soft == resource.RLIM_INFINITY:
+        return concurrency
+    return max(1, min(concurrency, soft - 64))
+
+
+class ConnectScanner:
+    """Asyncio TCP connect scanner, direct or through SOCKS5 proxies."""
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        socks_proxies: Optional[List[Tuple[str, int]]] = None,
+    ):
+        self.concurrency = _fd_limited(concurrency or config.PORTSCAN_CONCURRENCY)
+        self.socks_proxies = list(socks_proxies or [])
+        self._rtt: Dict[str, _RttEstimator] = {}
+        self._next_proxy = 0
+        self.proxy_errors = 0
+
+    @property
+    def transport(self) -> str:
+        return f"socks5 x{len(self.socks_proxies)}" if self.socks_proxies else "direct"
+
+    async def _connect_direct(self, family: int, address: str, port: int, timeout: float) -> Tuple[str, Optional[float]]:
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (address, port)), timeout)
+            if sock.getsockname() == sock.getpeername():
+                return "closed", None  # TCP self-connect on a local ephemeral port, not a listener
+            # Reset instead of FIN so scanning doesn't pile up TIME_WAIT sockets
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+            return "open", time.perf_counter() - started
+        except ConnectionRefusedError:
+            return "closed", time.perf_counter() - started
+        except (asyncio.TimeoutError, OSError):
+            return "filtered", None  # No answer, or host/network unreachable
+        finally:
+            sock.close()
+
+    @staticmethod
+    async def _read_socks_replies(reader: asyncio.StreamReader) -> Tuple[bytes, bytes]:
+        greeting = await reader.readexactly(2)
+        return greeting, await reader.readexactly(4)
+
+    async def _connect_socks(self, host: str, port: int, timeout: float) -> Tuple[str, Optional[float]]:
+        proxy_host, proxy_port = self.socks_proxies[self._next_proxy % len(self.socks_proxies)]
+        self._next_proxy += 1
+        writer = None
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(proxy_host, proxy_port), timeout)
+            # Greeting and CONNECT pipelined: one round trip to the proxy
+            writer.write(b"\x05\x01\x00" + socks5_connect_request(host, port))
+            await writer.drain()
+            greeting, reply = await asyncio.wait_for(self._read_socks_replies(reader), timeout)
+        except asyncio.TimeoutError:
+            return "filtered", None
+        except (OSError, asyncio.IncompleteReadError):
+            self.proxy_errors += 1
+            return "filtered", None
+        finally:
+            if writer is not None:
+                writer.close()
+        if greeting != b"\x05\x00":
+            self.proxy_errors += 1
+            return "filtered", None
+        rtt = time.perf_counter() - started
+        if reply[1] == 0:
+            return "open", rtt
+        if reply[1] == _SOCKS5_CLOSED_REPLY:
+            return "closed", rtt
+        return "filtered", None
+
+    async def probe(self, host: str, port: int, family: int = socket.AF_INET, address: Optional[str] = None) -> str:
+        """Probe one port. Returns 'open', 'closed' or 'filtered'."""
+        estimator = self._rtt.setdefault(host, _RttEstimator())
+        if self.socks_proxies:
+            state, rtt = await self._connect_socks(host, port, estimator.timeout())
+        else:
+            state, rtt = await self._connect_direct(family, address or host, port, estimator.timeout())
+        if rtt is not None:
+            estimator.sample(rtt)
+        return state
+
+    async def _resolve(self, hosts: List[str]) -> Tuple[Dict[str, Tuple[int, str]], List[str]]:
+        """Resolve hosts once up front (direct mode). Returns targets and unresolved names."""
+        loop = asyncio.get_running_loop()
+
+        async def resolve(host: str):
+            try:
+                infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+                family, _, _, _, sockaddr = infos[0]
+                return host, (family, sockaddr[0])
+            except (socket.gaierror, IndexError, UnicodeError):
+                return host, None
+
+        resolved = await asyncio.gather(*(resolve(h) for h in hosts))
+        return {h: r for h, r in resolved if r}, [h for h, r in resolved if not r]
+
+    async def scan(
+        self,
+        hosts: List[str],
+        ports: List[int],
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict:
+        """Scan every host x port. Returns services (open ports only) and stats."""
+        started = time.perf_counter()
+        if self.socks_proxies:
+            targets = {h: (socket.AF_INET, h) for h in hosts}  # Names resolved by the proxy
+            unresolved: List[str] = []
+        else:
+            targets, unresolved = await self._resolve(hosts)
+
+        scan_hosts = [h for h in hosts if h in targets]
+        total = len(scan_hosts) * len(ports)
+        # Ports outer, hosts inner: consecutive probes hit different hosts
+        pairs: Iterator[Tuple[str, int]] = ((h, p) for p in ports for h in scan_hosts)
+        counts = {"open": 0, "closed": 0, "filtered": 0}
+        open_ports: List[Tuple[str, int]] = []
+        last_report = [0.0]
+
+        async def worker():
+            for host, port in pairs:
+                family, address = targets[host]
+                state = await self.probe(host, port, family, address)
+                counts[state] += 1
+                if state == "open":
+                    open_ports.append((host, port))
+                if progress:
+                    now = time.monotonic()
+                    if now - last_report[0] >= config.PORTSCAN_PROGRESS_INTERVAL:
+                        last_report[0] = now
+                        progress(sum(counts.values()), total)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, max(total, 1)))))
+
+        order = {h: i for i, h in enumerate(scan_hosts)}
+        open_ports.sort(key=lambda hp: (order[hp[0]], hp[1]))
+        services = [
+            {"port": f"{port}/tcp", "state": "open", "service": service_name(port), "host": host}
+            for host, port in open_ports
+        ]
+        elapsed = time.perf_counter() - started
+        stats = {
+            "transport": self.transport,
+            "probes": total,
+            **counts,
+            "unresolved": unresolved,
+            "proxy_errors": self.proxy_errors,
+            "concurrency": self.concurrency,
+            "elapsed_s": round(elapsed, 3),
+            "probes_per_s": round(total / elapsed, 1) if elapsed else None,
+        }
+        return {"services": services, "stats": stats, "hosts": scan_hosts}
+
+
+def run_connect_scan(
+    hosts: List[str],
+    ports: List[int],
+    concurrency: Optional[int] = None,
+    socks_proxies: Optional[List[Tuple[str, int]]] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
+    """Blocking wrapper: run a scan on its own event loop. Adds nmap-style 'output'."""
+    scanner = ConnectScanner(concurrency=concurrency, socks_proxies=socks_proxies)
+    result = asyncio.run(scanner.scan(hosts, ports, progress))
+    result["output"] = format_output(result["services"], result["hosts"], result["stats"])
+    return result
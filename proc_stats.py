@@ -0,0 +1,132 @@
+"""
+ResourceCollector - Per-tunnel CPU, memory and file descriptor accounting.
+
+Every managed ssh process is started in its own session (os.setsid) and
+runs in the foreground (TunnelManager drops ssh's -f, which would fork the
+tunnel into yet another session), so its process group id is the tunnel's
+pid and any helpers it forks (ProxyCommand, ProxyJump hops) share it. Each interval the collector makes one pass over /proc, reading
+/proc/<pid>/stat for every process and, only for processes in a managed
+tunnel's group, listing /proc/<pid>/fd. Totals per group are handed to
+TunnelManager.record_resources, which keeps bounded time series and raises
+tunnel events when a threshold is crossed.
+
+Linux only; elsewhere PROC_AVAILABLE is False and nothing is collected.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+from tunnel_manager import TunnelManager
+import config
+
+
+PROC_ROOT = "/proc"
+PROC_AVAILABLE = os.path.isdir(os.path.join(PROC_ROOT, "self", "fd"))
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# /proc/<pid>/stat fields, counted from the first one after "(comm)"
+_STAT_PGRP = 2
+_STAT_UTIME = 11
+_STAT_STIME = 12
+_STAT_RSS = 21
+
+
+def _read_stat(pid: str) -> Optional[Dict]:
+    """pgrp, cpu seconds and RSS bytes of one process (None if it is gone)."""
+    try:
+        with open(os.path.join(PROC_ROOT, pid, "stat"), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces and parentheses; it ends at the last ")"
+    fields = data[data.rfind(b")") + 2:].split()
+    try:
+        return {
+            "pgrp": int(fields[_STAT_PGRP]),
+            "cpu_seconds": (int(fields[_STAT_UTIME]) + int(fields[_STAT_STIME])) / _CLOCK_TICKS,
+            "rss_bytes": int(fields[_STAT_RSS]) * _PAGE_SIZE,
+        }
+    except (IndexError, ValueError):
+        return None
+
+
+def _count_fds(pid: str) -> Dict[str, int]:
+    """Open file descriptors and how many of them are sockets."""
+    fd_dir = os.path.join(PROC_ROOT, pid, "fd")
+    fds = sockets = 0
+    try:
+        names = os.listdir(fd_dir)
+    except OSError:  # Exited, or not ours to inspect
+        return {"fds": 0, "sockets": 0}
+    for name in names:
+        fds += 1
+        try:
+            if os.readlink(os.path.join(fd_dir, name)).startswith("socket:"):
+                sockets += 1
+        except OSError:
+            pass  # Closed between listdir and readlink
+    return {"fds": fds, "sockets": sockets}
+
+
+def collect_groups(pgids: Iterable[int]) -> Dict[int, Dict]:
+    """Sum resource usage per process group in one pass over /proc.
+
+    Groups with no live process are left out of the result.
+    """
+    wanted = set(pgids)
+    totals: Dict[int, Dict] = {}
+    if not wanted or not PROC_AVAILABLE:
+        return totals
+    for pid in os.listdir(PROC_ROOT):
+        if not pid.isdigit():
+            continue
+        stat = _read_stat(pid)
+        if stat is None or stat["pgrp"] not in wanted:
+            continue
+        group = totals.setdefault(stat["pgrp"], {
+            "processes": 0, "cpu_seconds": 0.0, "rss_bytes": 0, "fds": 0, "sockets": 0,
+        })
+        group["processes"] += 1
+        group["cpu_seconds"] += stat["cpu_seconds"]
+        group["rss_bytes"] += stat["rss_bytes"]
+        for key, value in _count_fds(pid).items():
+            group[key] += value
+    return totals
+
+
+class ResourceCollector:
+    """Samples every active tunnel's process group, RESOURCE_INTERVAL apart."""
+
+    def __init__(self, tunnel_manager: TunnelManager):
+        self.tunnel_manager = tunnel_manager
+
+    def sample(self) -> Dict[str, Dict]:
+        """One /proc pass for all active tunnels; records and returns the samples by tunnel id."""
+        self.tunnel_manager.poll_revision()
+        with self.tunnel_manager.lock:
+            groups = {
+                tunnel["pid"]: tunnel_id
+                for tunnel_id, tunnel in self.tunnel_manager.active_tunnels.items()
+                if tunnel.get("status") == "active" and tunnel.get("pid")
+            }
+        at = time.time()
+        samples = {}
+        for pgid, usage in collect_groups(groups).items():
+            tunnel_id = groups[pgid]
+            samples[tunnel_id] = self.tunnel_manager.record_resources(tunnel_id, {"at": at, **usage})
+        return samples
+
+    async def run(self, interval: Optional[float] = None):
+        """Sample forever, every interval seconds (the /proc pass runs in a worker thread)."""
+        interval = config.RESOURCE_INTERVAL if interval is None else interval
+        while True:
+            try:
+                await asyncio.to_thread(self.sample)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # A bad sample must never kill the loop
+            await asyncio.sleep(interval)
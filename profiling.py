@@ -0,0 +1,274 @@
+"""
+Opt-in profiling hooks for the web server and TunnelManager.
+
+Enabled with MUDALETUNNEL_PROFILING=1. When disabled nothing here is wired
+in: the timing middleware is not installed and TunnelManager uses a plain
+RLock, so the cost is zero rather than "small".
+
+- RequestTimingMiddleware: per-route latency stats (RequestTimings),
+  Server-Timing header, slow-request log lines
+- SamplingProfiler: samples every thread's stack for N seconds and returns
+  collapsed stacks ("frame;frame;frame count"), ready for flamegraph.pl or
+  speedscope
+- TimedRLock: RLock drop-in that records how long callers wait to acquire it
+"""
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional
+
+import config
+
+
+logger = logging.getLogger("mudaletunnel.profiling")
+
+_ROUTE_SAMPLES = 256  # recent durations kept per route for percentiles
+
+
+# ── Request timing ──────────────────────────────────────────
+
+def route_key(scope, cache: Dict[object, str]) -> str:
+    """'GET /api/tunnels/{tunnel_id}' rather than one key per concrete URL.
+
+    Only valid after routing (the router stores the endpoint in the scope).
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return f"{scope['method']} <unmatched>"
+    path = cache.get(endpoint)
+    if path is None:
+        for route in getattr(scope.get("app"), "routes", ()):
+            cache[getattr(route, "endpoint", None)] = getattr(route, "path", "")
+        path = cache.get(endpoint, scope["path"])
+    return f"{scope['method']} {path}"
+
+
+class _RouteStats:
+    __slots__ = ("count", "total_ms", "max_ms", "slow", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+        self.recent: Deque[float] = deque(maxlen=_ROUTE_SAMPLES)
+
+    def record(self, duration_ms: float, slow: bool):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.slow += slow
+        self.recent.append(duration_ms)
+
+    def snapshot(self) -> Dict:
+        recent = sorted(self.recent)
+
+        def percentile(p: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 2)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(self.max_ms, 2),
+            "slow": self.slow,
+        }
+
+
+class RequestTimings:
+    """Per-route latency stats and recent slow requests."""
+
+    def __init__(self, slow_ms: Optional[float] = None):
+        self.slow_ms = config.PROFILE_SLOW_REQUEST_MS if slow_ms is None else slow_ms
+        self.routes: Dict[str, _RouteStats] = {}
+        self.slow_requests: Deque[Dict] = deque(maxlen=config.PROFILE_SLOW_REQUEST_HISTORY)
+
+    def record(self, route: str, method: str, path: str, status: int, duration_ms: float):
+        slow = duration_ms >= self.slow_ms
+        self.routes.setdefault(route, _RouteStats()).record(duration_ms, slow)
+        if slow:
+            self.slow_requests.append({
+                "route": route,
+                "path": path,
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "at": time.time(),
+            })
+            logger.warning("Slow request: %s %s -> %s in %.1f ms", method, path, status, duration_ms)
+
+    def snapshot(self) -> Dict:
+        routes = {key: stats.snapshot() for key, stats in self.routes.items()}
+        return {
+            "slow_threshold_ms": self.slow_ms,
+            # Routes costing the most total time first
+            "routes": dict(sorted(routes.items(), key=lambda item: -item[1]["count"] * (item[1]["avg_ms"] or 0))),
+            "slow_requests": list(self.slow_requests),
+        }
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware timing every HTTP request by route template.
+
+    Durations run from the request arriving to the last body chunk being
+    sent; a Server-Timing header carries the time to first byte.
+    """
+
+    def __init__(self, app, timings: RequestTimings):
+        self.app = app
+        self.timings = timings
+        self._route_paths: Dict[object, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [0]
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", f"app;dur={elapsed_ms:.1f}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.timings.record(route_key(scope, self._route_paths), scope["method"], scope["path"], status[0], duration_ms)
+
+
+# ── Sampling profiler ───────────────────────────────────────
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename})"
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler over all threads (no tracing hooks installed)."""
+
+    def __init__(self):
+        self._running = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._running.locked()
+
+    def capture(self, seconds: float, interval_ms: Optional[float] = None) -> Dict:
+        """Sample for seconds in the calling thread. Returns collapsed stacks and counts.
+
+        Raises RuntimeError if a capture is already running.
+        """
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("A profile capture is already running")
+        try:
+            return self._capture(seconds, (interval_ms or config.PROFILE_SAMPLE_INTERVAL_MS) / 1000)
+        finally:
+            self._running.release()
+
+    def _capture(self, seconds: float, interval: float) -> Dict:
+        own_thread = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                labels: List[str] = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, f"thread-{thread_id}"))
+                stacks[";".join(reversed(labels))] += 1
+            samples += 1
+            time.sleep(interval)
+
+        collapsed = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        return {"samples": samples, "interval_ms": round(interval * 1000, 2), "stacks": len(stacks), "collapsed": collapsed}
+
+
+# ── Lock-wait timing ────────────────────────────────────────
+
+_timed_locks: List["TimedRLock"] = []
+
+
+class TimedRLock:
+    """threading.RLock that records time spent waiting to acquire it.
+
+    Uncontended acquires take the non-blocking fast path and are only
+    counted; contended ones are timed and attributed to the calling function.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.RLock()
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.wait_by_caller: Counter = Counter()
+        _timed_locks.append(self)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        if self._lock.acquire(blocking=False):
+            self.acquisitions += 1
+            return True
+        if not blocking:
+            return False
+        started = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        if acquired:
+            # Counters are updated while holding the lock, so they don't race
+            waited_ms = (time.perf_counter() - started) * 1000
+            self.acquisitions += 1
+            self.contended += 1
+            self.total_wait_ms += waited_ms
+            self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+            caller = sys._getframe(1)
+            if caller.f_code.co_name == "__enter__":
+                caller = caller.f_back
+            self.wait_by_caller[caller.f_code.co_name] += waited_ms
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+    def snapshot(self) -> Dict:
+        return {
+            "name": self.name,
+            "acquisitions": self.acquisitions,
+            "contended": self.contended,
+            "total_wait_ms": round(self.total_wait_ms, 2),
+            "avg_wait_ms": round(self.total_wait_ms / self.contended, 3) if self.contended else None,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "wait_by_caller_ms": {name: round(ms, 2) for name, ms in self.wait_by_caller.most_common(10)},
+        }
+
+
+def make_lock(name: str):
+    """A TimedRLock when profiling is enabled, otherwise a plain RLock."""
+    return TimedRLock(name) if config.PROFILING_ENABLED else threading.RLock()
+
+
+def lock_stats() -> List[Dict]:
+    return [lock.snapshot() for lock in _timed_locks]
@@ -0,0 +1,226 @@
+"""
+Proxychains config generation from live SOCKS tunnels.
+
+Builds a proxychains4 config from the dynamic (and dynamic chain) tunnels
+the TunnelManager is running, with [ProxyList] entries ranked by health and
+measured probe latency. ProxychainsWriter keeps a config file in sync,
+rewriting it atomically whenever the selected proxies change.
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from tunnel_manager import TunnelManager
+import config
+
+
+CHAIN_TYPES = ("strict_chain", "dynamic_chain", "random_chain", "round_robin_chain")
+
+
+# ── Collection and ranking ──────────────────────────────────
+
+def collect_proxies(tunnel_manager: TunnelManager) -> List[Dict]:
+    """Local SOCKS proxies offered by active tunnels, ranked best first.
+
+    Healthy proxies (no failing probes) come first, ordered by probe p50
+    RTT; proxies that have not been probed yet follow, then failing ones.
+    """
+    proxies = []
+    for tunnel in tunnel_manager.list_tunnels():
+        if tunnel.get("status") != "active" or not tunnel.get("local_port"):
+            continue
+        if tunnel.get("type") != "dynamic" and not (
+            tunnel.get("type") == "chain" and tunnel.get("forward_type") == "dynamic"
+        ):
+            continue
+        latency = (tunnel_manager.get_tunnel_metrics(tunnel["id"]) or {}).get("latency") or {}
+        failing = latency.get("consecutive_failures", 0) > 0
+        proxies.append({
+            "tunnel_id": tunnel["id"],
+            "proxy_type": "socks5",
+            "host": "127.0.0.1",
+            "port": tunnel["local_port"],
+            "via": tunnel.get("chain") or tunnel.get("ssh_host"),
+            "healthy": not failing,
+            "probed": bool(latency.get("probes")),
+            "rtt_ms": latency.get("p50_rtt_ms"),
+        })
+
+    proxies.sort(key=lambda p: (
+        not p["healthy"],
+        p["rtt_ms"] is None,
+        p["rtt_ms"] if p["rtt_ms"] is not None else 0.0,
+        p["port"],
+    ))
+    return proxies
+
+
+def choose_chain_type(proxy_count: int) -> str:
+    """strict_chain for one proxy; round_robin_chain (chain_len = 1) for several.
+
+    Every listed proxy is an independent local SOCKS endpoint, not a hop:
+    dynamic_chain would route through all of them in sequence, asking one
+    tunnel's far end to connect to another tunnel's 127.0.0.1 port.
+    """
+    return "strict_chain" if proxy_count <= 1 else "round_robin_chain"
+
+
+# ── Rendering ───────────────────────────────────────────────
+
+def _entry_comment(proxy: Dict) -> str:
+    if proxy.get("tunnel_id") is None:
+        return "# manual entry"
+    rtt = f"p50 {proxy['rtt_ms']} ms" if proxy.get("rtt_ms") is not None else "not probed yet"
+    state = "healthy" if proxy["healthy"] else "FAILING"
+    return f"# tunnel {proxy['tunnel_id'][:8]} via {proxy['via']} ({state}, {rtt})"
+
+
+def render_config(proxies: List[Dict], chain_type: str, fallbacks: Optional[List[Dict]] = None) -> str:
+    """Render a proxychains4 config. Comment lines carry ranking details only."""
+    if chain_type not in CHAIN_TYPES:
+        raise ValueError(f"Unknown chain type '{chain_type}' (expected one of: {', '.join(CHAIN_TYPES)})")
+
+    lines = [
+        "# Generated by MudaleTunnel from live tunnels, best proxy first",
+        chain_type,
+    ]
+    if chain_type in ("random_chain", "round_robin_chain"):
+        lines.append("chain_len = 1")
+    lines += [
+        "proxy_dns",
+        "remote_dns_subnet 224",
+        f"tcp_read_time_out {config.PROXYCHAINS_READ_TIMEOUT_MS}",
+        f"tcp_connect_time_out {config.PROXYCHAINS_CONNECT_TIMEOUT_MS}",
+        "",
+        "[ProxyList]",
+    ]
+    for proxy in proxies:
+        lines.append(_entry_comment(proxy))
+        lines.append(f"{proxy['proxy_type']} {proxy['host']} {proxy['port']}")
+    if fallbacks:
+        lines.append("# Ranked fallbacks (not used until a rewrite promotes them):")
+        for proxy in fallbacks:
+            lines.append(f"# {proxy['proxy_type']} {proxy['host']} {proxy['port']}  {_entry_comment(proxy)[2:]}")
+    return "\n".join(lines) + "\n"
+
+
+def generate(
+    tunnel_manager: TunnelManager,
+    chain_type: Optional[str] = None,
+    max_proxies: Optional[int] = None,
+    include_unhealthy: bool = False,
+    extra_proxies: Optional[List[Dict]] = None,
+) -> Dict:
+    """Build a config from live tunnels.
+
+    Args:
+        chain_type: proxychains chain mode, or None/"auto" to pick one.
+        max_proxies: number of ranked proxies to list. Local tunnels are
+            independent entry points rather than hops of one chain, so the
+            default lists only the best one and keeps the rest as fallbacks.
+        include_unhealthy: also list proxies whose probes are failing.
+        extra_proxies: manual entries listed before the tunnels.
+    """
+    max_proxies = config.PROXYCHAINS_MAX_PROXIES if max_proxies is None else max_proxies
+    ranked = collect_proxies(tunnel_manager)
+    usable = ranked if include_unhealthy else [p for p in ranked if p["healthy"]]
+
+    extra = list(extra_proxies or [])
+    candidates = extra + usable
+    limit = max(max_proxies, len(extra))  # manual entries are always listed
+    selected, fallbacks = candidates[:limit], candidates[limit:]
+    if not chain_type or chain_type == "auto":
+        chain_type = choose_chain_type(len(selected))
+
+    return {
+        "config": render_config(selected, chain_type, fallbacks),
+        "chain_type": chain_type,
+        "proxies": selected,
+        "fallbacks": fallbacks,
+        "ranked": ranked,
+    }
+
+
+# ── Atomic file sync ────────────────────────────────────────
+
+def write_atomic(path: str, content: str):
+    """Write a file so readers never see a partial config (temp file + rename)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".proxychains-", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _significant_lines(content: str) -> List[str]:
+    """Config lines that change proxychains' behavior (ignores comments)."""
+    return [line for line in content.splitlines() if line and not line.startswith("#")]
+
+
+class ProxychainsWriter:
+    """Keeps a proxychains config file pointed at the fastest healthy proxies."""
+
+    def __init__(self, tunnel_manager: TunnelManager, path: Optional[str] = None, **options):
+        self.tunnel_manager = tunnel_manager
+        self.path = os.path.expanduser(path or config.PROXYCHAINS_OUTPUT_PATH)
+        self.options = options
+        self.enabled = False
+        self.writes = 0
+        self.last_written_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._last_lines: Optional[List[str]] = None
+
+    def sync(self, force: bool = False) -> bool:
+        """Regenerate and write the file if the effective config changed. Returns True if written."""
+        result = generate(self.tunnel_manager, **self.options)
+        if not result["proxies"]:
+            return False  # Keep the last good file rather than an empty proxy list
+        lines = _significant_lines(result["config"])
+        if not force and lines == self._last_lines:
+            return False
+        write_atomic(self.path, result["config"])
+        self._last_lines = lines
+        self.writes += 1
+        self.last_written_at = datetime.now().isoformat()
+        return True
+
+    async def run(self, interval: Optional[float] = None):
+        """Re-check after tunnel state changes and probe rounds until cancelled."""
+        interval = config.PROXYCHAINS_SYNC_INTERVAL if interval is None else interval
+        self.enabled = True
+        try:
+            while True:
+                try:
+                    self.tunnel_manager.poll_revision()
+                    await asyncio.to_thread(self.sync)
+                    self.last_error = None
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.last_error = str(e)
+                await asyncio.sleep(interval)
+        finally:
+            self.enabled = False
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "writes": self.writes,
+            "last_written_at": self.last_written_at,
+            "last_error": self.last_error,
+            "options": self.options,
+        }
@@ -0,0 +1,136 @@
+"""
+Remote bind verification for reverse (-R) tunnels.
+
+A remote or remote_dynamic tunnel has no local port to check, and unless
+ExitOnForwardFailure is set ssh keeps running when the server refuses the
+bind. Two sources tell whether the remote listener really exists:
+
+- ssh's own output: "Warning: remote port forwarding failed for listen
+  port N" (refused) or "Allocated port N for remote forward" (port 0),
+  read from the tunnel's stderr pipe without blocking
+- the SSH server's listening TCP sockets, fetched over one ssh command per
+  (user, host) and cached for REMOTE_CHECK_INTERVAL, so every reverse
+  tunnel to the same server shares a single connection per interval
+
+The second can't tell whose listener it is (the refusal may be because
+another process holds the port), so a failure in ssh's output wins.
+"""
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Set, Tuple
+
+import config
+
+
+REMOTE_TUNNEL_TYPES = ("remote", "remote_dynamic")
+
+_FORWARD_FAILED = re.compile(r"remote port forwarding failed for listen port (\d+)")
+_PORT_ALLOCATED = re.compile(r"Allocated port (\d+) for remote forward")
+
+# Linux first (always present, no tools needed), then netstat for BSD/macOS servers
+_LISTENERS_COMMAND = "cat /proc/net/tcp /proc/net/tcp6 2>/dev/null || netstat -an 2>/dev/null"
+
+_PROC_TCP_LISTEN = "0A"
+
+
+def parse_ssh_output(text: str) -> Dict:
+    """Remote forward results reported by ssh: failed listen ports and allocated ports."""
+    return {
+        "failed_ports": sorted({int(p) for p in _FORWARD_FAILED.findall(text)}),
+        "allocated_ports": sorted({int(p) for p in _PORT_ALLOCATED.findall(text)}),
+    }
+
+
+def _proc_address(hex_address: str) -> str:
+    """/proc/net/tcp local address (little-endian hex words) -> printable IP."""
+    if len(hex_address) == 8:
+        return ".".join(str(int(hex_address[i:i + 2], 16)) for i in (6, 4, 2, 0))
+    words = [hex_address[i:i + 8] for i in range(0, 32, 8)]
+    raw = "".join(w[6:8] + w[4:6] + w[2:4] + w[0:2] for w in words)
+    return ":".join(raw[i:i + 4] for i in range(0, 32, 4))
+
+
+def parse_listeners(output: str) -> Set[Tuple[str, int]]:
+    """Listening (address, port) pairs from /proc/net/tcp{,6} or `netstat -an` output."""
+    listeners = set()
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) > 3 and fields[0].endswith(":") and ":" in fields[1]:
+            # /proc/net/tcp: sl local_address rem_address st ...
+            if fields[3] == _PROC_TCP_LISTEN:
+                address, port = fields[1].rsplit(":", 1)
+                listeners.add((_proc_address(address), int(port, 16)))
+        elif "LISTEN" in fields and fields[0].lower().startswith("tcp") and len(fields) > 3:
+            # netstat: proto recv-q send-q local foreign state (port after the last "." or ":")
+            local = fields[3]
+            separator = max(local.rfind(":"), local.rfind("."))
+            if separator > 0 and local[separator + 1:].isdigit():
+                listeners.add((local[:separator], int(local[separator + 1:])))
+    return listeners
+
+
+class RemoteListenerChecker:
+    """Listening TCP ports of SSH servers, one ssh command per host per interval."""
+
+    def __init__(self, interval: Optional[float] = None, timeout: Optional[float] = None):
+        self.interval = config.REMOTE_CHECK_INTERVAL if interval is None else interval
+        self.timeout = config.REMOTE_CHECK_TIMEOUT if timeout is None else timeout
+        self._cache: Dict[Tuple[str, str], Dict] = {}
+        self._host_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.stats = {"checks": 0, "cache_hits": 0, "failures": 0}
+
+    def _run(self, ssh_user: str, ssh_host: str) -> Dict:
+        cmd = [
+            "ssh", "-o", "BatchMode=yes", "-o", f"ConnectTimeout={int(self.timeout)}",
+            f"{ssh_user}@{ssh_host}", _LISTENERS_COMMAND,
+        ]
+        result = {"host": ssh_host, "ok": False, "listeners": [], "checked_at": time.time(), "error": None}
+        try:
+            completed = subprocess.run(
+                cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                timeout=self.timeout + 5,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            result["error"] = str(e) or "timeout"
+            return result
+        listeners = parse_listeners(completed.stdout.decode(errors="replace"))
+        if not listeners and completed.returncode != 0:
+            error = completed.stderr.decode(errors="replace").strip()
+            result["error"] = error.splitlines()[-1] if error else f"ssh exited with {completed.returncode}"
+            return result
+        result.update(ok=True, listeners=sorted(listeners))
+        return result
+
+    def check(self, ssh_user: str, ssh_host: str, newer_than: float = 0.0) -> Dict:
+        """Listeners on ssh_host, from the cache if checked within the interval.
+
+        A cached result older than newer_than (epoch seconds, e.g. when the
+        tunnel was created) is not used. Concurrent callers for the same host
+        wait for one check instead of each opening a connection.
+        """
+        key = (ssh_user, ssh_host)
+        with self._lock:
+            host_lock = self._host_locks.setdefault(key, threading.Lock())
+        with host_lock:
+            cached = self._cache.get(key)
+            if cached and time.time() - cached["checked_at"] < self.interval and cached["checked_at"] >= newer_than:
+                self.stats["cache_hits"] += 1
+                return {**cached, "cached": True}
+            result = self._run(ssh_user, ssh_host)
+            self.stats["checks"] += 1
+            if not result["ok"]:
+                self.stats["failures"] += 1
+            self._cache[key] = result  # Failures too: don't hammer an unreachable host
+        return {**result, "cached": False}
+
+    def check_many(self, hosts: Dict[Tuple[str, str], float]) -> Dict[Tuple[str, str], Dict]:
+        """Check several (user, host) pairs in parallel; values are each pair's newer_than."""
+        if not hosts:
+            return {}
+        keys = list(hosts)
+        with ThreadPoolExecutor(max_workers=min(len(keys), config.REMOTE_CHECK_WORKERS)) as pool:
+            return dict(zip(keys, pool.map(lambda key: self.check(*key, newer_than=hosts[key]), keys)))
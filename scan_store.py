@@ -0,0 +1,271 @@
+"""
+ScanStore - Memory-bounded storage for scan records.
+Used by the web interface to keep scan history without unbounded growth.
+
+Each scan is split into a small in-memory summary (status, services, counters)
+and its raw nmap output, which is gzip-compressed, written through to a spill
+directory and cached in memory under an LRU byte budget.
+
+The spill root is private to the current user (0700, owned by us) and
+every store writes 0600 files into its own "<pid>-*" subdirectory, removed
+at exit, so several processes of one user never touch each other's output.
+Summaries live only in memory: subdirectories left by processes that are no
+longer running are orphans and are removed when a store starts.
+"""
+import atexit
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+
+import config
+
+
+_CHUNK_SIZE = 64 * 1024
+_GZIP_WBITS = 31  # zlib wbits for a gzip container, so spilled files work with zcat
+_FINISHED_STATUSES = ("completed", "failed")
+
+
+def _private_dir(path: str):
+    """Create path as a 0700 directory, refusing one that isn't ours."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"Scan spill dir {path} is not a directory")
+    if hasattr(os, "getuid") and info.st_uid != os.getuid():
+        raise PermissionError(f"Scan spill dir {path} is owned by another user")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != "posix":
+        return True  # No cheap check; keep the directory
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # Exists, not ours to signal
+    return True
+
+
+def _remove_orphan_spill_dirs(root: str):
+    """Delete the spill subdirectories of stores whose process has exited."""
+    for name in os.listdir(root):
+        pid, _, _ = name.partition("-")
+        path = os.path.join(root, name)
+        if pid.isdigit() and not _pid_alive(int(pid)) and os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _default_spill_dir() -> str:
+    user = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"mudaletunnel-scans-{user}")
+
+
+class ScanStore:
+    """Thread-safe scan history with compressed, disk-spilled raw output."""
+
+    def __init__(
+        self,
+        spill_dir: Optional[str] = None,
+        max_scans: Optional[int] = None,
+        blob_cache_bytes: Optional[int] = None,
+    ):
+        spill_root = spill_dir or config.SCAN_SPILL_DIR or _default_spill_dir()
+        self.max_scans = config.MAX_SCAN_HISTORY if max_scans is None else max_scans
+        self.blob_cache_bytes = config.SCAN_OUTPUT_CACHE_BYTES if blob_cache_bytes is None else blob_cache_bytes
+        self.summaries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()  # LRU: oldest first
+        self._blob_bytes = 0
+        self.lock = threading.RLock()
+        self.revision = 0  # bumped on every change; used for conditional GETs
+        _private_dir(spill_root)
+        _remove_orphan_spill_dirs(spill_root)
+        self.spill_dir = tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=spill_root)  # 0700
+        atexit.register(shutil.rmtree, self.spill_dir, ignore_errors=True)
+
+    # ── Internal helpers ────────────────────────────────────────
+
+    def _spill_path(self, scan_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{os.path.basename(scan_id)}.out.gz")
+
+    def _cache_blob(self, scan_id: str, blob: bytes):
+        """Insert a compressed blob into the LRU cache, evicting to stay in budget."""
+        with self.lock:
+            previous = self._blobs.pop(scan_id, None)
+            if previous is not None:
+                self._blob_bytes -= len(previous)
+            if len(blob) > self.blob_cache_bytes:
+                return  # Larger than the whole budget: serve from disk only
+            self._blobs[scan_id] = blob
+            self._blob_bytes += len(blob)
+            while self._blob_bytes > self.blob_cache_bytes and self._blobs:
+                _, evicted = self._blobs.popitem(last=False)
+                self._blob_bytes -= len(evicted)
+
+    def _store_output(self, scan_id: str, output: str) -> Dict:
+        """Compress raw output, spill it to disk and cache it. Returns summary fields."""
+        raw = output.encode("utf-8")
+        compressor = zlib.compressobj(config.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+        blob = compressor.compress(raw) + compressor.flush()
+
+        path = self._spill_path(scan_id)
+        tmp_path = f"{path}.tmp"
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0)
+        with os.fdopen(os.open(tmp_path, flags, 0o600), "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+        self._cache_blob(scan_id, blob)
+        return {"output_bytes": len(raw), "output_compressed_bytes": len(blob)}
+
+    def _evict_old_scans(self):
+        """Drop the oldest finished scans beyond max_scans. Caller must hold the lock."""
+        excess = len(self.summaries) - self.max_scans
+        if excess <= 0:
+            return
+        for scan_id in list(self.summaries.keys()):
+            if excess <= 0:
+                break
+            if self.summaries[scan_id].get("status") not in _FINISHED_STATUSES:
+                continue
+            self._discard(scan_id)
+            excess -= 1
+
+    def _discard(self, scan_id: str):
+        """Remove a scan's summary, cached blob and spill file. Caller must hold the lock."""
+        self.summaries.pop(scan_id, None)
+        blob = self._blobs.pop(scan_id, None)
+        if blob is not None:
+            self._blob_bytes -= len(blob)
+        try:
+            os.remove(self._spill_path(scan_id))
+        except FileNotFoundError:
+            pass
+
+    # ── Public API ──────────────────────────────────────────────
+
+    def create(self, scan_id: str, **fields) -> Dict:
+        """Register a new scan summary."""
+        with self.lock:
+            self.summaries[scan_id] = {"id": scan_id, **fields}
+            self.revision += 1
+            self._evict_old_scans()
+            return self.summaries[scan_id].copy()
+
+    def update(self, scan_id: str, **fields):
+        """Update a scan summary. A raw 'output' field is moved to blob storage."""
+        output = fields.pop("output", None)
+        if output is not None:
+            if scan_id not in self:
+                return  # Unknown or evicted: don't leave an orphan spill file
+            fields.update(self._store_output(scan_id, output))
+
+        with self.lock:
+            if scan_id not in self.summaries:
+                if output is not None:
+                    self._discard(scan_id)  # Evicted while its output was being written
+                return
+            self.summaries[scan_id].update(fields)
+            self.revision += 1
+            if fields.get("status") in _FINISHED_STATUSES:
+                self._evict_old_scans()
+
+    def get(self, scan_id: str) -> Optional[Dict]:
+        """Get a copy of a scan summary."""
+        with self.lock:
+            summary = self.summaries.get(scan_id)
+            return summary.copy() if summary is not None else None
+
+    def iter_scans(self, after: Optional[str] = None, batch: int = 100) -> Iterator[Dict]:
+        """Yield copies of scan summaries in creation order, starting after scan id after.
+
+        The lock is taken once per batch, not for the whole iteration.
+        Raises ValueError if after is no longer stored (evicted).
+        """
+        with self.lock:
+            scan_ids = list(self.summaries)
+        if after is not None:
+            if after not in self.summaries:
+                raise ValueError(f"Cursor '{after}' is no longer valid: that scan was evicted")
+            scan_ids = scan_ids[scan_ids.index(after) + 1:]
+        for start in range(0, len(scan_ids), batch):
+            with self.lock:
+                summaries = [self.summaries[s].copy() for s in scan_ids[start:start + batch] if s in self.summaries]
+            yield from summaries
+
+    def list_scans(self) -> List[Dict]:
+        """Get copies of all scan summaries."""
+        with self.lock:
+            return [summary.copy() for summary in self.summaries.values()]
+
+    def __contains__(self, scan_id: str) -> bool:
+        with self.lock:
+            return scan_id in self.summaries
+
+    def has_output(self, scan_id: str) -> bool:
+        """Check whether raw output was recorded for a scan."""
+        with self.lock:
+            return "output_bytes" in self.summaries.get(scan_id, {})
+
+    def iter_output(self, scan_id: str) -> Iterator[bytes]:
+        """Yield a scan's raw output in decompressed chunks.
+
+        Served from the in-memory cache when present, otherwise streamed from
+        the spill file without loading it fully (and re-cached for next time
+        if it fits the budget).
+        """
+        with self.lock:
+            blob = self._blobs.get(scan_id)
+            if blob is not None:
+                self._blobs.move_to_end(scan_id)
+
+        if blob is not None:
+            compressed = (blob[offset:offset + _CHUNK_SIZE] for offset in range(0, len(blob), _CHUNK_SIZE))
+            yield from self._inflate(compressed)
+            return
+
+        path = self._spill_path(scan_id)
+        if not os.path.exists(path):
+            return
+        if os.path.getsize(path) <= self.blob_cache_bytes:
+            with open(path, "rb") as f:
+                self._cache_blob(scan_id, f.read())
+        with open(path, "rb") as f:
+            yield from self._inflate(iter(lambda: f.read(_CHUNK_SIZE), b""))
+
+    @staticmethod
+    def _inflate(compressed: Iterator[bytes]) -> Iterator[bytes]:
+        """Decompress gzip chunks, yielding at most _CHUNK_SIZE bytes at a time."""
+        decompressor = zlib.decompressobj(_GZIP_WBITS)
+        for data in compressed:
+            while data:
+                chunk = decompressor.decompress(data, _CHUNK_SIZE)
+                if chunk:
+                    yield chunk
+                data = decompressor.unconsumed_tail
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+    def read_output(self, scan_id: str) -> str:
+        """Get a scan's full raw output as a string ('' if none was recorded)."""
+        return b"".join(self.iter_output(scan_id)).decode("utf-8", errors="replace")
+
+    def stats(self) -> Dict:
+        """Memory accounting for the store."""
+        with self.lock:
+            return {
+                "scans": len(self.summaries),
+                "max_scans": self.max_scans,
+                "cached_outputs": len(self._blobs),
+                "cached_output_bytes": self._blob_bytes,
+                "output_cache_budget_bytes": self.blob_cache_bytes,
+                "spill_dir": self.spill_dir,
+            }
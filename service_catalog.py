@@ -0,0 +1,204 @@
+"""
+ServiceCatalog - Incrementally maintained index of discovered services.
+Fed by completed scans, queried by the web interface (/api/services).
+"""
+import base64
+import bisect
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import config
+
+
+# (host, port number, protocol) — one entry per service, latest observation wins
+ServiceKey = Tuple[str, int, str]
+
+
+class ServiceCatalog:
+    """Deduplicated service store indexed by host, port, protocol and service name."""
+
+    def __init__(self):
+        self.services: Dict[ServiceKey, Dict] = {}
+        self._sorted_keys: List[ServiceKey] = []
+        self._by_host: Dict[str, Set[ServiceKey]] = {}
+        self._by_port: Dict[int, Set[ServiceKey]] = {}
+        self._by_protocol: Dict[str, Set[ServiceKey]] = {}
+        self._by_service: Dict[str, Set[ServiceKey]] = {}
+        self.lock = threading.Lock()
+        self.revision = 0  # bumped on every change; used for conditional GETs
+
+    # ── Internal helpers ────────────────────────────────────────
+
+    @staticmethod
+    def _split_port(port_str: str) -> Tuple[int, str]:
+        """Split nmap port string (e.g., '22/tcp' -> (22, 'tcp'))."""
+        if "/" in port_str:
+            number, protocol = port_str.split("/", 1)
+            return int(number), protocol.lower()
+        return int(port_str), "tcp"
+
+    @staticmethod
+    def _encode_cursor(key: ServiceKey) -> str:
+        """Encode a catalog key as an opaque pagination cursor."""
+        raw = json.dumps(list(key), separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> ServiceKey:
+        """Decode a pagination cursor back into a catalog key."""
+        try:
+            host, port, protocol = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return str(host), int(port), str(protocol)
+        except Exception:
+            raise ValueError(f"Invalid cursor: '{cursor}'")
+
+    def _index_add(self, key: ServiceKey, service_name: str):
+        """Add a key to every secondary index. Caller must hold the lock."""
+        host, port, protocol = key
+        self._by_host.setdefault(host, set()).add(key)
+        self._by_port.setdefault(port, set()).add(key)
+        self._by_protocol.setdefault(protocol, set()).add(key)
+        self._by_service.setdefault(service_name, set()).add(key)
+
+    def _index_discard(self, index: Dict, value, key: ServiceKey):
+        """Remove a key from one secondary index bucket. Caller must hold the lock."""
+        bucket = index.get(value)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del index[value]
+
+    # ── Ingestion ───────────────────────────────────────────────
+
+    def ingest_scan(self, scan_id: str, target: str, scan_type: str, services: List[Dict]) -> int:
+        """Merge a completed scan's services into the catalog.
+
+        Services are copied, never mutated. Entries for a (host, port, protocol)
+        already in the catalog are replaced by this newer observation.
+
+        Returns:
+            Number of services ingested
+        """
+        observed_at = datetime.now().isoformat()
+        count = 0
+
+        with self.lock:
+            for service in services:
+                try:
+                    port, protocol = self._split_port(service.get("port", ""))
+                except ValueError:
+                    continue
+
+                host = service.get("host") or target
+                service_name = service.get("service", "unknown")
+                key = (host, port, protocol)
+
+                previous = self.services.get(key)
+                if previous is None:
+                    bisect.insort(self._sorted_keys, key)
+                elif previous["service"] != service_name:
+                    self._index_discard(self._by_service, previous["service"], key)
+
+                self.services[key] = {
+                    "host": host,
+                    "port": service.get("port"),
+                    "port_number": port,
+                    "protocol": protocol,
+                    "state": service.get("state", "open"),
+                    "service": service_name,
+                    "target": target,
+                    "scan_id": scan_id,
+                    "scan_type": scan_type,
+                    "last_seen": observed_at,
+                }
+                self._index_add(key, service_name)
+                count += 1
+
+            if count:
+                self.revision += 1
+
+        return count
+
+    def clear(self):
+        """Remove all services from the catalog."""
+        with self.lock:
+            self.services.clear()
+            self._sorted_keys.clear()
+            self._by_host.clear()
+            self._by_port.clear()
+            self._by_protocol.clear()
+            self._by_service.clear()
+            self.revision += 1
+
+    # ── Queries ─────────────────────────────────────────────────
+
+    def query(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        protocol: Optional[str] = None,
+        service: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Dict:
+        """Filter services and return one page in (host, port, protocol) order.
+
+        Returns:
+            Dict with keys: services, next_cursor (None on the last page), total
+        """
+        if limit is None:
+            limit = config.SERVICE_PAGE_SIZE
+        limit = max(1, min(limit, config.SERVICE_PAGE_SIZE_MAX))
+        after = self._decode_cursor(cursor) if cursor else None
+
+        with self.lock:
+            buckets = []
+            if host is not None:
+                buckets.append(self._by_host.get(host, set()))
+            if port is not None:
+                buckets.append(self._by_port.get(port, set()))
+            if protocol is not None:
+                buckets.append(self._by_protocol.get(protocol.lower(), set()))
+            if service is not None:
+                buckets.append(self._by_service.get(service, set()))
+
+            if buckets:
+                # Intersect starting from the smallest bucket
+                buckets.sort(key=len)
+                matched = set(buckets[0])
+                for bucket in buckets[1:]:
+                    matched &= bucket
+                keys = sorted(matched)
+            else:
+                keys = self._sorted_keys
+
+            total = len(keys)
+            start = bisect.bisect_right(keys, after) if after else 0
+            page_keys = keys[start:start + limit]
+            page = [self.services[key].copy() for key in page_keys]
+
+        next_cursor = None
+        if page_keys and start + limit < total:
+            next_cursor = self._encode_cursor(page_keys[-1])
+
+        return {"services": page, "next_cursor": next_cursor, "total": total}
+
+    def iter_services(self, cursor: Optional[str] = None, batch: Optional[int] = None, **filters) -> Iterator[Tuple[str, Dict]]:
+        """Yield (cursor, service) for every match after cursor, one locked page at a time.
+
+        A yielded cursor resumes the iteration right after its service.
+        """
+        batch = batch or config.SERVICE_PAGE_SIZE
+        while True:
+            page = self.query(cursor=cursor, limit=batch, **filters)
+            for service in page["services"]:
+                cursor = self._encode_cursor((service["host"], service["port_number"], service["protocol"]))
+                yield cursor, service
+            if page["next_cursor"] is None:
+                return
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.services)
@@ -0,0 +1,381 @@
+"""
+SocksPool - Load-balanced local SOCKS5 front end over several dynamic tunnels.
+
+One `ssh -D` tunnel multiplexes every proxied connection over a single SSH
+connection. A pool runs N dynamic tunnels (to one or several hosts) and
+listens on one local port; each new client connection is handed, bytes
+untouched, to the member with the fewest active connections (or the lowest
+expected delay), so the client's SOCKS handshake is answered by that
+member's ssh process and aggregate throughput scales with the number of
+SSH connections.
+
+Members whose tunnel died or whose data-plane probes keep failing are
+skipped and replaced; the pool can be resized at runtime and, when
+min_size < max_size, grows and shrinks with load.
+"""
+import asyncio
+import time
+import uuid
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from tracing import bind
+from tunnel_manager import TunnelManager
+import config
+
+
+STRATEGIES = ("least_conn", "latency")
+
+_RELAY_CHUNK_SIZE = 64 * 1024
+
+
+class PoolMember:
+    """One dynamic tunnel behind the front end, plus its connection counters."""
+
+    def __init__(self, tunnel_id: str, ssh_host: str, port: int):
+        self.tunnel_id = tunnel_id
+        self.ssh_host = ssh_host
+        self.port = port
+        self.active = 0
+        self.total = 0
+        self.failures = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self.rtt_ms: Optional[float] = None
+        self.alive = True  # tunnel process still active
+        self.healthy = True  # alive and data-plane probes passing
+        self.draining = False
+        self.down_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def available(self, now: float) -> bool:
+        return self.healthy and not self.draining and now >= self.down_until
+
+    def snapshot(self) -> Dict:
+        return {
+            "tunnel_id": self.tunnel_id,
+            "ssh_host": self.ssh_host,
+            "port": self.port,
+            "active": self.active,
+            "total": self.total,
+            "failures": self.failures,
+            "bytes_up": self.bytes_up,
+            "bytes_down": self.bytes_down,
+            "rtt_ms": self.rtt_ms,
+            "alive": self.alive,
+            "healthy": self.healthy,
+            "draining": self.draining,
+            "last_error": self.last_error,
+        }
+
+
+class SocksPool:
+    """A local SOCKS5 listener that spreads connections across dynamic tunnels."""
+
+    def __init__(
+        self,
+        tunnel_manager: TunnelManager,
+        ssh_user: str,
+        ssh_hosts: List[str],
+        size: int = 2,
+        listen_port: Optional[int] = None,
+        listen_host: str = "127.0.0.1",
+        strategy: str = "least_conn",
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        if not ssh_hosts:
+            raise ValueError("At least one SSH host is required")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}' (expected one of: {', '.join(STRATEGIES)})")
+        min_size = size if min_size is None else min_size
+        max_size = max(size, min_size) if max_size is None else max_size
+        if not 1 <= min_size <= size <= max_size <= config.SOCKS_POOL_MAX_MEMBERS:
+            raise ValueError(
+                f"Pool sizes must satisfy 1 <= min_size <= size <= max_size <= {config.SOCKS_POOL_MAX_MEMBERS}"
+            )
+
+        self.id = str(uuid.uuid4())
+        self.tunnel_manager = tunnel_manager
+        self.ssh_user = ssh_user
+        self.ssh_hosts = list(ssh_hosts)
+        self.size = size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.listen_host = listen_host
+        self.listen_port = config.SOCKS_POOL_LISTEN_PORT if listen_port is None else listen_port
+        self.strategy = strategy
+        # Member creations can wait in the admission queue: keep them off the
+        # default executor when the caller has a dedicated one (None = default)
+        self.executor = executor
+        self.members: List[PoolMember] = []
+        self.created_at = datetime.now().isoformat()
+        self.rejected = 0
+        self._host_index = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._maintenance: Optional[asyncio.Task] = None
+        self._scale_lock = asyncio.Lock()
+        self._tasks: set = set()
+        self._clients: Set[asyncio.Task] = set()  # running _handle_client relays
+
+    # ── Member lifecycle ────────────────────────────────────────
+
+    def _allocate_ports(self, count: int) -> List[int]:
+        """Pick distinct free local ports for new members in one pass."""
+        taken = {m.port for m in self.members}
+        ports: List[int] = []
+        port = config.SOCKS_POOL_PORT_START
+        while len(ports) < count:
+            port = self.tunnel_manager._find_free_port(port)
+            if port not in taken and port != self.listen_port:
+                ports.append(port)
+            port += 1
+        return ports
+
+    def _next_host(self) -> str:
+        host = self.ssh_hosts[self._host_index % len(self.ssh_hosts)]
+        self._host_index += 1
+        return host
+
+    async def _add_members(self, count: int) -> List[str]:
+        """Create count dynamic tunnels in parallel. Returns error strings for failures."""
+        if count <= 0:
+            return []
+        ports = self._allocate_ports(count)
+        hosts = [self._next_host() for _ in ports]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                self.executor, bind(self.tunnel_manager.create_dynamic_tunnel), self.ssh_user, host, port, True,
+            )
+            for host, port in zip(hosts, ports)
+        ), return_exceptions=True)
+
+        errors = []
+        for host, port, result in zip(hosts, ports, results):
+            if isinstance(result, BaseException):
+                errors.append(f"{host}: {result}")
+                continue
+            self.members.append(PoolMember(result[0], host, port))
+        return errors
+
+    async def _remove_member(self, member: PoolMember):
+        """Stop a member's tunnel once its in-flight connections have finished."""
+        member.draining = True
+        deadline = time.monotonic() + config.SOCKS_POOL_DRAIN_TIMEOUT
+        while member.active and time.monotonic() < deadline:
+            await asyncio.sleep(0.2)
+        if member in self.members:
+            self.members.remove(member)
+        await asyncio.to_thread(self.tunnel_manager.stop_tunnel, member.tunnel_id)
+
+    def _serving_members(self) -> List[PoolMember]:
+        return [m for m in self.members if not m.draining]
+
+    async def scale(self, size: int) -> Dict:
+        """Resize the pool to size members (within min_size/max_size bounds)."""
+        if not self.min_size <= size <= self.max_size:
+            raise ValueError(f"Size must be between {self.min_size} and {self.max_size}")
+        async with self._scale_lock:
+            self.size = size
+            serving = self._serving_members()
+            errors = await self._add_members(size - len(serving))
+            if len(serving) > size:
+                # Retire the least busy members first
+                surplus = sorted(serving, key=lambda m: m.active)[:len(serving) - size]
+                for member in surplus:
+                    member.draining = True
+                await asyncio.gather(*(self._remove_member(m) for m in surplus))
+        snapshot = self.snapshot()
+        if errors:
+            snapshot["errors"] = errors
+        return snapshot
+
+    # ── Health and autoscaling ──────────────────────────────────
+
+    def refresh_health(self):
+        """Pull tunnel status and probe latency for every member from the TunnelManager."""
+        for member in self.members:
+            tunnel = self.tunnel_manager.get_tunnel(member.tunnel_id)
+            if not tunnel or tunnel.get("status") != "active":
+                member.alive = member.healthy = False
+                member.last_error = "Tunnel not active"
+                continue
+            latency = (self.tunnel_manager.get_tunnel_metrics(member.tunnel_id) or {}).get("latency") or {}
+            member.rtt_ms = latency.get("p50_rtt_ms", member.rtt_ms)
+            failing = latency.get("consecutive_failures", 0) >= config.SOCKS_POOL_MAX_PROBE_FAILURES
+            member.healthy = not failing
+            if failing:
+                member.last_error = latency.get("last_error")
+
+    async def _maintain(self):
+        """Replace dead members and follow load between min_size and max_size."""
+        self.refresh_health()
+        async with self._scale_lock:
+            dead = [m for m in self.members if not m.draining and not m.alive]
+            for member in dead:
+                self.members.remove(member)
+                await asyncio.to_thread(self.tunnel_manager.stop_tunnel, member.tunnel_id)
+
+            serving = self._serving_members()
+            if self.min_size < self.max_size and serving:
+                load = sum(m.active for m in serving) / len(serving)
+                if load >= config.SOCKS_POOL_SCALE_UP_CONNS and self.size < self.max_size:
+                    self.size += 1
+                elif load < config.SOCKS_POOL_SCALE_DOWN_CONNS and self.size > self.min_size:
+                    self.size -= 1
+
+            missing = self.size - len(serving)
+            if missing > 0:
+                await self._add_members(missing)
+            elif missing < 0:
+                idle = [m for m in sorted(serving, key=lambda m: m.active) if m.active == 0][:-missing]
+                for member in idle:
+                    member.draining = True
+                    task = asyncio.create_task(self._remove_member(member))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+    async def _maintenance_loop(self):
+        while True:
+            await asyncio.sleep(config.SOCKS_POOL_CHECK_INTERVAL)
+            try:
+                await self._maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # Maintenance must never kill the pool
+
+    # ── Connection handling ─────────────────────────────────────
+
+    def _candidates(self) -> List[PoolMember]:
+        """Available members, best first for the configured strategy."""
+        now = time.monotonic()
+        members = [m for m in self.members if m.available(now)]
+        if self.strategy == "latency":
+            known = [m.rtt_ms for m in members if m.rtt_ms is not None]
+            default_rtt = sorted(known)[len(known) // 2] if known else 1.0
+            # Expected delay: queueing behind active connections on a slower link costs more
+            return sorted(members, key=lambda m: ((m.active + 1) * (m.rtt_ms or default_rtt), m.total))
+        return sorted(members, key=lambda m: (m.active, m.total))
+
+    @staticmethod
+    async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, member: PoolMember, upstream: bool):
+        try:
+            while True:
+                data = await reader.read(_RELAY_CHUNK_SIZE)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+                if upstream:
+                    member.bytes_up += len(data)
+                else:
+                    member.bytes_down += len(data)
+            if writer.can_write_eof():
+                writer.write_eof()
+        except (OSError, RuntimeError):
+            pass
+
+    async def _handle_client(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            await self._relay_client(client_reader, client_writer)
+        except asyncio.CancelledError:
+            pass  # Cancelled by stop(); a cancelled stream callback would be logged as an error
+        finally:
+            self._clients.discard(task)
+
+    async def _relay_client(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        member = None
+        backend = None
+        for candidate in self._candidates():
+            # Count the connection before awaiting so concurrent accepts spread out
+            candidate.active += 1
+            try:
+                backend = await asyncio.wait_for(
+                    asyncio.open_connection("127.0.0.1", candidate.port), config.SOCKS_POOL_CONNECT_TIMEOUT
+                )
+                member = candidate
+                break
+            except (OSError, asyncio.TimeoutError) as e:
+                candidate.active -= 1
+                candidate.failures += 1
+                candidate.last_error = str(e) or "connect timeout"
+                candidate.down_until = time.monotonic() + config.SOCKS_POOL_RETRY_AFTER
+
+        if member is None:
+            self.rejected += 1
+            client_writer.close()
+            return
+
+        backend_reader, backend_writer = backend
+        member.total += 1
+        try:
+            await asyncio.gather(
+                self._pipe(client_reader, backend_writer, member, upstream=True),
+                self._pipe(backend_reader, client_writer, member, upstream=False),
+            )
+        finally:
+            member.active -= 1
+            for writer in (backend_writer, client_writer):
+                writer.close()
+
+    # ── Public API ──────────────────────────────────────────────
+
+    async def start(self) -> Dict:
+        """Create the member tunnels and start listening."""
+        errors = await self._add_members(self.size)
+        if not self.members:
+            raise RuntimeError(f"No pool member could be started ({'; '.join(errors)})")
+        try:
+            self._server = await asyncio.start_server(self._handle_client, self.listen_host, self.listen_port)
+        except OSError:
+            await self.stop()
+            raise
+        self._maintenance = asyncio.create_task(self._maintenance_loop())
+        snapshot = self.snapshot()
+        if errors:
+            snapshot["errors"] = errors
+        return snapshot
+
+    async def stop(self):
+        """Stop listening and tear down every member tunnel."""
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            self._maintenance = None
+        for task in self._tasks:
+            task.cancel()
+        if self._server is not None:
+            self._server.close()
+            # wait_closed() waits for open connections (Python 3.12+): end the relays first
+            clients = list(self._clients)
+            for task in clients:
+                task.cancel()
+            await asyncio.gather(*clients, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        members, self.members = self.members, []
+        await asyncio.gather(*(
+            asyncio.to_thread(self.tunnel_manager.stop_tunnel, m.tunnel_id) for m in members
+        ))
+
+    def snapshot(self) -> Dict:
+        return {
+            "id": self.id,
+            "listen": f"{self.listen_host}:{self.listen_port}",
+            "listening": self._server is not None,
+            "strategy": self.strategy,
+            "ssh_user": self.ssh_user,
+            "ssh_hosts": self.ssh_hosts,
+            "size": self.size,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "active_connections": sum(m.active for m in self.members),
+            "rejected": self.rejected,
+            "created_at": self.created_at,
+            "members": [m.snapshot() for m in self.members],
+        }
@@ -0,0 +1,244 @@
+"""
+SocksScanner - Parallel connect scans through dynamic tunnels.
+
+Runs `proxychains nmap -sT -Pn` automatically instead of by hand, and
+instead of pushing one slow scan through one SOCKS proxy it splits the work
+into host/port shards and spreads them over every available dynamic tunnel.
+Each tunnel runs a few shard workers pulling from one shared queue, so
+faster tunnels take more of the work; a shard that fails on one tunnel is
+retried once through the next.
+"""
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from nmap_parser import parse_nmap_services
+from target_set import TargetSet, nmap_target_args
+import config
+import proxychains
+
+
+# Common service ports, used where nmap would use its top-ports list; explicit
+# so shards can be cut from it.
+QUICK_PORTS = [
+    21, 22, 23, 25, 53, 80, 81, 88, 110, 111, 135, 139, 143, 389, 443, 445,
+    465, 587, 593, 636, 873, 993, 995, 1025, 1080, 1433, 1521, 2049, 2375,
+    3000, 3268, 3306, 3389, 4443, 5000, 5432, 5601, 5900, 5985, 5986, 6379,
+    7001, 8000, 8008, 8080, 8081, 8443, 8888, 9000, 9090, 9200, 9443, 10000,
+    11211, 27017,
+]
+
+# scan_type -> ports and extra nmap arguments. Only TCP connect scans work
+# through SOCKS (no raw packets, no ICMP host discovery).
+SOCKS_SCAN_PROFILES = {
+    "socks_quick": {"ports": QUICK_PORTS, "nmap_args": []},
+    "socks_service": {"ports": QUICK_PORTS, "nmap_args": ["-sV"]},
+    "socks_full": {"ports": "1-65535", "nmap_args": []},
+}
+
+Shard = Tuple[List[str], List[int]]
+
+
+# ── Targets, ports and shards ───────────────────────────────
+
+def parse_ports(spec) -> List[int]:
+    """Parse '22,80,8000-8100' (or a list of ints) into sorted unique ports."""
+    if isinstance(spec, (list, tuple)):
+        ports = {int(p) for p in spec}
+    else:
+        ports = set()
+        for part in str(spec).replace(" ", "").split(","):
+            if not part:
+                continue
+            start, sep, end = part.partition("-")
+            if not start.isdigit() or (sep and not end.isdigit()):
+                raise ValueError(f"Invalid port specification: '{part}'")
+            ports.update(range(int(start), int(end if sep else start) + 1))
+    if not ports or min(ports) < 1 or max(ports) > 65535:
+        raise ValueError("Ports must be between 1 and 65535")
+    return sorted(ports)
+
+
+def format_ports(ports: Sequence[int]) -> str:
+    """Compress sorted ports into nmap's '-p' syntax: [22, 80, 81, 82] -> '22,80-82'."""
+    ranges = []
+    start = prev = None
+    for port in ports:
+        if start is None:
+            start = prev = port
+        elif port == prev + 1:
+            prev = port
+        else:
+            ranges.append(f"{start}-{prev}" if prev != start else str(start))
+            start = prev = port
+    if start is not None:
+        ranges.append(f"{start}-{prev}" if prev != start else str(start))
+    return ",".join(ranges)
+
+
+def plan_shards(targets: TargetSet, ports: List[int], shard_count: int) -> List[Shard]:
+    """Cut targets x ports into about shard_count shards of similar size.
+
+    Many hosts: the target set is chunked into equal parts, each scanning
+    every port. Few hosts: each host's port list is cut into contiguous chunks.
+    """
+    shard_count = max(1, shard_count)
+    if targets.size >= shard_count:
+        # nmap can't mix IPv4 and IPv6 in one run: shard each family separately
+        return [
+            (chunk.to_nmap_args(), ports)
+            for part in targets.by_family()
+            for chunk in part.chunk(max(1, round(shard_count * part.size / targets.size)))
+        ]
+
+    hosts = list(targets.iter_hosts())
+    chunks_per_host = -(-shard_count // len(hosts))
+    chunk_size = max(config.SOCKS_SCAN_MIN_SHARD_PORTS, -(-len(ports) // chunks_per_host))
+    return [
+        ([host], ports[i:i + chunk_size])
+        for host in hosts
+        for i in range(0, len(ports), chunk_size)
+    ]
+
+
+def find_proxychains() -> Optional[str]:
+    return shutil.which("proxychains4") or shutil.which("proxychains")
+
+
+# ── Scanner ─────────────────────────────────────────────────
+
+class SocksScanner:
+    """Run sharded nmap connect scans across several local SOCKS tunnels."""
+
+    def __init__(self, tunnels: List[Dict], proxychains_bin: Optional[str] = None):
+        if not tunnels:
+            raise ValueError("At least one active dynamic tunnel is required")
+        self.tunnels = tunnels
+        self.proxychains_bin = proxychains_bin or find_proxychains()
+        if not self.proxychains_bin:
+            raise RuntimeError("proxychains4 is not installed (required for SOCKS scans)")
+
+    def _write_proxy_config(self, directory: str, tunnel: Dict) -> str:
+        """One single-proxy proxychains config per tunnel."""
+        proxy = {
+            "tunnel_id": tunnel["id"],
+            "proxy_type": "socks5",
+            "host": "127.0.0.1",
+            "port": tunnel["local_port"],
+            "via": tunnel.get("chain") or tunnel.get("ssh_host"),
+            "healthy": True,
+            "rtt_ms": None,
+        }
+        path = os.path.join(directory, f"{tunnel['id']}.conf")
+        with open(path, "w") as f:
+            f.write(proxychains.render_config([proxy], "strict_chain"))
+        return path
+
+    def _nmap_command(self, conf_path: str, shard: Shard, nmap_args: List[str], target_args: List[str]) -> List[str]:
+        hosts, ports = shard
+        return [
+            self.proxychains_bin, "-q", "-f", conf_path,
+            "nmap", "-sT", "-Pn", "-n", "--open", *nmap_args,
+            *(["-6"] if ":" in hosts[0] else []),
+            "-p", format_ports(ports), *target_args,
+        ]
+
+    def run(
+        self,
+        target: Union[str, TargetSet],
+        scan_type: str,
+        ports=None,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict:
+        """Scan target through all tunnels. Returns output, services and per-shard stats."""
+        profile = SOCKS_SCAN_PROFILES[scan_type]
+        targets = target if isinstance(target, TargetSet) else TargetSet.parse(target)
+        if not targets:
+            raise ValueError("No targets to scan")
+        port_list = parse_ports(ports if ports else profile["ports"])
+        shards = plan_shards(targets, port_list, len(self.tunnels) * config.SOCKS_SCAN_SHARDS_PER_TUNNEL)
+
+        work: "queue.Queue[Tuple[int, Shard]]" = queue.Queue()
+        for index, shard in enumerate(shards):
+            work.put((index, shard))
+
+        results: Dict[int, Dict] = {}
+        lock = threading.Lock()
+        done = [0]
+
+        def run_shard(conf_path: str, shard: Shard) -> Tuple[str, Optional[str]]:
+            try:
+                with nmap_target_args(shard[0]) as target_args:
+                    result = subprocess.run(
+                        self._nmap_command(conf_path, shard, profile["nmap_args"], target_args),
+                        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                        text=True, timeout=config.NMAP_SCAN_TIMEOUT,
+                    )
+            except subprocess.TimeoutExpired:
+                return "", "Shard timed out"
+            if result.returncode != 0:
+                return result.stdout, result.stderr.strip() or f"exit code {result.returncode}"
+            return result.stdout, None
+
+        def worker(position: int, conf_paths: List[str]):
+            while True:
+                try:
+                    index, shard = work.get_nowait()
+                except queue.Empty:
+                    return
+                used = position
+                output, error = run_shard(conf_paths[position], shard)
+                if error and len(conf_paths) > 1:
+                    used = (position + 1) % len(conf_paths)  # Retry once through the next tunnel
+                    output, error = run_shard(conf_paths[used], shard)
+                with lock:
+                    results[index] = {"tunnel_id": self.tunnels[used]["id"], "output": output, "error": error}
+                    done[0] += 1
+                    finished = done[0]
+                if progress:
+                    progress(finished, len(shards))
+
+        with tempfile.TemporaryDirectory(prefix="mudaletunnel-socks-scan-") as directory:
+            conf_paths = [self._write_proxy_config(directory, tunnel) for tunnel in self.tunnels]
+            threads = []
+            for position in range(len(self.tunnels)):
+                for _ in range(config.SOCKS_SCAN_WORKERS_PER_TUNNEL):
+                    thread = threading.Thread(target=worker, args=(position, conf_paths), daemon=True)
+                    thread.start()
+                    threads.append(thread)
+            for thread in threads:
+                thread.join()
+
+        return self._merge(shards, results)
+
+    @staticmethod
+    def _merge(shards: List[Shard], results: Dict[int, Dict]) -> Dict:
+        outputs, services, errors = [], [], []
+        per_tunnel: Dict[str, int] = {}
+        seen = set()
+        for index, (hosts, ports) in enumerate(shards):
+            result = results.get(index)
+            if result is None:
+                errors.append({"shard": index, "error": "Shard was not run"})
+                continue
+            per_tunnel[result["tunnel_id"]] = per_tunnel.get(result["tunnel_id"], 0) + 1
+            label = f"{' '.join(hosts)} ports {format_ports(ports)}"
+            outputs.append(f"# shard {index + 1}/{len(shards)}: {label} via tunnel {result['tunnel_id'][:8]}\n{result['output']}")
+            if result["error"]:
+                errors.append({"shard": index, "targets": label, "error": result["error"]})
+            for svc in parse_nmap_services(result["output"]):
+                key = (svc.get("host"), svc["port"])
+                if key not in seen:
+                    seen.add(key)
+                    services.append(svc)
+        return {
+            "output": "\n".join(outputs),
+            "services": services,
+            "shards": len(shards),
+            "shards_per_tunnel": per_tunnel,
+            "errors": errors,
+        }
@@ -1,6 +1,172 @@
 // WebSocket connection for real-time updates
 let ws = null;
 let scanInterval = null;
+let lastScanId = null;
+let tunnelList = null;
+let serviceList = null;
+
+// ── Virtual list ─────────────────────────────────────────────
+// Windowed rendering for long lists: only the rows in view (plus overscan)
+// exist in the DOM, absolutely positioned inside a spacer as tall as the
+// whole list. Rows are keyed, and a row's HTML is only replaced when its data
+// changed. Data is fetched a page at a time, already sorted and filtered by
+// the server.
+const VIRTUAL_PAGE_SIZE = 100;
+const VIRTUAL_OVERSCAN = 6;
+
+class VirtualList {
+    constructor(container, options) {
+        this.container = container;
+        this.rowHeight = options.rowHeight;
+        this.fetchPage = options.fetchPage;    // (offset, limit) => Promise<{items, total}>
+        this.rowKey = options.rowKey;
+        this.renderRow = options.renderRow;
+        this.emptyHtml = options.emptyHtml || '';
+        this.onTotal = options.onTotal || (() => {});
+        this.total = 0;
+        this.pages = new Map();      // page index -> rows
+        this.loading = new Map();    // page index -> pending fetch
+        this.nodes = new Map();      // row key -> {el, signature, index}
+        this.generation = 0;         // bumped by reset(); late responses are dropped
+        this.frame = null;
+
+        container.innerHTML = '';
+        this.spacer = document.createElement('div');
+        this.spacer.className = 'virtual-spacer';
+        this.empty = document.createElement('div');
+        this.empty.className = 'virtual-empty';
+        container.append(this.empty, this.spacer);
+        container.addEventListener('scroll', () => this.schedule(), { passive: true });
+        window.addEventListener('resize', () => this.schedule());
+    }
+
+    setTotal(total) {
+        if (total === this.total && this.spacer.style.height) return;
+        this.total = total;
+        this.spacer.style.height = `${total * this.rowHeight}px`;
+        this.empty.innerHTML = total === 0 ? this.emptyHtml : '';
+        this.onTotal(total);
+    }
+
+    visibleRange() {
+        const height = this.container.clientHeight || this.rowHeight * 10;
+        const top = this.container.scrollTop;
+        const first = Math.max(0, Math.floor(top / this.rowHeight) - VIRTUAL_OVERSCAN);
+        const last = Math.min(this.total, Math.ceil((top + height) / this.rowHeight) + VIRTUAL_OVERSCAN);
+        return [first, last];
+    }
+
+    visiblePages() {
+        const [first, last] = this.visibleRange();
+        if (last <= first) return [0];
+        const pages = [];
+        for (let page = Math.floor(first / VIRTUAL_PAGE_SIZE); page <= Math.floor((last - 1) / VIRTUAL_PAGE_SIZE); page++) {
+            pages.push(page);
+        }
+        return pages;
+    }
+
+    loadPage(page) {
+        if (this.loading.has(page)) return this.loading.get(page);
+        const generation = this.generation;
+        const pending = this.fetchPage(page * VIRTUAL_PAGE_SIZE, VIRTUAL_PAGE_SIZE)
+            .then(({ items, total }) => {
+                if (generation !== this.generation) return;
+                this.pages.set(page, items);
+                this.setTotal(total);
+                this.schedule();
+            })
+            .catch(error => console.error('Error loading rows:', error))
+            .finally(() => {
+                if (generation === this.generation) this.loading.delete(page);
+            });
+        this.loading.set(page, pending);
+        return pending;
+    }
+
+    // Re-fetch the pages in view; only rows whose data changed are re-rendered
+    async refresh() {
+        const generation = this.generation;
+        const pages = this.visiblePages();
+        const results = await Promise.all(pages.map(page => this.fetchPage(page * VIRTUAL_PAGE_SIZE, VIRTUAL_PAGE_SIZE)));
+        if (generation !== this.generation) return;
+        this.pages.clear();  // Pages out of view are stale now; fetched again when scrolled to
+        pages.forEach((page, i) => this.pages.set(page, results[i].items));
+        this.setTotal(results[results.length - 1].total);
+        this.render();
+    }
+
+    // New sort/filter: drop everything and start from the top
+    reset() {
+        this.generation++;
+        this.pages.clear();
+        this.loading.clear();
+        this.container.scrollTop = 0;
+        return this.refresh();
+    }
+
+    schedule() {
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => this.render());
+        }
+    }
+
+    render() {
+        if (this.frame !== null) {
+            cancelAnimationFrame(this.frame);
+            this.frame = null;
+        }
+        const [first, last] = this.visibleRange();
+        const seen = new Set();
+        for (let index = first; index < last; index++) {
+            const page = Math.floor(index / VIRTUAL_PAGE_SIZE);
+            const rows = this.pages.get(page);
+            if (!rows) {
+                this.loadPage(page);
+                continue;
+            }
+            const item = rows[index % VIRTUAL_PAGE_SIZE];
+            if (!item) continue;
+            const key = this.rowKey(item);
+            if (seen.has(key)) continue;
+            seen.add(key);
+
+            let node = this.nodes.get(key);
+            if (!node) {
+                const el = document.createElement('div');
+                el.className = 'virtual-row';
+                el.style.height = `${this.rowHeight}px`;
+                this.spacer.appendChild(el);
+                node = { el, signature: null, index: -1 };
+                this.nodes.set(key, node);
+            }
+            const signature = JSON.stringify(item);
+            if (node.signature !== signature) {
+                node.el.innerHTML = this.renderRow(item);
+                node.signature = signature;
+            }
+            if (node.index !== index) {
+                node.el.style.transform = `translateY(${index * this.rowHeight}px)`;
+                node.index = index;
+            }
+        }
+        for (const [key, node] of this.nodes) {
+            if (!seen.has(key)) {
+                node.el.remove();
+                this.nodes.delete(key);
+            }
+        }
+    }
+}
+
+// Debounce list query inputs so typing doesn't refetch on every key
+function debounce(fn, delay) {
+    let timer = null;
+    return (...args) => {
+        clearTimeout(timer);
+        timer = setTimeout(() => fn(...args), delay);
+    };
+}
 
 // Initialize WebSocket connection
 function initWebSocket() {
@@ -42,6 +208,7 @@ function handleWebSocketMessage(data) {
             refreshTunnels();
             break;
         case 'tunnel_created':
+        case 'tunnels_created':
         case 'tunnel_stopped':
         case 'all_tunnels_stopped':
             refreshTunnels();
@@ -83,6 +250,7 @@ function switchTab(tab) {
 async function startScan() {
     const target = document.getElementById('scanTarget').value.trim();
     const scanType = document.getElementById('scanType').value;
+    const exclude = document.getElementById('scanExclude').value.trim() || null;
     
     if (!target) {
         showStatus('error', 'Please enter a target');
@@ -98,15 +266,20 @@ async function startScan() {
         const response = await fetch('/api/scan', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ target, scan_type: scanType })
+            body: JSON.stringify({ target, scan_type: scanType, exclude })
         });
         
         const data = await response.json();
         if (response.ok) {
-            showStatus('info', `Scan started. ID: ${data.scan_id}`);
+            if (data.status === 'deduplicated') {
+                showStatus('info', `Targets already being scanned by ${data.covered_by.length} running scan(s); following ${data.scan_id}`);
+            } else {
+                const overlap = data.covered_by && data.covered_by.length ? `, overlap with ${data.covered_by.length} running scan(s) skipped` : '';
+                showStatus('info', `Scan started (${data.target_count} target(s)${overlap}). ID: ${data.scan_id}`);
+            }
             pollScanStatus(data.scan_id);
         } else {
-            showStatus('error', 'Failed to start scan');
+            showStatus('error', `Failed to start scan: ${data.detail || response.statusText}`);
         }
     } catch (error) {
         showStatus('error', `Error: ${error.message}`);
@@ -140,7 +313,8 @@ function pollScanStatus(scanId) {
                     console.warn('No services parsed. Debug info:', data.parse_debug);
                 }
                 
-                displayServices(services);
+                lastScanId = scanId;
+                displayServices(scanId, services.length);
                 loadScanHistory(); // Refresh scan history
             } else if (data.status === 'failed') {
                 clearInterval(scanInterval);
@@ -156,8 +330,8 @@ function pollScanStatus(scanId) {
     }, 2000);
 }
 
-// Display discovered services
-function displayServices(services) {
+// Display discovered services (windowed; sorted and filtered by the server)
+function displayServices(scanId, count) {
     const servicesSection = document.getElementById('servicesSection');
     const servicesList = document.getElementById('servicesList');
     
@@ -166,42 +340,118 @@ function displayServices(services) {
         return;
     }
     
-    if (!services || services.length === 0) {
-        servicesList.innerHTML = '<p style="color: #888; padding: 20px;">No open ports found. Try a different scan type or check if the target is reachable.</p>';
-        servicesSection.style.display = 'block';
+    if (!serviceList) {
+        serviceList = new VirtualList(servicesList, {
+            rowHeight: 110,
+            fetchPage: fetchServicePage,
+            rowKey: service => `${service.host || ''}:${service.port}`,
+            renderRow: renderServiceRow,
+            emptyHtml: '<p style="color: #888; padding: 20px;">No open ports found. Try a different scan type or check if the target is reachable.</p>',
+            onTotal: total => {
+                document.getElementById('servicesCount').textContent = `${total} service(s)`;
+            },
+        });
+    }
+    serviceList.scanId = scanId;
+    document.getElementById('servicesBulk').style.display = count > 0 ? 'block' : 'none';
+    document.getElementById('bulkTunnelMapping').innerHTML = '';
+    servicesSection.style.display = 'block';
+    serviceList.reset();
+    
+    if (count === 0) {
         return;
     }
     
-    servicesList.innerHTML = services.map(service => {
-        const port = service.port || 'unknown';
-        const serviceName = service.service || 'unknown';
-        const state = service.state || 'unknown';
-        
-        return `
-        <div class="service-item" style="padding: 15px; margin: 10px 0; background: #1a0000; border-left: 4px solid var(--hacker-red); border-radius: 4px;">
+    // Scroll to services section with smooth animation
+    setTimeout(() => {
+        servicesSection.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+    }, 100);
+    
+    // Show success message
+    showToast(`Found ${count} open port(s)!`, 'success');
+}
+
+async function fetchServicePage(offset, limit) {
+    const params = new URLSearchParams({
+        offset,
+        limit,
+        sort: document.getElementById('serviceSort').value,
+    });
+    const q = document.getElementById('serviceFilter').value.trim();
+    if (q) params.set('q', q);
+    const response = await fetch(`/api/scan/${serviceList.scanId}/services?${params}`);
+    const data = await response.json();
+    return { items: data.services || [], total: data.total || 0 };
+}
+
+const onServiceQueryChange = debounce(() => {
+    if (serviceList && serviceList.scanId) serviceList.reset();
+}, 200);
+
+function renderServiceRow(service) {
+    const port = service.port || 'unknown';
+    const serviceName = service.service || 'unknown';
+    const state = service.state || 'unknown';
+    
+    return `
+        <div class="service-item" style="padding: 15px; background: #1a0000; border-left: 4px solid var(--hacker-red); border-radius: 4px;">
             <div class="service-info" style="margin-bottom: 10px;">
                 <div style="display: flex; gap: 20px; flex-wrap: wrap;">
-                    <div><strong style="color: var(--hacker-red);">Port:</strong> <span style="color: var(--hacker-orange);">${port}</span></div>
-                    <div><strong style="color: var(--hacker-red);">Service:</strong> <span style="color: var(--hacker-orange);">${serviceName}</span></div>
-                    <div><strong style="color: var(--hacker-red);">State:</strong> <span style="color: var(--hacker-orange);">${state}</span></div>
+                    ${service.host ? `<div><strong style="color: var(--hacker-red);">Host:</strong> <span style="color: var(--hacker-orange);">${escapeHtml(service.host)}</span></div>` : ''}
+                    <div><strong style="color: var(--hacker-red);">Port:</strong> <span style="color: var(--hacker-orange);">${escapeHtml(port)}</span></div>
+                    <div><strong style="color: var(--hacker-red);">Service:</strong> <span style="color: var(--hacker-orange);">${escapeHtml(serviceName)}</span></div>
+                    <div><strong style="color: var(--hacker-red);">State:</strong> <span style="color: var(--hacker-orange);">${escapeHtml(state)}</span></div>
                 </div>
             </div>
-            <button onclick="useServiceForTunnel('${port}', '${serviceName}')" class="btn-secondary" style="margin-top: 5px;">
+            <button onclick="useServiceForTunnel('${escapeHtml(port)}', '${escapeHtml(serviceName)}')" class="btn-secondary" style="margin-top: 5px;">
                 🚀 Use for Tunnel
             </button>
         </div>
-        `;
-    }).join('');
-    
-    servicesSection.style.display = 'block';
+    `;
+}
+
+// Forward every open TCP service from the last scan in one request
+async function tunnelAllServices() {
+    const sshUser = document.getElementById('staticSshUser').value.trim();
+    const sshHost = document.getElementById('staticSshHost').value.trim();
     
-    // Scroll to services section with smooth animation
-    setTimeout(() => {
-        servicesSection.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
-    }, 100);
+    if (!lastScanId) {
+        showToast('Run a scan first', 'error');
+        return;
+    }
+    if (!sshUser || !sshHost) {
+        showToast('Fill in SSH user and host in the Static tab first', 'error');
+        return;
+    }
     
-    // Show success message
-    showToast(`Found ${services.length} open port(s)!`, 'success');
+    try {
+        const response = await fetch(`/api/scan/${lastScanId}/tunnel-all`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ssh_user: sshUser, ssh_host: sshHost })
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            showToast(data.detail || 'Failed to create tunnels', 'error');
+            return;
+        }
+        
+        document.getElementById('bulkTunnelMapping').innerHTML = `
+            <table style="width: 100%; margin: 10px 0; border-collapse: collapse;">
+                <tr><th align="left">Local</th><th align="left">Remote</th><th align="left">Service</th></tr>
+                ${data.mapping.map(m => `
+                    <tr><td>127.0.0.1:${m.local_port}</td><td>${m.remote_host}:${m.remote_port}</td><td>${m.service || ''}</td></tr>
+                `).join('')}
+            </table>
+        `;
+        data.errors.forEach(e => showToast(`${e.forwards} forward(s) failed: ${e.error}`, 'error'));
+        if (data.mapping.length) {
+            showToast(`${data.mapping.length} service(s) forwarded over ${data.tunnels.length} SSH connection(s)`, 'success');
+        }
+        refreshTunnels();
+    } catch (error) {
+        showToast(`Error: ${error.message}`, 'error');
+    }
 }
 
 // Use service for tunnel creation
@@ -414,91 +664,116 @@ async function createRemoteDynamicTunnel() {
     }
 }
 
-// Refresh tunnels list
+// Refresh tunnels list (only the rows in view are fetched and re-rendered)
 async function refreshTunnels() {
+    if (!tunnelList) {
+        tunnelList = new VirtualList(document.getElementById('tunnelsList'), {
+            rowHeight: 215,
+            fetchPage: fetchTunnelPage,
+            rowKey: tunnel => tunnel.id,
+            renderRow: renderTunnelRow,
+            emptyHtml: '<p>No active tunnels.</p>',
+            onTotal: total => {
+                document.getElementById('tunnelsCount').textContent = `${total} tunnel(s)`;
+            },
+        });
+    }
     try {
-        const response = await fetch('/api/tunnels');
-        const data = await response.json();
-        displayTunnels(data.tunnels || []);
+        await tunnelList.refresh();
     } catch (error) {
         console.error('Error fetching tunnels:', error);
     }
 }
 
-// Display tunnels
-function displayTunnels(tunnels) {
-    const tunnelsList = document.getElementById('tunnelsList');
+async function fetchTunnelPage(offset, limit) {
+    const params = new URLSearchParams({
+        offset,
+        limit,
+        sort: document.getElementById('tunnelSort').value,
+    });
+    const status = document.getElementById('tunnelStatusFilter').value;
+    const q = document.getElementById('tunnelFilter').value.trim();
+    if (status) params.set('status', status);
+    if (q) params.set('q', q);
+    const response = await fetch(`/api/tunnels?${params}`);
+    const data = await response.json();
+    return { items: data.tunnels || [], total: data.total || 0 };
+}
+
+const onTunnelQueryChange = debounce(() => {
+    if (tunnelList) tunnelList.reset().catch(error => console.error('Error fetching tunnels:', error));
+}, 200);
+
+// One tunnel card
+function renderTunnelRow(tunnel) {
+    const statusClass = tunnel.status === 'active' ? 'active' : 'stopped';
+    const badgeClass = tunnel.type === 'static' ? 'badge-static' : 
+                      tunnel.type === 'dynamic' ? 'badge-dynamic' :
+                      tunnel.type === 'remote' ? 'badge-remote' :
+                      tunnel.type === 'chain' ? 'badge-chain' : 'badge-remote-dynamic';
+    const statusBadgeClass = tunnel.status === 'active' ? 'badge-active' : 'badge-stopped';
     
-    if (!tunnels || tunnels.length === 0) {
-        tunnelsList.innerHTML = '<p>No active tunnels.</p>';
-        return;
+    let remoteInfo = '';
+    if (tunnel.type === 'static') {
+        remoteInfo = `${tunnel.remote_host}:${tunnel.remote_port}`;
+    } else if (tunnel.type === 'dynamic') {
+        remoteInfo = 'SOCKS Proxy';
+    } else if (tunnel.type === 'remote') {
+        remoteInfo = `${tunnel.bind_address}:${tunnel.remote_bind_port} -> ${tunnel.target_host}:${tunnel.target_port}`;
+    } else if (tunnel.type === 'remote_dynamic') {
+        remoteInfo = `Remote SOCKS Proxy (${tunnel.bind_address}:${tunnel.remote_socks_port})`;
+    } else if (tunnel.type === 'chain') {
+        remoteInfo = tunnel.forward_type === 'static'
+            ? `${tunnel.chain} -> ${tunnel.remote_host}:${tunnel.remote_port}`
+            : `${tunnel.chain} (SOCKS Proxy)`;
     }
     
-    tunnelsList.innerHTML = tunnels.map(tunnel => {
-        const statusClass = tunnel.status === 'active' ? 'active' : 'stopped';
-        const badgeClass = tunnel.type === 'static' ? 'badge-static' : 
-                          tunnel.type === 'dynamic' ? 'badge-dynamic' :
-                          tunnel.type === 'remote' ? 'badge-remote' : 'badge-remote-dynamic';
-        const statusBadgeClass = tunnel.status === 'active' ? 'badge-active' : 'badge-stopped';
-        
-        let remoteInfo = '';
-        if (tunnel.type === 'static') {
-            remoteInfo = `${tunnel.remote_host}:${tunnel.remote_port}`;
-        } else if (tunnel.type === 'dynamic') {
-            remoteInfo = 'SOCKS Proxy';
-        } else if (tunnel.type === 'remote') {
-            remoteInfo = `${tunnel.bind_address}:${tunnel.remote_bind_port} -> ${tunnel.target_host}:${tunnel.target_port}`;
-        } else if (tunnel.type === 'remote_dynamic') {
-            remoteInfo = `Remote SOCKS Proxy (${tunnel.bind_address}:${tunnel.remote_socks_port})`;
-        }
-        
-        return `
-            <div class="tunnel-item ${statusClass}">
-                <div class="tunnel-header">
-                    <h3>
-                        <span class="tunnel-badge ${badgeClass}">${tunnel.type.toUpperCase()}</span>
-                        <span class="tunnel-badge ${statusBadgeClass}">${tunnel.status}</span>
-                    </h3>
-                    <span style="font-size: 0.9em; color: #64748b;">ID: ${tunnel.id.substring(0, 8)}</span>
-                </div>
-                <div class="tunnel-details">
-                    ${tunnel.type === 'static' || tunnel.type === 'dynamic' ? `
-                        <div class="tunnel-detail-item">
-                            <strong>Local Port:</strong> ${tunnel.local_port}
-                        </div>
-                    ` : ''}
-                    ${tunnel.type === 'remote' ? `
-                        <div class="tunnel-detail-item">
-                            <strong>Remote Bind:</strong> ${tunnel.bind_address}:${tunnel.remote_bind_port}
-                        </div>
-                        <div class="tunnel-detail-item">
-                            <strong>Target:</strong> ${tunnel.target_host}:${tunnel.target_port}
-                        </div>
-                    ` : ''}
-                    ${tunnel.type === 'remote_dynamic' ? `
-                        <div class="tunnel-detail-item">
-                            <strong>Remote SOCKS Port:</strong> ${tunnel.bind_address}:${tunnel.remote_socks_port}
-                        </div>
-                    ` : ''}
+    return `
+        <div class="tunnel-item ${statusClass}">
+            <div class="tunnel-header">
+                <h3>
+                    <span class="tunnel-badge ${badgeClass}">${tunnel.type.toUpperCase()}</span>
+                    <span class="tunnel-badge ${statusBadgeClass}">${tunnel.status}</span>
+                </h3>
+                <span style="font-size: 0.9em; color: #64748b;">ID: ${tunnel.id.substring(0, 8)}</span>
+            </div>
+            <div class="tunnel-details">
+                ${tunnel.type === 'static' || tunnel.type === 'dynamic' || tunnel.type === 'chain' ? `
                     <div class="tunnel-detail-item">
-                        <strong>Remote:</strong> ${remoteInfo}
+                        <strong>Local Port:</strong> ${tunnel.local_port}
                     </div>
+                ` : ''}
+                ${tunnel.type === 'remote' ? `
                     <div class="tunnel-detail-item">
-                        <strong>SSH:</strong> ${tunnel.ssh_user}@${tunnel.ssh_host}
+                        <strong>Remote Bind:</strong> ${tunnel.bind_address}:${tunnel.remote_bind_port}
                     </div>
                     <div class="tunnel-detail-item">
-                        <strong>PID:</strong> ${tunnel.pid || 'N/A'}
+                        <strong>Target:</strong> ${tunnel.target_host}:${tunnel.target_port}
                     </div>
+                ` : ''}
+                ${tunnel.type === 'remote_dynamic' ? `
+                    <div class="tunnel-detail-item">
+                        <strong>Remote SOCKS Port:</strong> ${tunnel.bind_address}:${tunnel.remote_socks_port}
+                    </div>
+                ` : ''}
+                <div class="tunnel-detail-item">
+                    <strong>Remote:</strong> ${remoteInfo}
                 </div>
-                <div class="tunnel-actions-item">
-                    <button onclick="viewTunnelDetails('${tunnel.id}')" class="btn-secondary">Details</button>
-                    <button onclick="viewTunnelLogs('${tunnel.id}')" class="btn-secondary">Logs</button>
-                    <button onclick="viewTunnelMetrics('${tunnel.id}')" class="btn-secondary">Metrics</button>
-                    ${tunnel.status === 'active' ? `<button onclick="stopTunnel('${tunnel.id}')" class="btn-danger">Stop</button>` : ''}
+                <div class="tunnel-detail-item">
+                    <strong>SSH:</strong> ${tunnel.ssh_user}@${tunnel.ssh_host}
+                </div>
+                <div class="tunnel-detail-item">
+                    <strong>PID:</strong> ${tunnel.pid || 'N/A'}
                 </div>
             </div>
-        `;
-    }).join('');
+            <div class="tunnel-actions-item">
+                <button onclick="viewTunnelDetails('${tunnel.id}')" class="btn-secondary">Details</button>
+                <button onclick="viewTunnelLogs('${tunnel.id}')" class="btn-secondary">Logs</button>
+                <button onclick="viewTunnelMetrics('${tunnel.id}')" class="btn-secondary">Metrics</button>
+                ${tunnel.status === 'active' ? `<button onclick="stopTunnel('${tunnel.id}')" class="btn-danger">Stop</button>` : ''}
+            </div>
+        </div>
+    `;
 }
 
 // Stop tunnel
@@ -561,7 +836,12 @@ async function viewTunnelDetails(tunnelId) {
         
         if (tunnel.type === 'static' || tunnel.type === 'dynamic') {
             detailsHtml += `<div><strong>Local Port:</strong> ${tunnel.local_port}</div>`;
-            if (tunnel.type === 'static') {
+            if (tunnel.type === 'static' && tunnel.forwards) {
+                detailsHtml += `
+                    <div><strong>Forwards (${tunnel.forward_count}, one SSH connection):</strong></div>
+                    ${tunnel.forwards.map(f => `<div>&nbsp;&nbsp;${f.local_port} -> ${f.remote_host}:${f.remote_port} ${f.service || ''}</div>`).join('')}
+                `;
+            } else if (tunnel.type === 'static') {
                 detailsHtml += `
                     <div><strong>Remote Host:</strong> ${tunnel.remote_host}</div>
                     <div><strong>Remote Port:</strong> ${tunnel.remote_port}</div>
@@ -577,6 +857,14 @@ async function viewTunnelDetails(tunnelId) {
             detailsHtml += `
                 <div><strong>Remote SOCKS Port:</strong> ${tunnel.bind_address}:${tunnel.remote_socks_port}</div>
             `;
+        } else if (tunnel.type === 'chain') {
+            detailsHtml += `
+                <div><strong>Local Port:</strong> ${tunnel.local_port} (${tunnel.forward_type})</div>
+                <div><strong>Hops:</strong> ${tunnel.hops.map(hop => `${hop.user}@${hop.host}${hop.port ? ':' + hop.port : ''}`).join(' -> ')}</div>
+            `;
+            if (tunnel.forward_type === 'static') {
+                detailsHtml += `<div><strong>Target:</strong> ${tunnel.remote_host}:${tunnel.remote_port}</div>`;
+            }
         }
         
         detailsHtml += `
@@ -639,6 +927,8 @@ async function viewTunnelMetrics(tunnelId) {
         const uptimeMinutes = Math.floor((metrics.uptime_seconds % 3600) / 60);
         const uptimeSeconds = Math.floor(metrics.uptime_seconds % 60);
         const uptimeStr = `${uptimeHours}h ${uptimeMinutes}m ${uptimeSeconds}s`;
+        const latency = metrics.latency;
+        const resources = metrics.resources;
         
         const modalBody = document.getElementById('modalBody');
         modalBody.innerHTML = `
@@ -655,6 +945,18 @@ async function viewTunnelMetrics(tunnelId) {
                     <div class="metric-value">${new Date(metrics.created_at).toLocaleDateString()}</div>
                     <div class="metric-label">Created</div>
                 </div>
+                ${latency ? `
+                <div class="metric-item">
+                    <div class="metric-value">${latency.last_rtt_ms !== undefined ? `${latency.last_rtt_ms} ms` : 'N/A'}</div>
+                    <div class="metric-label">Probe RTT (p95 ${latency.p95_rtt_ms !== undefined ? `${latency.p95_rtt_ms} ms` : 'N/A'})</div>
+                </div>
+                <div class="metric-item">
+                    <div class="metric-value">${latency.failures}/${latency.probes}</div>
+                    <div class="metric-label">Probe Failures</div>
+                </div>
+                ` : ''}
+                ${resources ? renderResourceMetrics(resources, metrics.resource_series || []) : ''}
+                ${metrics.remote_bind ? renderRemoteBind(metrics.remote_bind) : ''}
             </div>
         `;
         
@@ -665,6 +967,51 @@ async function viewTunnelMetrics(tunnelId) {
     }
 }
 
+function formatBytes(bytes) {
+    if (bytes >= 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(1)} MiB`;
+    if (bytes >= 1024) return `${(bytes / 1024).toFixed(0)} KiB`;
+    return `${bytes} B`;
+}
+
+// Inline SVG polyline of one field across the resource series
+function sparkline(series, field) {
+    const values = series.map(p => p[field]).filter(v => v !== null && v !== undefined);
+    if (values.length < 2) return '';
+    const width = 140, height = 28;
+    const max = Math.max(...values) || 1;
+    const points = values.map((v, i) => `${(i / (values.length - 1) * width).toFixed(1)},${(height - v / max * height).toFixed(1)}`);
+    return `<svg class="sparkline" width="${width}" height="${height}" viewBox="0 0 ${width} ${height}"><polyline points="${points.join(' ')}"/></svg>`;
+}
+
+// CPU, memory and fd usage of the tunnel's process group (sampled from /proc)
+function renderResourceMetrics(resources, series) {
+    const alerts = new Set(resources.alerts || []);
+    const item = (name, value, label, field) => `
+                <div class="metric-item${alerts.has(name) ? ' metric-alert' : ''}">
+                    <div class="metric-value">${value}</div>
+                    <div class="metric-label">${label}</div>
+                    ${sparkline(series, field)}
+                </div>`;
+    return [
+        item('cpu', resources.cpu_percent !== null ? `${resources.cpu_percent}%` : 'N/A', `CPU (${resources.cpu_seconds}s total)`, 'cpu_percent'),
+        item('rss', formatBytes(resources.rss_bytes), `RSS (peak ${formatBytes(resources.peak_rss_bytes)})`, 'rss_bytes'),
+        item('fds', resources.fds, `Open FDs (${resources.sockets} sockets)`, 'fds'),
+    ].join('');
+}
+
+// Whether a remote (-R) tunnel's listener was confirmed on the SSH server
+function renderRemoteBind(remoteBind) {
+    const states = {true: 'Verified', false: 'Failed'};
+    const value = states[remoteBind.verified] || 'Unknown';
+    const detail = remoteBind.verified ? (remoteBind.listening_on || []).join(', ') : remoteBind.reason;
+    return `
+                <div class="metric-item${remoteBind.verified === false ? ' metric-alert' : ''}">
+                    <div class="metric-value">${value}</div>
+                    <div class="metric-label">Remote Bind :${remoteBind.port || '?'}</div>
+                    ${detail ? `<div class="metric-detail">${escapeHtml(detail)}</div>` : ''}
+                </div>`;
+}
+
 // Close modal
 function closeModal() {
     document.getElementById('tunnelModal').style.display = 'none';
@@ -760,8 +1107,9 @@ async function generateProxychainsConfig() {
     const proxyPort = parseInt(document.getElementById('proxyPort').value);
     const chainType = document.getElementById('chainType').value;
     
-    if (!proxyHost || !proxyPort) {
-        showToast('Please enter proxy host and port', 'error');
+    // Host and port are optional: without them the list is built from live dynamic tunnels
+    if (!proxyHost !== !proxyPort) {
+        showToast('Enter both proxy host and port, or leave both empty to use live tunnels', 'error');
         return;
     }
     
@@ -771,8 +1119,8 @@ async function generateProxychainsConfig() {
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 proxy_type: proxyType,
-                proxy_host: proxyHost,
-                proxy_port: proxyPort,
+                proxy_host: proxyHost || null,
+                proxy_port: proxyPort || null,
                 chain_type: chainType
             })
         });
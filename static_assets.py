@@ -0,0 +1,208 @@
+"""
+Cached dashboard page and cache-busted, precompressed static assets.
+
+- StaticAssets: ASGI app mounted at /static. Each file is read, hashed and
+  compressed (gzip, plus brotli when installed) once, and again only when its
+  mtime or size changes. Templates link files through static_url(), which
+  yields content-hashed names (app.3f9c2e1a7b04.js) served with a one-year
+  immutable Cache-Control; plain names still work, revalidated by ETag.
+- CachedPage: a Jinja template rendered once per template/asset version,
+  kept with its compressed variants and answered with 304 when unchanged.
+
+Reloading the dashboard then costs one conditional request for the page;
+the hashed assets come from the browser cache without a round trip.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+from fastapi.responses import Response
+from jinja2 import Environment
+
+from api_responses import brotli, is_compressible, negotiate_encoding
+import config
+
+
+_HASH_LENGTH = 12
+_HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<suffix>\.[^./]+)$" % _HASH_LENGTH)
+
+_REVALIDATE = "no-cache"  # cache, but check the ETag every time
+
+
+class _Variants:
+    """A body with its digest and precompressed encodings."""
+
+    __slots__ = ("digest", "content_type", "identity", "gzip", "br")
+
+    def __init__(self, data: bytes, content_type: str):
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.content_type = content_type
+        self.identity = data
+        self.gzip: Optional[bytes] = None
+        self.br: Optional[bytes] = None
+        if config.COMPRESSION_ENABLED and len(data) >= config.COMPRESSION_MIN_SIZE and is_compressible(content_type):
+            self.gzip = gzip.compress(data, 9, mtime=0)
+            if brotli is not None:
+                self.br = brotli.compress(data, quality=11)
+
+    def response(self, request_headers, cache_control: str) -> Response:
+        """200 with the best encoding the client accepts, or 304 if its copy is current."""
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        if encoding == "br" and self.br is None:
+            encoding = "gzip"
+        body = self.br if encoding == "br" else self.gzip if encoding == "gzip" else None
+        if body is None:
+            encoding, body = None, self.identity
+
+        etag = f'"{self.digest[:16]}{"-" + encoding if encoding else ""}"'
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if self.gzip is not None:
+            headers["Vary"] = "Accept-Encoding"
+        if self.digest[:16] in request_headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type=self.content_type, headers=headers)
+
+
+def _content_type(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type == "application/javascript":
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+# ── Static assets ───────────────────────────────────────────
+
+class _Asset:
+    __slots__ = ("stat_key", "variants")
+
+    def __init__(self, stat_key: Tuple[float, int], variants: _Variants):
+        self.stat_key = stat_key
+        self.variants = variants
+
+
+class StaticAssets:
+    """Serves files under directory from memory, by plain or content-hashed name."""
+
+    def __init__(self, directory: str, prefix: str = "/static"):
+        self.directory = os.path.abspath(directory)
+        self.prefix = prefix
+        self._assets: Dict[str, _Asset] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Optional[str]:
+        path = os.path.abspath(os.path.join(self.directory, name))
+        if not path.startswith(self.directory + os.sep):
+            return None  # Escapes the directory
+        return path
+
+    def get(self, name: str) -> Optional[_Variants]:
+        """The current variants of a file, re-read if it changed on disk."""
+        path = self._path(name)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stat_key = (stat.st_mtime, stat.st_size)
+        asset = self._assets.get(name)
+        if asset is not None and asset.stat_key == stat_key:
+            return asset.variants
+        with self._lock:
+            asset = self._assets.get(name)
+            if asset is None or asset.stat_key != stat_key:
+                with open(path, "rb") as f:
+                    asset = _Asset(stat_key, _Variants(f.read(), _content_type(path)))
+                self._assets[name] = asset
+        return asset.variants
+
+    def preload(self):
+        """Hash and compress every file up front, so first requests don't pay for it."""
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                self.get(os.path.relpath(os.path.join(root, filename), self.directory).replace(os.sep, "/"))
+
+    def url(self, name: str) -> str:
+        """URL for a file: content-hashed when it exists (the template global static_url)."""
+        variants = self.get(name)
+        if variants is None:
+            return f"{self.prefix}/{name}"
+        stem, suffix = os.path.splitext(name)
+        return f"{self.prefix}/{stem}.{variants.digest[:_HASH_LENGTH]}{suffix}"
+
+    def version(self) -> Tuple:
+        """Digests of all loaded files, re-checked on disk (part of the page cache key)."""
+        names = sorted(self._assets)
+        return tuple((name, variants.digest) for name in names for variants in [self.get(name)] if variants)
+
+    def _lookup(self, name: str) -> Tuple[Optional[_Variants], bool]:
+        """Resolve a requested name; returns variants and whether the hashed URL is current."""
+        variants = self.get(name)
+        if variants is not None:
+            return variants, False
+        match = _HASHED_NAME.match(name)
+        if match is None:
+            return None, False
+        variants = self.get(match["stem"] + match["suffix"])
+        if variants is None:
+            return None, False
+        # A stale hash (page rendered before the file changed) gets the new content, uncached
+        return variants, variants.digest.startswith(match["digest"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            response = Response(status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            path, root_path = scope["path"], scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]  # Mounted: newer Starlette keeps the prefix in path
+            variants, immutable = self._lookup(path.lstrip("/"))
+            if variants is None:
+                response = Response("Not Found", status_code=404, media_type="text/plain")
+            else:
+                headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+                cache_control = f"public, max-age={config.STATIC_MAX_AGE}, immutable" if immutable else _REVALIDATE
+                response = variants.response(headers, cache_control)
+        await response(scope, receive, send)
+
+
+# ── Cached page ─────────────────────────────────────────────
+
+class CachedPage:
+    """A template rendered once per (template, static assets) version."""
+
+    def __init__(self, env: Environment, template_name: str, assets: Optional[StaticAssets] = None):
+        self.env = env
+        self.template_name = template_name
+        self.assets = assets
+        self._template = None
+        self._version: Optional[Tuple] = None
+        self._variants: Optional[_Variants] = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> _Variants:
+        # get_template() returns the cached Template object until the file's mtime changes
+        template = self.env.get_template(self.template_name)
+        if template is not self._template or self._assets_version() != self._version:
+            with self._lock:
+                if template is not self._template or self._assets_version() != self._version:
+                    html = template.render()
+                    # Rendering may load assets for the first time; key on the state after it
+                    self._variants = _Variants(html.encode("utf-8"), "text/html; charset=utf-8")
+                    self._template, self._version = template, self._assets_version()
+        return self._variants
+
+    def _assets_version(self) -> Tuple:
+        # An edited asset gets a new hashed URL, so the page must be rendered again
+        return self.assets.version() if self.assets else ()
+
+    def response(self, request_headers) -> Response:
+        return self._current().response(request_headers, _REVALIDATE)
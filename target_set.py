@@ -0,0 +1,361 @@
+"""
+TargetSet - Compiled scan targets as sorted address intervals.
+
+Target strings (IPs, CIDRs, dash ranges, hostnames) and exclude lists compile
+into merged [first, last] integer intervals per address family plus a list of
+hostnames. Union, subtract and chunk walk the intervals, so their cost grows
+with the number of ranges, not the number of addresses: a /8 minus a few
+exclusions is a handful of intervals and compiles instantly.
+
+    10.0.0.0/8            CIDR
+    10.0.0.1-10.0.3.254   full range (IPv4 or IPv6)
+    10.0.0.1-50           last-octet range (nmap style)
+    10.0.0-3.1, 10.0.*.1  per-octet ranges and wildcards (nmap style)
+    fileserver.corp       hostname (kept as-is, deduplicated)
+    scanme.nmap.org/24    hostname/prefix (passed to nmap as-is; counts 2^(32-prefix))
+"""
+import heapq
+import ipaddress
+import itertools
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import config
+
+Interval = Tuple[int, int]  # inclusive
+
+_HOSTNAME_PATTERN = re.compile(
+    r"^(?=.{1,253}\.?$)[A-Za-z0-9_](?:[A-Za-z0-9_-]{0,61}[A-Za-z0-9])?"
+    r"(?:\.[A-Za-z0-9_](?:[A-Za-z0-9_-]{0,61}[A-Za-z0-9])?)*\.?$"
+)
+
+_OCTETS_ONLY = re.compile(r"^[\d.*-]+$")  # address-like: never a hostname (e.g. 10.0.0.300)
+
+_OCTET_PATTERN = re.compile(r"^(?:\*|\d{1,3}|\d{1,3}-\d{0,3}|-\d{1,3})$")
+
+# Octet-range specs expand into one interval per combination of the leading octets
+_MAX_OCTET_INTERVALS = 65536
+
+_ADDRESS_TYPES = {4: ipaddress.IPv4Address, 6: ipaddress.IPv6Address}
+
+
+# ── Interval primitives ─────────────────────────────────────
+
+def _merge_sorted(intervals: Iterable[Interval]) -> List[Interval]:
+    """Merge overlapping or adjacent intervals from a sorted iterable."""
+    merged: List[Interval] = []
+    for lo, hi in intervals:
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _union(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    return _merge_sorted(heapq.merge(a, b))
+
+
+def _subtract(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    """a minus b, both sorted and merged (single two-pointer sweep)."""
+    result: List[Interval] = []
+    j = 0
+    for lo, hi in a:
+        while j < len(b) and b[j][1] < lo:
+            j += 1
+        k = j
+        while k < len(b) and b[k][0] <= hi:
+            if b[k][0] > lo:
+                result.append((lo, b[k][0] - 1))
+            lo = max(lo, b[k][1] + 1)
+            if lo > hi:
+                break
+            k += 1
+        if lo <= hi:
+            result.append((lo, hi))
+    return result
+
+
+def _interval_size(intervals: List[Interval]) -> int:
+    return sum(hi - lo + 1 for lo, hi in intervals)
+
+
+# ── Parsing ─────────────────────────────────────────────────
+
+def _octet_range(spec: str, token: str) -> Tuple[int, int]:
+    """One octet of an nmap octet-range spec: '*', 'N', 'N-M', 'N-' or '-M'."""
+    if spec == "*":
+        return 0, 255
+    start, sep, end = spec.partition("-")
+    first = int(start) if start else 0
+    last = (int(end) if end else 255) if sep else first
+    if last > 255 or first > last:
+        raise ValueError(f"Invalid target range: '{token}'")
+    return first, last
+
+
+def _parse_octet_ranges(token: str) -> Optional[List[Interval]]:
+    """nmap octet ranges (10.0.0-3.1, 192.168.*.1) -> IPv4 intervals, or None if not that syntax."""
+    octets = token.split(".")
+    if len(octets) != 4 or not all(_OCTET_PATTERN.match(octet) for octet in octets):
+        return None
+    ranges = [_octet_range(octet, token) for octet in octets]
+    # Trailing full octets fold into the interval; the octets before the last partial one multiply
+    last_partial = max((i for i, r in enumerate(ranges) if r != (0, 255)), default=0)
+    span = 256 ** (3 - last_partial)
+    lead = ranges[:last_partial]
+    combinations = 1
+    for lo, hi in lead:
+        combinations *= hi - lo + 1
+    if combinations > _MAX_OCTET_INTERVALS:
+        raise ValueError(f"Target '{token}' expands into too many ranges (use CIDRs or full ranges)")
+    lo, hi = ranges[last_partial]
+    intervals = []
+    for prefix in itertools.product(*(range(a, b + 1) for a, b in lead)):
+        base = 0
+        for octet in prefix:
+            base = base * 256 + octet
+        base *= 256 ** (4 - last_partial)
+        intervals.append((base + lo * span, base + (hi + 1) * span - 1))
+    return intervals
+
+
+def _parse_token(token: str) -> Tuple[Optional[int], object]:
+    """One target spec -> (family, [intervals]) or (None, hostname)."""
+    if "/" in token:
+        try:
+            network = ipaddress.ip_network(token, strict=False)
+            return network.version, [(int(network.network_address), int(network.broadcast_address))]
+        except ValueError:
+            pass
+        host, _, prefix = token.rpartition("/")
+        if prefix.isdigit() and int(prefix) <= 32 and _HOSTNAME_PATTERN.match(host) and not _OCTETS_ONLY.match(host):
+            return None, f"{host.lower().rstrip('.')}/{int(prefix)}"  # nmap resolves and expands it
+        raise ValueError(f"Invalid target: '{token}'")
+
+    try:
+        address = ipaddress.ip_address(token)
+        return address.version, [(int(address), int(address))]
+    except ValueError:
+        pass
+
+    start, sep, end = token.partition("-")
+    if sep:
+        try:
+            first = ipaddress.ip_address(start)
+        except ValueError:
+            first = None
+        if first is not None and end:  # "10.0.0.250-" is an open octet range, below
+            if first.version == 4 and end.isdigit():
+                if int(end) > 255:
+                    raise ValueError(f"Invalid target range: '{token}'")
+                last = int(first) - (int(first) & 0xFF) + int(end)
+            else:
+                try:
+                    last_address = ipaddress.ip_address(end)
+                except ValueError:
+                    raise ValueError(f"Invalid target range: '{token}'")
+                if last_address.version != first.version:
+                    raise ValueError(f"Invalid target range: '{token}' mixes IPv4 and IPv6")
+                last = int(last_address)
+            if last < int(first):
+                raise ValueError(f"Invalid target range: '{token}' ends before it starts")
+            return first.version, [(int(first), last)]
+
+    intervals = _parse_octet_ranges(token)
+    if intervals is not None:
+        return 4, intervals
+
+    if _HOSTNAME_PATTERN.match(token) and not _OCTETS_ONLY.match(token):
+        return None, token.lower().rstrip(".")
+    raise ValueError(f"Invalid target: '{token}'")
+
+
+def _hostname_size(hostname: str) -> int:
+    """Addresses a hostname token stands for: 1, or 2^(32-prefix) for name/prefix."""
+    _, slash, prefix = hostname.rpartition("/")
+    return 2 ** (32 - int(prefix)) if slash else 1
+
+
+# ── Target set ──────────────────────────────────────────────
+
+class TargetSet:
+    """Immutable set of addresses (as intervals) and hostnames."""
+
+    __slots__ = ("v4", "v6", "hostnames")
+
+    def __init__(
+        self,
+        v4: Iterable[Interval] = (),
+        v6: Iterable[Interval] = (),
+        hostnames: Iterable[str] = (),
+    ):
+        self.v4 = _merge_sorted(sorted(v4))
+        self.v6 = _merge_sorted(sorted(v6))
+        self.hostnames = tuple(dict.fromkeys(hostnames))
+
+    @classmethod
+    def _from_merged(cls, v4: List[Interval], v6: List[Interval], hostnames: Iterable[str]) -> "TargetSet":
+        target_set = cls.__new__(cls)
+        target_set.v4, target_set.v6 = v4, v6
+        target_set.hostnames = tuple(hostnames)
+        return target_set
+
+    @classmethod
+    def parse(cls, spec: str, exclude: Optional[str] = None) -> "TargetSet":
+        """Compile a target string (comma/space separated), minus an exclude string."""
+        intervals: Dict[int, List[Interval]] = {4: [], 6: []}
+        hostnames: List[str] = []
+        for token in spec.replace(",", " ").split():
+            family, value = _parse_token(token)
+            if family is None:
+                hostnames.append(value)
+            else:
+                intervals[family].extend(value)
+        targets = cls(intervals[4], intervals[6], hostnames)
+        if exclude:
+            targets = targets - cls.parse(exclude)
+        return targets
+
+    # Set operations
+
+    def union(self, other: "TargetSet") -> "TargetSet":
+        return TargetSet._from_merged(
+            _union(self.v4, other.v4),
+            _union(self.v6, other.v6),
+            dict.fromkeys(self.hostnames + other.hostnames),
+        )
+
+    def subtract(self, other: "TargetSet") -> "TargetSet":
+        excluded = set(other.hostnames)
+        return TargetSet._from_merged(
+            _subtract(self.v4, other.v4),
+            _subtract(self.v6, other.v6),
+            (h for h in self.hostnames if h not in excluded),
+        )
+
+    __or__ = union
+    __sub__ = subtract
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TargetSet):
+            return NotImplemented
+        return (self.v4, self.v6, set(self.hostnames)) == (other.v4, other.v6, set(other.hostnames))
+
+    def __bool__(self) -> bool:
+        return bool(self.v4 or self.v6 or self.hostnames)
+
+    @property
+    def size(self) -> int:
+        """Number of targets (addresses + hostnames). May exceed sys.maxsize for IPv6."""
+        return _interval_size(self.v4) + _interval_size(self.v6) + sum(_hostname_size(h) for h in self.hostnames)
+
+    @property
+    def interval_count(self) -> int:
+        return len(self.v4) + len(self.v6) + len(self.hostnames)
+
+    def by_family(self) -> List["TargetSet"]:
+        """Non-empty parts that one nmap run can take: IPv4 + hostnames, and IPv6."""
+        parts = [
+            TargetSet._from_merged(self.v4, [], self.hostnames),
+            TargetSet._from_merged([], self.v6, ()),
+        ]
+        return [part for part in parts if part]
+
+    def chunk(self, count: int) -> List["TargetSet"]:
+        """Split into up to count shards whose sizes differ by at most one."""
+        total = self.size
+        count = max(1, min(count, total))
+        if not total:
+            return []
+        base, extra = divmod(total, count)
+
+        shards: List[TargetSet] = []
+        parts: Dict[int, List] = {4: [], 6: [], 0: []}
+        quota = base + (1 if extra else 0)
+
+        def close_if_full():
+            nonlocal quota, parts
+            if quota <= 0:  # A hostname/prefix token may overshoot
+                shards.append(TargetSet._from_merged(parts[4], parts[6], parts[0]))
+                parts = {4: [], 6: [], 0: []}
+                quota = base + (1 if len(shards) < extra else 0)
+
+        for family, intervals in ((4, self.v4), (6, self.v6)):
+            for lo, hi in intervals:
+                while lo <= hi:
+                    taken = min(hi - lo + 1, quota)
+                    parts[family].append((lo, lo + taken - 1))
+                    lo += taken
+                    quota -= taken
+                    close_if_full()
+        for hostname in self.hostnames:
+            parts[0].append(hostname)
+            quota -= _hostname_size(hostname)
+            close_if_full()
+        if parts[4] or parts[6] or parts[0]:
+            shards.append(TargetSet._from_merged(parts[4], parts[6], parts[0]))
+        return shards
+
+    # Rendering
+
+    def iter_hosts(self) -> Iterator[str]:
+        """Every address, then every hostname, lazily."""
+        for family, intervals in ((4, self.v4), (6, self.v6)):
+            address_type = _ADDRESS_TYPES[family]
+            for lo, hi in intervals:
+                for value in range(lo, hi + 1):
+                    yield str(address_type(value))
+        yield from self.hostnames
+
+    def to_nmap_args(self) -> List[str]:
+        """Minimal list of nmap target specs (single addresses and CIDRs)."""
+        args: List[str] = []
+        for family, intervals in ((4, self.v4), (6, self.v6)):
+            address_type = _ADDRESS_TYPES[family]
+            for lo, hi in intervals:
+                if lo == hi:
+                    args.append(str(address_type(lo)))
+                    continue
+                for network in ipaddress.summarize_address_range(address_type(lo), address_type(hi)):
+                    args.append(str(network.network_address) if network.num_addresses == 1 else str(network))
+        args.extend(self.hostnames)
+        return args
+
+    def has_prefixed_hostnames(self) -> bool:
+        """Whether any hostname is a name/prefix token only nmap can expand."""
+        return any("/" in hostname for hostname in self.hostnames)
+
+    def __str__(self) -> str:
+        return " ".join(self.to_nmap_args())
+
+    def __repr__(self) -> str:
+        return f"TargetSet(size={self.size}, intervals={self.interval_count})"
+
+
+@contextmanager
+def nmap_target_args(args: List[str], max_inline: Optional[int] = None) -> Iterator[List[str]]:
+    """nmap arguments for a target list: inline, or -iL <file> above max_inline targets.
+
+    Keeps argv far below ARG_MAX for fragmented target sets (e.g. a /8 with
+    thousands of excludes). The file is private (mkstemp, 0600) and removed
+    when the block exits.
+    """
+    max_inline = config.NMAP_INLINE_TARGETS_MAX if max_inline is None else max_inline
+    if len(args) <= max_inline:
+        yield list(args)
+        return
+    fd, path = tempfile.mkstemp(prefix="mudaletunnel-targets-", suffix=".txt")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(args) + "\n")
+        yield ["-iL", path]
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,26 @@
+"""Export resume cursors."""
+import pytest
+
+from export import open_records
+from scan_store import ScanStore
+
+
+def _store(tmp_path, count):
+    store = ScanStore(spill_dir=str(tmp_path / "spill"), max_scans=2)
+    for index in range(count):
+        store.create(f"scan-{index}", target="10.0.0.1", status="completed")
+    return store
+
+
+def test_scans_resume_after_cursor(tmp_path):
+    store = _store(tmp_path, 2)
+    records = list(open_records("scans", scan_store=store, cursor="scan-0"))
+    assert [cursor for cursor, _ in records] == ["scan-1"]
+
+
+def test_evicted_scan_cursor_is_rejected(tmp_path):
+    store = _store(tmp_path, 3)  # scan-0 evicted
+    with pytest.raises(ValueError, match="no longer valid"):
+        open_records("scans", scan_store=store, cursor="scan-0")
+    with pytest.raises(ValueError, match="no longer valid"):
+        list(store.iter_scans(after="scan-0"))
@@ -0,0 +1,24 @@
+"""Proxychains config rendering for live tunnels."""
+from proxychains import choose_chain_type, render_config
+
+
+def _proxy(port):
+    return {"tunnel_id": None, "proxy_type": "socks5", "host": "127.0.0.1", "port": port}
+
+
+def test_single_proxy_is_strict():
+    assert choose_chain_type(1) == "strict_chain"
+
+
+def test_multiple_proxies_use_one_proxy_per_connection():
+    proxies = [_proxy(1080), _proxy(1081), _proxy(1082)]
+    chain_type = choose_chain_type(len(proxies))
+    lines = render_config(proxies, chain_type).splitlines()
+
+    assert chain_type == "round_robin_chain"
+    assert "round_robin_chain" in lines
+    assert "chain_len = 1" in lines
+    assert "dynamic_chain" not in lines and "strict_chain" not in lines
+    assert [line for line in lines if line.startswith("socks5 ")] == [
+        "socks5 127.0.0.1 1080", "socks5 127.0.0.1 1081", "socks5 127.0.0.1 1082",
+    ]
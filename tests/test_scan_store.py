@@ -0,0 +1,70 @@
+"""Scan store spill directory permissions and cleanup."""
+import os
+import stat
+
+import pytest
+
+from scan_store import ScanStore
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_spill_dir_and_files_are_private(tmp_path):
+    root = tmp_path / "spill"
+    store = ScanStore(spill_dir=str(root))
+    store.create("scan-1", status="running")
+    store.update("scan-1", status="completed", output="22/tcp open ssh\n")
+
+    assert _mode(root) == 0o700
+    assert os.path.dirname(store.spill_dir) == str(root)
+    assert _mode(store.spill_dir) == 0o700
+    assert _mode(os.path.join(store.spill_dir, "scan-1.out.gz")) == 0o600
+    assert store.read_output("scan-1") == "22/tcp open ssh\n"
+
+
+def test_loose_spill_dir_is_tightened(tmp_path):
+    root = tmp_path / "spill"
+    root.mkdir(mode=0o777)
+    os.chmod(root, 0o777)
+    ScanStore(spill_dir=str(root))
+    assert _mode(root) == 0o700
+
+
+def test_symlinked_spill_dir_is_refused(tmp_path):
+    target = tmp_path / "elsewhere"
+    target.mkdir()
+    link = tmp_path / "spill"
+    link.symlink_to(target)
+    with pytest.raises(PermissionError):
+        ScanStore(spill_dir=str(link))
+
+
+def test_second_store_keeps_live_output(tmp_path):
+    root = str(tmp_path / "spill")
+    first = ScanStore(spill_dir=root)
+    first.create("scan-1", status="running")
+    first.update("scan-1", status="completed", output="live\n")
+    first._blobs.clear()  # Force a read from disk
+
+    ScanStore(spill_dir=root)
+    assert first.read_output("scan-1") == "live\n"
+
+
+def test_orphaned_spill_dirs_are_removed(tmp_path):
+    root = tmp_path / "spill"
+    root.mkdir(mode=0o700)
+    orphan = root / "999999999-old"
+    orphan.mkdir()
+    (orphan / "scan.out.gz").write_bytes(b"x")
+    (root / "notes.txt").write_bytes(b"x")
+
+    store = ScanStore(spill_dir=str(root))
+    assert sorted(os.listdir(root)) == sorted(["notes.txt", os.path.basename(store.spill_dir)])
+
+
+def test_update_of_unknown_scan_writes_nothing(tmp_path):
+    store = ScanStore(spill_dir=str(tmp_path / "spill"))
+    store.update("missing", status="completed", output="x")
+    assert os.listdir(store.spill_dir) == []
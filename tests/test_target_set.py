@@ -0,0 +1,110 @@
+"""Target parsing, set operations and nmap argument rendering."""
+import ipaddress
+import os
+
+import pytest
+
+from target_set import TargetSet, nmap_target_args
+
+
+def _addresses(targets: TargetSet):
+    return [host for host in targets.iter_hosts() if "/" not in host]
+
+
+# ── nmap octet ranges ───────────────────────────────────────
+
+def test_octet_range_in_middle():
+    targets = TargetSet.parse("10.0.0-3.1")
+    assert _addresses(targets) == ["10.0.0.1", "10.0.1.1", "10.0.2.1", "10.0.3.1"]
+    assert targets.size == 4
+    assert not targets.hostnames
+
+
+def test_octet_wildcard_last():
+    targets = TargetSet.parse("192.168.1.*")
+    assert targets == TargetSet.parse("192.168.1.0/24")
+
+
+def test_octet_wildcard_middle_and_open_ranges():
+    assert TargetSet.parse("10.0.*.1").size == 256
+    assert TargetSet.parse("10.0.0.250-") == TargetSet.parse("10.0.0.250-255")
+    assert TargetSet.parse("10.0.0.-2") == TargetSet.parse("10.0.0.0-2")
+
+
+def test_octet_range_folds_trailing_wildcards():
+    targets = TargetSet.parse("10.1-2.*.*")
+    assert targets.v4 == [(int(ipaddress.ip_address("10.1.0.0")), int(ipaddress.ip_address("10.2.255.255")))]
+
+
+def test_octet_range_exclude_and_dedupe():
+    targets = TargetSet.parse("10.0.0-3.1", exclude="10.0.2.1")
+    assert _addresses(targets) == ["10.0.0.1", "10.0.1.1", "10.0.3.1"]
+    assert TargetSet.parse("10.0.0-3.1 10.0.1.1").size == 4
+
+
+def test_octet_range_chunks_by_address():
+    shards = TargetSet.parse("10.0.0-3.1").chunk(2)
+    assert [shard.size for shard in shards] == [2, 2]
+
+
+@pytest.mark.parametrize("token", ["10.0.0.300", "10.0.5-3.1", "10.0.0-999.1"])
+def test_invalid_octets(token):
+    with pytest.raises(ValueError):
+        TargetSet.parse(token)
+
+
+def test_too_many_octet_combinations():
+    with pytest.raises(ValueError):
+        TargetSet.parse("*.*.*.1")
+
+
+# ── hostname/prefix ─────────────────────────────────────────
+
+def test_hostname_prefix_passes_through():
+    targets = TargetSet.parse("scanme.nmap.org/24")
+    assert targets.to_nmap_args() == ["scanme.nmap.org/24"]
+    assert targets.size == 256
+    assert targets.has_prefixed_hostnames()
+
+
+def test_hostname_prefix_shards_keep_every_token():
+    targets = TargetSet.parse("a.example/30 b.example c.example")
+    shards = targets.chunk(3)
+    assert [h for shard in shards for h in shard.hostnames] == ["a.example/30", "b.example", "c.example"]
+
+
+def test_hostname_prefix_invalid():
+    with pytest.raises(ValueError):
+        TargetSet.parse("scanme.nmap.org/40")
+
+
+# ── Existing forms ──────────────────────────────────────────
+
+def test_cidr_range_and_hostname():
+    targets = TargetSet.parse("10.0.0.0/30, 10.0.0.4-6 fileserver.corp")
+    assert targets.size == 8
+    assert targets.to_nmap_args() == ["10.0.0.0/30", "10.0.0.4/31", "10.0.0.6", "fileserver.corp"]
+
+
+def test_exclude_splits_intervals():
+    targets = TargetSet.parse("10.0.0.0/24", exclude="10.0.0.128/25 10.0.0.5")
+    assert targets.size == 127
+
+
+# ── nmap argv ───────────────────────────────────────────────
+
+def test_small_target_lists_stay_inline():
+    with nmap_target_args(["10.0.0.1", "10.0.0.2"], max_inline=5) as args:
+        assert args == ["10.0.0.1", "10.0.0.2"]
+
+
+def test_large_target_lists_use_input_file():
+    excludes = " ".join(f"10.{i // 256}.{i % 256}.1" for i in range(2000))
+    specs = TargetSet.parse("10.0.0.0/8", exclude=excludes).to_nmap_args()
+    with nmap_target_args(specs, max_inline=1000) as args:
+        assert args[0] == "-iL" and len(args) == 2
+        path = args[1]
+        assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+        with open(path) as f:
+            assert f.read().split() == specs
+    assert not os.path.exists(path)
@@ -0,0 +1,22 @@
+"""Trace file export permissions."""
+import os
+import stat
+
+import pytest
+
+import tracing
+
+
+def test_export_file_is_private(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    os.close(tracing._open_private(str(path)))
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_export_refuses_symlink(tmp_path):
+    target = tmp_path / "victim"
+    target.write_text("")
+    link = tmp_path / "traces.jsonl"
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        tracing._open_private(str(link))
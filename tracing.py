@@ -0,0 +1,412 @@
+"""
+Lifecycle tracing for tunnels, scans and web requests.
+
+Spans nest through a context variable, so a tunnel created from an API call
+shows up as: HTTP request -> tunnel.create -> jump host selection, port
+allocation, ssh spawn, readiness wait, registration, WebSocket broadcast.
+asyncio.to_thread and FastAPI background tasks carry the context along;
+thread pools need tracing.bind().
+
+Finished spans are kept in a ring buffer for /api/traces and, with
+MUDALETUNNEL_TRACE_EXPORT=1, appended to a private (0600) local file as
+OTLP/JSON lines (one ExportTraceServiceRequest per line, the
+format of the OpenTelemetry collector's file exporter), readable by
+otel-desktop-viewer, Jaeger's OTLP import and similar tools.
+
+With MUDALETUNNEL_TRACING=0 span() returns a shared no-op object and
+@traced leaves functions undecorated.
+"""
+import asyncio
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from profiling import route_key
+import config
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("mudaletunnel_span", default=None)
+
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+
+# ── Spans ───────────────────────────────────────────────────
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._token = None
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, error: Any):
+        self.error = str(error) or type(error).__name__
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    # Context manager: becomes the current span while the block runs
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.error is None:
+            self.set_error(exc)
+        _current_span.reset(self._token)
+        tracer.finish(self)
+        return False
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def set_error(self, error: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+# ── OTLP/JSON export ────────────────────────────────────────
+
+def _otlp_value(value: Any) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> Dict:
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 2 if span.name.startswith("HTTP ") else 1,  # SERVER / INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items() if v is not None],
+        "status": {"code": _STATUS_ERROR, "message": span.error} if span.error else {"code": _STATUS_OK},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def otlp_request(spans: List[Span]) -> Dict:
+    """Wrap spans in an OTLP ExportTraceServiceRequest."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "mudaletunnel"}}]},
+            "scopeSpans": [{"scope": {"name": "mudaletunnel"}, "spans": [_otlp_span(s) for s in spans]}],
+        }]
+    }
+
+
+def _default_export_path() -> str:
+    user = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"mudaletunnel-traces-{user}.jsonl")
+
+
+def _open_private(path: str) -> int:
+    """Open path for appending as a 0600 file of ours, never through a symlink."""
+    flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0)
+    fd = os.open(path, flags, 0o600)
+    try:
+        info = os.fstat(fd)
+        if hasattr(os, "getuid") and info.st_uid != os.getuid():
+            raise PermissionError(f"Trace file {path} is owned by another user")
+        if info.st_mode & 0o077:
+            os.fchmod(fd, 0o600)
+    except OSError:
+        os.close(fd)
+        raise
+    return fd
+
+
+class _FileExporter:
+    """Appends finished spans to a file from a background thread, in batches."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Span]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+        self.exported = 0
+        self.last_error: Optional[str] = None
+
+    def submit(self, span: Span):
+        if self._thread is None:
+            self._start()
+        self._queue.put(span)
+
+    def _start(self):
+        with self._write_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _drain(self, first: Optional[Span] = None) -> List[Span]:
+        batch = [first] if first is not None else []
+        while len(batch) < config.TRACE_EXPORT_BATCH:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=config.TRACE_EXPORT_INTERVAL)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+
+    def flush(self):
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            self._write(batch)
+
+    def _write(self, batch: List[Span]):
+        line = json.dumps(otlp_request(batch), separators=(",", ":")) + "\n"
+        with self._write_lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) > config.TRACE_EXPORT_MAX_BYTES:
+                    os.replace(self.path, self.path + ".1")  # Keep one rotated file
+                with os.fdopen(_open_private(self.path), "a") as f:
+                    f.write(line)
+                self.exported += len(batch)
+                self.last_error = None
+            except OSError as e:
+                self.last_error = str(e)
+
+
+# ── Tracer ──────────────────────────────────────────────────
+
+class Tracer:
+    """Creates spans, keeps recent ones in memory and feeds the exporter."""
+
+    def __init__(self):
+        self.enabled = config.TRACING_ENABLED
+        self.finished: Deque[Span] = deque(maxlen=config.TRACE_BUFFER_SPANS)
+        self.exporter: Optional[_FileExporter] = None
+        if self.enabled and config.TRACE_EXPORT:
+            path = config.TRACE_EXPORT_PATH or _default_export_path()
+            self.exporter = _FileExporter(os.path.expanduser(path))
+
+    def span(self, name: str, **attributes):
+        """Context manager for a child of the current span (or a new trace)."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(name, _current_span.get(), attributes)
+
+    def start_span(self, name: str, **attributes):
+        """Start a span and make it current; pair with detach() and finish()."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        span = Span(name, _current_span.get(), attributes)
+        span._token = _current_span.set(span)
+        return span
+
+    def detach(self, span):
+        """Restore the span that was current before start_span()."""
+        if isinstance(span, Span) and span._token is not None:
+            _current_span.reset(span._token)
+            span._token = None
+
+    def finish(self, span):
+        if not isinstance(span, Span) or span.end_ns is not None:
+            return
+        span.end_ns = time.time_ns()
+        self.finished.append(span)
+        if self.exporter is not None:
+            self.exporter.submit(span)
+
+    # Queries
+
+    def traces(
+        self,
+        min_duration_ms: float = 0.0,
+        name: Optional[str] = None,
+        errors_only: bool = False,
+        limit: int = 50,
+    ) -> List[Dict]:
+        """Recent traces whose root span matches, slowest first, each with all its spans."""
+        by_trace: Dict[str, List[Span]] = {}
+        for span in list(self.finished):
+            by_trace.setdefault(span.trace_id, []).append(span)
+
+        results = []
+        for trace_id, spans in by_trace.items():
+            roots = [s for s in spans if s.parent_id is None]
+            if not roots:
+                continue  # Root still running or already evicted from the buffer
+            root = roots[0]
+            if root.duration_ms < min_duration_ms:
+                continue
+            if name and name not in root.name:
+                continue
+            if errors_only and not any(s.error for s in spans):
+                continue
+            spans.sort(key=lambda s: s.start_ns)
+            results.append({
+                "trace_id": trace_id,
+                "root": root.name,
+                "start": root.start_ns / 1e9,
+                "duration_ms": round(root.duration_ms, 3),
+                "status": "error" if any(s.error for s in spans) else "ok",
+                "span_count": len(spans),
+                "spans": [s.to_dict() for s in spans],
+            })
+        results.sort(key=lambda t: -t["duration_ms"])
+        return results[:limit]
+
+    def get_trace(self, trace_id: str) -> List[Dict]:
+        spans = sorted((s for s in list(self.finished) if s.trace_id == trace_id), key=lambda s: s.start_ns)
+        return [s.to_dict() for s in spans]
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "buffered_spans": len(self.finished),
+            "export_path": self.exporter.path if self.exporter else None,
+            "exported_spans": self.exporter.exported if self.exporter else 0,
+            "export_error": self.exporter.last_error if self.exporter else None,
+        }
+
+
+tracer = Tracer()
+
+
+def current_span():
+    """The active span, or a no-op span outside any trace."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+def bind(func: Callable) -> Callable:
+    """Run func in a copy of the current context (for thread pool submissions)."""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, func)
+
+
+def traced(name: Optional[str] = None, **attributes):
+    """Decorator running a function (sync or async) inside a span."""
+    def decorator(func):
+        if not tracer.enabled:
+            return func
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ── ASGI middleware ─────────────────────────────────────────
+
+class TracingMiddleware:
+    """Root span per HTTP request, named after the route template.
+
+    The span ends when the response is fully sent; background tasks that run
+    afterwards still appear in the same trace as its children.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Dict[object, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        span = tracer.start_span(f"HTTP {scope['method']}", **{"http.method": scope["method"], "http.target": scope["path"]})
+
+        def finish():
+            span.name = "HTTP " + route_key(scope, self._route_paths)
+            tracer.finish(span)
+
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                span.set("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_error(f"HTTP {message['status']}")
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            await self.app(scope, receive, traced_send)
+        except Exception as e:
+            span.set_error(e)
+            raise
+        finally:
+            finish()
+            tracer.detach(span)
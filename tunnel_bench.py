@@ -0,0 +1,374 @@
+"""
+TunnelBenchmark - Throughput, setup time and latency through a tunnel.
+
+Pushes real data through a tunnel's local end to a destination on the far
+side. Static forwards go to their fixed target; dynamic tunnels CONNECT
+through SOCKS5 to the destination given. Two destination kinds work:
+
+- echo: sends back what it receives (e.g. `socat TCP-LISTEN:9000,fork,reuseaddr
+        EXEC:cat`). Bytes count once they return, so throughput covers the
+        whole path both ways, and small ping-pongs give a latency distribution.
+- sink: discards data and closes on EOF (e.g. `socat -u
+        TCP-LISTEN:9000,fork,reuseaddr OPEN:/dev/null`). Timing ends when the
+        close comes back after our EOF; without that close only the local
+        send is timed and the result is marked unconfirmed.
+
+Offline mode starts an echo/sink server on this machine and runs the same
+measurement directly (baseline) or over a throwaway ssh -L to localhost, so
+transport profiles and relay changes can be compared on one machine.
+Payloads are random bytes, so ssh compression cannot inflate the figures.
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from tunnel_probe import ProbeError, _close, socks5_handshake
+import config
+
+
+BENCH_MODES = ("echo", "sink")
+
+_PING_SIZE = 64
+
+
+class BenchmarkError(Exception):
+    """Raised when data does not make it through the tunnel."""
+
+
+def check_options(mode: str, total_bytes: int, streams: int):
+    """Validate benchmark options. Raises ValueError."""
+    if mode not in BENCH_MODES:
+        raise ValueError(f"Unknown benchmark mode '{mode}' (use {', '.join(BENCH_MODES)})")
+    if not 0 < total_bytes <= config.BENCH_MAX_BYTES:
+        raise ValueError(f"Benchmark size must be between 1 byte and {config.BENCH_MAX_BYTES // (1024 * 1024)} MiB")
+    if not 1 <= streams <= config.BENCH_MAX_STREAMS:
+        raise ValueError(f"Streams must be between 1 and {config.BENCH_MAX_STREAMS}")
+
+
+def distribution(samples: List[float]) -> Optional[Dict]:
+    """Summary of millisecond samples (min/avg/percentiles/max)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 2)
+
+    return {
+        "samples": len(ordered),
+        "min_ms": round(ordered[0], 2),
+        "avg_ms": round(sum(ordered) / len(ordered), 2),
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+def free_local_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# ── Local echo/sink server ──────────────────────────────────
+
+class LocalBenchServer:
+    """Echo or sink server on 127.0.0.1, on its own thread and event loop.
+
+    Runs apart from the measuring loop so the client and server do not
+    share one CPU-bound thread.
+    """
+
+    def __init__(self, mode: str = "echo", port: int = 0):
+        self.mode = mode
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                data = await reader.read(config.BENCH_CHUNK_SIZE)
+                if not data:
+                    break
+                if self.mode == "echo":
+                    writer.write(data)
+                    await writer.drain()
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # Cancelled by _serve(); a cancelled stream callback would be logged as an error
+        finally:
+            self._handlers.discard(task)
+            await _close(writer)
+
+    async def _serve(self, started: threading.Event):
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        started.set()
+        async with server:
+            await self._stop.wait()
+            # Connections the client left open; finish them before the loop closes
+            handlers = list(self._handlers)
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+
+    def start(self) -> int:
+        """Start serving; returns the port."""
+        started = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete, args=(self._serve(started),),
+            name="bench-server", daemon=True,
+        )
+        self._thread.start()
+        if not started.wait(5):
+            raise BenchmarkError("Local benchmark server did not start")
+        return self.port
+
+    def stop(self):
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join(5)
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self) -> "LocalBenchServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ── Benchmark ───────────────────────────────────────────────
+
+class TunnelBenchmark:
+    """Measures one tunnel (or any local port) from its local end."""
+
+    def __init__(
+        self,
+        port: int,
+        socks_dest: Optional[Tuple[str, int]] = None,
+        host: str = "127.0.0.1",
+        timeout: Optional[float] = None,
+    ):
+        self.port = port
+        self.socks_dest = socks_dest
+        self.host = host
+        self.timeout = config.BENCH_TIMEOUT if timeout is None else timeout
+        self._payload = memoryview(os.urandom(config.BENCH_CHUNK_SIZE))
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]:
+        """Connect (and SOCKS CONNECT). Returns reader, writer and setup time in ms."""
+        started = time.perf_counter()
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), config.PROBE_TIMEOUT)
+            if self.socks_dest:
+                await asyncio.wait_for(socks5_handshake(reader, writer, *self.socks_dest), config.PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            if writer is not None:
+                await _close(writer)
+            raise BenchmarkError(f"Connection setup through port {self.port} timed out")
+        except (OSError, asyncio.IncompleteReadError, ProbeError) as e:
+            if writer is not None:
+                await _close(writer)
+            raise BenchmarkError(f"Connection setup through port {self.port} failed: {e}")
+        return reader, writer, (time.perf_counter() - started) * 1000
+
+    async def wait_ready(self, seconds: float):
+        """Retry connecting until the forward accepts (freshly started ssh)."""
+        deadline = time.monotonic() + seconds
+        while True:
+            try:
+                _, writer, _ = await self._open()
+                await _close(writer)
+                return
+            except BenchmarkError:
+                if time.monotonic() >= deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+    async def setup_times(self, count: int) -> List[float]:
+        """Open and close count connections one after another."""
+        samples = []
+        for _ in range(count):
+            _, writer, setup_ms = await self._open()
+            samples.append(setup_ms)
+            await _close(writer)
+        return samples
+
+    async def echo_latency(self, count: int) -> List[float]:
+        """Round trips of a small message on one connection (echo destinations only)."""
+        reader, writer, _ = await self._open()
+        payload = bytes(self._payload[:_PING_SIZE])
+        samples = []
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                writer.write(payload)
+                await writer.drain()
+                await asyncio.wait_for(reader.readexactly(_PING_SIZE), config.PROBE_TIMEOUT)
+                samples.append((time.perf_counter() - started) * 1000)
+        except asyncio.TimeoutError:
+            raise BenchmarkError("No echo within the probe timeout (is the destination an echo service?)")
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise BenchmarkError(f"Echo connection lost: {e}")
+        finally:
+            await _close(writer)
+        return samples
+
+    async def _send(self, writer: asyncio.StreamWriter, nbytes: int):
+        chunk = len(self._payload)
+        remaining = nbytes
+        while remaining > 0:
+            n = min(chunk, remaining)
+            writer.write(self._payload[:n])
+            await writer.drain()
+            remaining -= n
+
+    async def _stream(self, nbytes: int, mode: str) -> bool:
+        """Push nbytes on one connection. Returns whether the far end confirmed receipt."""
+        reader, writer, _ = await self._open()
+        try:
+            if mode == "echo":
+                async def receive():
+                    received = 0
+                    while received < nbytes:
+                        data = await reader.read(4 * config.BENCH_CHUNK_SIZE)
+                        if not data:
+                            raise BenchmarkError(f"Closed by the far side after echoing {received} of {nbytes} bytes")
+                        received += len(data)
+
+                await asyncio.gather(self._send(writer, nbytes), receive())
+                return True
+
+            await self._send(writer, nbytes)
+            if writer.can_write_eof():
+                writer.write_eof()
+            try:
+                # A sink closes once it has read our EOF, i.e. everything we sent
+                while await asyncio.wait_for(reader.read(config.BENCH_CHUNK_SIZE), config.BENCH_SINK_CLOSE_WAIT):
+                    pass
+                return True
+            except asyncio.TimeoutError:
+                return False
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise BenchmarkError(f"Stream failed: {e}")
+        finally:
+            await _close(writer)
+
+    async def throughput(self, total_bytes: int, streams: int, mode: str) -> Dict:
+        per_stream = max(1, total_bytes // streams)
+        started = time.perf_counter()
+        try:
+            confirmed = await asyncio.wait_for(
+                asyncio.gather(*(self._stream(per_stream, mode) for _ in range(streams))), self.timeout,
+            )
+        except asyncio.TimeoutError:
+            raise BenchmarkError(f"Transfer did not finish within {self.timeout:g}s")
+        elapsed = time.perf_counter() - started
+        sent = per_stream * streams
+        return {
+            "bytes": sent,
+            "streams": streams,
+            "elapsed_s": round(elapsed, 3),
+            "mbit_per_s": round(sent * 8 / elapsed / 1e6, 2),
+            "mib_per_s": round(sent / elapsed / (1024 * 1024), 2),
+            "confirmed": all(confirmed),
+        }
+
+    async def run(
+        self,
+        mode: str = "echo",
+        total_bytes: Optional[int] = None,
+        streams: int = 1,
+        connections: int = 10,
+        pings: int = 50,
+    ) -> Dict:
+        total_bytes = total_bytes or config.BENCH_DEFAULT_BYTES
+        check_options(mode, total_bytes, streams)
+        setup = await self.setup_times(connections)
+        latency = await self.echo_latency(pings) if mode == "echo" and pings > 0 else []
+        result = await self.throughput(total_bytes, streams, mode)
+        return {
+            "mode": mode,
+            "port": self.port,
+            "destination": f"{self.socks_dest[0]}:{self.socks_dest[1]}" if self.socks_dest else None,
+            "throughput": result,
+            "setup": distribution(setup),
+            "latency": distribution(latency),
+        }
+
+
+def run_benchmark(
+    port: int,
+    socks_dest: Optional[Tuple[str, int]] = None,
+    mode: str = "echo",
+    total_bytes: Optional[int] = None,
+    streams: int = 1,
+    connections: int = 10,
+    pings: int = 50,
+    ready_wait: float = 0.0,
+) -> Dict:
+    """Blocking wrapper: benchmark a local port on its own event loop."""
+    bench = TunnelBenchmark(port, socks_dest)
+
+    async def main():
+        if ready_wait:
+            await bench.wait_ready(ready_wait)
+        return await bench.run(mode, total_bytes, streams, connections, pings)
+
+    return asyncio.run(main())
+
+
+def run_offline_benchmark(
+    tunnel_manager=None,
+    ssh_user: Optional[str] = None,
+    ssh_host: str = "localhost",
+    transport: Optional[str] = None,
+    mode: str = "echo",
+    total_bytes: Optional[int] = None,
+    streams: int = 1,
+    connections: int = 10,
+    pings: int = 50,
+) -> Dict:
+    """Benchmark against a local echo/sink server.
+
+    Without ssh_user the server is measured directly (the harness baseline);
+    with it, through a temporary ssh -L to ssh_host (which must be this
+    machine) using the given transport profile. The tunnel is stopped after.
+    """
+    check_options(mode, total_bytes or config.BENCH_DEFAULT_BYTES, streams)
+    with LocalBenchServer(mode) as server:
+        if not ssh_user:
+            result = run_benchmark(server.port, None, mode, total_bytes, streams, connections, pings)
+            result["path"] = "direct"
+            return result
+
+        tunnel_id, _ = tunnel_manager.create_static_tunnel(
+            ssh_user, ssh_host, "127.0.0.1", server.port,
+            local_port=free_local_port(), transport=transport,
+        )
+        try:
+            tunnel = tunnel_manager.get_tunnel(tunnel_id)
+            result = run_benchmark(
+                tunnel["local_port"], None, mode, total_bytes, streams, connections, pings,
+                ready_wait=config.SSH_STARTUP_DELAY + config.PROBE_TIMEOUT,
+            )
+        finally:
+            tunnel_manager.stop_tunnel(tunnel_id)
+        result["path"] = f"ssh {ssh_user}@{ssh_host}"
+        result["transport"] = tunnel.get("transport") or "default"
+        return result
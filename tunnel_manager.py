@@ -6,21 +6,58 @@ import subprocess
 import platform
 import re
 import socket
-import threading
 import uuid
 import time
 import signal
 import os
-from typing import Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 from collections import deque
 
+from admission import AdmissionController
+from remote_verify import REMOTE_TUNNEL_TYPES, RemoteListenerChecker, parse_ssh_output
+from profiling import make_lock
+from tracing import bind, current_span, traced, tracer
 import config
 
 
+_SSH_OUTPUT_TAIL = 8192  # bytes of each running ssh's stderr kept for remote bind verification
+
 # Pattern for validating SSH input fields (user, host, address)
 _SAFE_INPUT_PATTERN = re.compile(r'^[a-zA-Z0-9._@\-:/]+$')
 
+# Named sets of ssh -o options, selectable per tunnel (transport=...)
+SSH_TRANSPORT_PROFILES: Dict[str, Dict[str, str]] = {
+    # Bulk transfers: AEAD ciphers (AES-GCM is hardware accelerated), no compression
+    "throughput": {
+        "Ciphers": "aes128-gcm@openssh.com,aes256-gcm@openssh.com,chacha20-poly1305@openssh.com",
+        "Compression": "no",
+        "IPQoS": "throughput",
+        "ServerAliveInterval": "30",
+        "ServerAliveCountMax": "3",
+    },
+    # Slow or lossy links: compress, and notice a dead link within ~15 s
+    "lossy-link": {
+        "Compression": "yes",
+        "ServerAliveInterval": "5",
+        "ServerAliveCountMax": "3",
+        "TCPKeepAlive": "no",
+        "ConnectTimeout": "20",
+        "ConnectionAttempts": "3",
+    },
+    # Fail fast: exit if a forward can't be bound, short timeouts, never prompt
+    "fail-fast": {
+        "ExitOnForwardFailure": "yes",
+        "ConnectTimeout": "5",
+        "ConnectionAttempts": "1",
+        "ServerAliveInterval": "10",
+        "ServerAliveCountMax": "2",
+        "BatchMode": "yes",
+    },
+}
+
 
 class TunnelManager:
     """Manages SSH tunnels with thread-safe operations."""
@@ -29,9 +66,20 @@ class TunnelManager:
         self.active_tunnels: Dict[str, Dict] = {}
         self.tunnel_logs: Dict[str, deque] = {}
         self.tunnel_metrics: Dict[str, Dict] = {}
-        self.lock = threading.Lock()
+        self.tunnel_latency: Dict[str, deque] = {}  # rolling probe RTTs (ms) per tunnel
+        self.tunnel_resources: Dict[str, deque] = {}  # CPU/RSS/fd samples per tunnel (ResourceCollector)
+        # Re-entrant: helpers like _log_tunnel_event/_update_metrics are called with the lock held.
+        # A TimedRLock (wait-time accounting) when profiling is enabled.
+        self.lock = make_lock("TunnelManager.lock")
         self.myip = self._get_local_ip()
         self._port_cache: Dict[int, Tuple[bool, float]] = {}
+        self.revision = 0  # bumped on every tunnel state change; used for conditional GETs
+        self._jump_host_cache: Dict[str, Tuple[Dict, float]] = {}
+        self._probe_executor: Optional[ThreadPoolExecutor] = None
+        self.admission = AdmissionController()  # slots follow status: released when a tunnel stops
+        self.remote_listeners = RemoteListenerChecker()  # shared by every -R tunnel to the same server
+        self._ssh_output: Dict[str, str] = {}  # stderr tail per tunnel, kept by its reader thread
+        self._ssh_readers: Dict[str, threading.Thread] = {}
 
     # ── Validation ──────────────────────────────────────────────
 
@@ -51,6 +99,39 @@ class TunnelManager:
             )
         return value
 
+    @classmethod
+    def _parse_hop(cls, hop: str, default_user: Optional[str] = None) -> Dict:
+        """Parse a chain hop '[user@]host[:port]' into its parts."""
+        hop = cls._validate_input(hop, "chain hop")
+        if hop.startswith("-"):
+            raise ValueError(f"Invalid chain hop: '{hop}'")
+        user, _, host = hop.rpartition("@")
+        user = user or default_user
+        if not user:
+            raise ValueError(f"Chain hop '{hop}' needs a user (user@host)")
+        port = None
+        if host.count(":") == 1:
+            host, port_str = host.split(":")
+            if not port_str.isdigit() or not 0 < int(port_str) < 65536:
+                raise ValueError(f"Invalid port in chain hop: '{hop}'")
+            port = int(port_str)
+        if not host or host.startswith("-"):
+            raise ValueError(f"Invalid chain hop: '{hop}'")
+        return {"user": user, "host": host, "port": port}
+
+    @staticmethod
+    def _hop_spec(hop: Dict) -> str:
+        spec = f"{hop['user']}@{hop['host']}"
+        return f"{spec}:{hop['port']}" if hop["port"] else spec
+
+    @staticmethod
+    def _failed_hop_index(error: str, hops: List[Dict]) -> Optional[int]:
+        """Attribute an ssh -J error message to the hop it names, if any."""
+        for index in range(len(hops) - 1, -1, -1):
+            if re.search(rf"\b{re.escape(hops[index]['host'])}\b", error):
+                return index
+        return None
+
     # ── Internal helpers ────────────────────────────────────────
 
     def _get_local_ip(self) -> str:
@@ -64,6 +145,18 @@ class TunnelManager:
         except Exception:
             return "127.0.0.1"
 
+    @staticmethod
+    def _transport_options(transport: Optional[str]) -> Tuple[Optional[str], Dict[str, str]]:
+        """Resolve a transport profile name (None: SSH_TRANSPORT_PROFILE) to its ssh options."""
+        name = transport if transport is not None else config.SSH_TRANSPORT_PROFILE
+        if not name or name == "default":
+            return None, {}
+        if name not in SSH_TRANSPORT_PROFILES:
+            raise ValueError(
+                f"Unknown transport profile '{name}' (expected one of: default, {', '.join(SSH_TRANSPORT_PROFILES)})"
+            )
+        return name, SSH_TRANSPORT_PROFILES[name]
+
     def _generate_tunnel_id(self) -> str:
         """Generate unique tunnel ID."""
         return str(uuid.uuid4())
@@ -88,6 +181,7 @@ class TunnelManager:
         self._port_cache[port] = (is_available, current_time)
         return not is_available
 
+    @traced("tunnel.allocate_port")
     def _find_free_port(self, start_port: Optional[int] = None) -> int:
         """Find a free port starting from start_port."""
         if start_port is None:
@@ -117,6 +211,23 @@ class TunnelManager:
             log_entry = f"[{timestamp}] [{level}] {message}"
             self.tunnel_logs[tunnel_id].append(log_entry)
 
+    def _bump_revision(self):
+        """Record a tunnel state change."""
+        with self.lock:
+            self.revision += 1
+
+    def _set_status(self, tunnel: Dict, status: str):
+        """Set a tunnel's status, bumping the revision only on real transitions."""
+        with self.lock:
+            previous = tunnel.get("status")
+            if previous != status:
+                tunnel["status"] = status
+                self.revision += 1
+                if status == "stopped":
+                    self.admission.release()
+                elif previous == "stopped":
+                    self.admission.reclaim()
+
     def _update_metrics(self, tunnel_id: str, **kwargs):
         """Update tunnel metrics."""
         with self.lock:
@@ -133,32 +244,162 @@ class TunnelManager:
                 uptime = (datetime.now() - created).total_seconds()
                 self.tunnel_metrics[tunnel_id]["uptime_seconds"] = uptime
 
+    # ── Jump host selection ─────────────────────────────────────
+
+    @staticmethod
+    def _probe_ssh_handshake(host: str, port: Optional[int] = None) -> Dict:
+        """Connect to a jump host's sshd and time until its SSH banner arrives."""
+        result = {"host": host, "ok": False, "rtt_ms": None, "banner": None, "error": None}
+        started = time.perf_counter()
+        try:
+            with socket.create_connection((host, port or config.SSH_PORT), timeout=config.JUMP_PROBE_TIMEOUT) as s:
+                banner = b""
+                while b"\n" not in banner and len(banner) < 255:
+                    chunk = s.recv(255 - len(banner))
+                    if not chunk:
+                        break
+                    banner += chunk
+            if not banner.startswith(b"SSH-"):
+                result["error"] = "No SSH banner received"
+                return result
+            result.update(
+                ok=True,
+                rtt_ms=round((time.perf_counter() - started) * 1000, 2),
+                banner=banner.split(b"\n", 1)[0].strip().decode(errors="replace"),
+            )
+        except (OSError, socket.timeout) as e:
+            result["error"] = str(e) or "timeout"
+        return result
+
+    def _cache_jump_result(self, result: Dict):
+        with self.lock:
+            self._jump_host_cache[result["host"]] = (result, time.time())
+
+    def _cached_jump_result(self, host: str) -> Optional[Dict]:
+        with self.lock:
+            entry = self._jump_host_cache.get(host)
+        if entry and time.time() - entry[1] < config.JUMP_HOST_CACHE_TTL:
+            return {**entry[0], "cached": True}
+        return None
+
+    def _submit_probe(self, host: str):
+        with self.lock:
+            if self._probe_executor is None:
+                self._probe_executor = ThreadPoolExecutor(
+                    max_workers=config.JUMP_PROBE_WORKERS, thread_name_prefix="jump-probe"
+                )
+            future = self._probe_executor.submit(self._probe_ssh_handshake, host)
+        future.add_done_callback(lambda f: self._cache_jump_result(f.result()))
+        return future
+
+    def probe_jump_hosts(self, candidates: List[str], race: bool = False) -> List[Dict]:
+        """Probe candidate jump hosts in parallel; results sorted best-first.
+
+        Results younger than JUMP_HOST_CACHE_TTL are reused instead of re-probing.
+        With race=True, returns as soon as the fastest healthy host is known:
+        probes start together, so the first healthy one to finish (or a cached
+        result faster than anything still in flight) wins. Probes still running
+        keep populating the cache in the background.
+        """
+        hosts = list(dict.fromkeys(self._validate_input(h, "jump host") for h in candidates))
+        if not hosts:
+            raise ValueError("At least one jump host candidate is required")
+
+        results: Dict[str, Dict] = {}
+        for host in hosts:
+            cached = self._cached_jump_result(host)
+            if cached:
+                results[host] = cached
+
+        cached_ok = [r for r in results.values() if r["ok"]]
+        best_cached_ms = min((r["rtt_ms"] for r in cached_ok), default=None)
+        futures = {self._submit_probe(h): h for h in hosts if h not in results}
+
+        # Anything finishing after the best cached RTT is necessarily slower
+        timeout = config.JUMP_PROBE_TIMEOUT + 0.5
+        if race and best_cached_ms is not None:
+            timeout = best_cached_ms / 1000
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                result = future.result()
+                results[result["host"]] = result
+                if race and result["ok"]:
+                    break
+        except FuturesTimeoutError:
+            pass
+
+        for host in hosts:
+            results.setdefault(host, {"host": host, "ok": False, "rtt_ms": None, "pending": True})
+
+        return sorted(
+            results.values(),
+            key=lambda r: (not r["ok"], r["rtt_ms"] if r["rtt_ms"] is not None else float("inf")),
+        )
+
+    def select_jump_host(self, candidates: List[str]) -> Tuple[str, List[Dict]]:
+        """Pick the lowest-latency healthy jump host.
+
+        Returns:
+            Tuple of (selected_host, probe_results)
+        """
+        results = self.probe_jump_hosts(candidates, race=True)
+        if not results[0]["ok"]:
+            errors = ", ".join(f"{r['host']}: {r.get('error') or 'no response'}" for r in results)
+            raise RuntimeError(f"No reachable jump host ({errors})")
+        return results[0]["host"], results
+
+    def _resolve_ssh_host(self, ssh_host: Optional[str], via: Optional[List[str]]) -> Tuple[str, Dict]:
+        """Validate ssh_host, or choose one from ssh_host + via candidates.
+
+        Returns:
+            Tuple of (ssh_host, extra_metadata)
+        """
+        if not via:
+            return self._validate_input(ssh_host, "SSH host"), {}
+        candidates = ([ssh_host] if ssh_host and ssh_host.strip() else []) + list(via)
+        current_span().set("jump_host.candidates", len(candidates))
+        selected, results = self.select_jump_host(candidates)
+        return selected, {"jump_selection": {"selected": selected, "candidates": results}}
+
     # ── Tunnel execution core ───────────────────────────────────
 
     def _execute_ssh_command(self, cmd_list: List[str], tunnel_id: str) -> subprocess.Popen:
-        """Execute SSH command in background using a safe argument list."""
-        is_windows = platform.system() == "Windows"
+        """Execute SSH command in background using a safe argument list.
 
-        if is_windows:
-            creation_flags = subprocess.CREATE_NEW_PROCESS_GROUP
-            process = subprocess.Popen(
-                cmd_list,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                creationflags=creation_flags
-            )
-        else:
-            process = subprocess.Popen(
-                cmd_list,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                preexec_fn=os.setsid if hasattr(os, 'setsid') else None
-            )
+        The trailing -f of the displayed command is dropped: ssh -f forks
+        into a new session after authenticating, so the returned process
+        would exit and the real tunnel would escape the process group that
+        is polled, signalled on stop and sampled for resources. Without it
+        the returned process is the tunnel's ssh for its whole life.
+        """
+        if cmd_list[-1] == "-f":
+            cmd_list = cmd_list[:-1]
+        is_windows = platform.system() == "Windows"
 
-        time.sleep(config.SSH_STARTUP_DELAY)
-        if process.poll() is not None:
-            stderr = process.stderr.read().decode() if process.stderr else "Unknown error"
-            raise RuntimeError(f"SSH command failed: {stderr}")
+        with tracer.span("tunnel.spawn", **{"tunnel.id": tunnel_id}) as span:
+            if is_windows:
+                creation_flags = subprocess.CREATE_NEW_PROCESS_GROUP
+                process = subprocess.Popen(
+                    cmd_list,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    creationflags=creation_flags
+                )
+            else:
+                process = subprocess.Popen(
+                    cmd_list,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    preexec_fn=os.setsid if hasattr(os, 'setsid') else None
+                )
+            span.set("process.pid", process.pid)
+
+        # Readiness: the handshake happens here; a dead process means it failed
+        with tracer.span("tunnel.readiness", **{"tunnel.id": tunnel_id, "wait_s": config.SSH_STARTUP_DELAY}):
+            time.sleep(config.SSH_STARTUP_DELAY)
+            if process.poll() is not None:
+                stderr = process.stderr.read().decode() if process.stderr else "Unknown error"
+                raise RuntimeError(f"SSH command failed: {stderr}")
 
         return process
 
@@ -170,35 +411,64 @@ class TunnelManager:
         log_message: str,
         metadata: Dict,
         execute: bool,
+        transport: Optional[str] = None,
     ) -> Tuple[str, str]:
         """Shared tunnel creation logic — validates, executes, registers, and logs.
 
+        The transport profile's options go right after "ssh" and are recorded
+        in the tunnel's metadata.
+
+        Execution first passes admission control: a global tunnel slot, then a
+        handshake slot on the (first) jump host; both may queue.
+
         Returns:
             Tuple of (tunnel_id, ssh_command_display_string)
         """
+        profile, options = self._transport_options(transport)
+        if options:
+            cmd_list = [cmd_list[0], *(arg for key, value in options.items() for arg in ("-o", f"{key}={value}")), *cmd_list[1:]]
+        metadata = {**metadata, "transport": profile, "ssh_options": dict(options)}
         display_command = " ".join(cmd_list)
 
         if not execute:
             return tunnel_id, display_command
 
+        # Chains handshake with their first hop
+        jump_host = metadata["hops"][0]["host"] if metadata.get("hops") else metadata.get("ssh_host")
         try:
-            process = self._execute_ssh_command(cmd_list, tunnel_id)
-
-            with self.lock:
-                self.active_tunnels[tunnel_id] = {
-                    "id": tunnel_id,
-                    "type": tunnel_type,
-                    "pid": process.pid,
-                    "process": process,
-                    "command": display_command,
-                    "ssh_user": metadata.get("ssh_user"),
-                    "ssh_host": metadata.get("ssh_host"),
-                    "status": "active",
-                    "created_at": datetime.now().isoformat(),
-                    **{k: v for k, v in metadata.items() if k not in ("ssh_user", "ssh_host")},
-                }
-                self._log_tunnel_event(tunnel_id, log_message)
-                self._update_metrics(tunnel_id, status="active")
+            with tracer.span("tunnel.execute", **{
+                "tunnel.id": tunnel_id,
+                "tunnel.type": tunnel_type,
+                "ssh.host": metadata.get("ssh_host") or "",
+                "local_port": metadata.get("local_port") or 0,
+            }):
+                with tracer.span("tunnel.admission", **{"jump_host": jump_host}):
+                    deadline = self.admission.acquire(tunnel_type, jump_host)
+                try:
+                    with self.admission.handshake(jump_host, deadline, tunnel_type):
+                        process = self._execute_ssh_command(cmd_list, tunnel_id)
+                except BaseException:
+                    self.admission.release()
+                    raise
+
+                # Includes the wait for the manager lock
+                with tracer.span("tunnel.register", **{"tunnel.id": tunnel_id}), self.lock:
+                    self.active_tunnels[tunnel_id] = {
+                        "id": tunnel_id,
+                        "type": tunnel_type,
+                        "pid": process.pid,
+                        "process": process,
+                        "command": display_command,
+                        "ssh_user": metadata.get("ssh_user"),
+                        "ssh_host": metadata.get("ssh_host"),
+                        "status": "active",
+                        "created_at": datetime.now().isoformat(),
+                        **{k: v for k, v in metadata.items() if k not in ("ssh_user", "ssh_host")},
+                    }
+                    self._log_tunnel_event(tunnel_id, log_message)
+                    self._update_metrics(tunnel_id, status="active")
+                    self._bump_revision()
+                self._start_output_reader(tunnel_id, process)
 
             return tunnel_id, display_command
         except Exception as e:
@@ -207,6 +477,7 @@ class TunnelManager:
 
     # ── Public tunnel creation API ──────────────────────────────
 
+    @traced("tunnel.create", kind="static")
     def create_static_tunnel(
         self,
         ssh_user: str,
@@ -214,11 +485,16 @@ class TunnelManager:
         target_host: str,
         remote_port: int,
         local_port: Optional[int] = None,
-        execute: bool = True
+        execute: bool = True,
+        via: Optional[List[str]] = None,
+        transport: Optional[str] = None,
     ) -> Tuple[str, str]:
-        """Create a static SSH tunnel (local port forwarding)."""
+        """Create a static SSH tunnel (local port forwarding).
+
+        If via lists candidate jump hosts, the fastest reachable one among
+        ssh_host and via is used.
+        """
         ssh_user = self._validate_input(ssh_user, "SSH user")
-        ssh_host = self._validate_input(ssh_host, "SSH host")
         target_host = self._validate_input(target_host, "target host")
 
         if local_port is None:
@@ -226,6 +502,7 @@ class TunnelManager:
         if self._is_port_in_use(local_port):
             raise ValueError(f"Local port {local_port} is already in use")
 
+        ssh_host, jump_metadata = self._resolve_ssh_host(ssh_host, via)
         tunnel_id = self._generate_tunnel_id()
         cmd_list = ["ssh", "-L", f"{local_port}:{target_host}:{remote_port}",
                      f"{ssh_user}@{ssh_host}", "-N", "-f"]
@@ -241,20 +518,135 @@ class TunnelManager:
                 "remote_port": remote_port,
                 "ssh_user": ssh_user,
                 "ssh_host": ssh_host,
+                **jump_metadata,
             },
             execute=execute,
+            transport=transport,
         )
 
+    @traced("tunnel.allocate_ports")
+    def _allocate_local_ports(self, wanted: List[int], start_port: Optional[int] = None) -> List[int]:
+        """Map wanted ports to distinct free local ports in one pass.
+
+        Each wanted port is kept when it is free, unprivileged (or we are
+        root) and not already handed out; otherwise the next free port from
+        start_port (default BULK_PORT_START) is used. With an explicit
+        start_port every forward is placed sequentially from it.
+        """
+        is_root = hasattr(os, "geteuid") and os.geteuid() == 0
+        assigned = set()
+        allocated = []
+        next_port = config.BULK_PORT_START if start_port is None else start_port
+        for port in wanted:
+            if (
+                start_port is None
+                and port not in assigned
+                and (port >= 1024 or is_root)
+                and not self._is_port_in_use(port)
+            ):
+                local_port = port
+            else:
+                local_port = self._find_free_port(next_port)
+                while local_port in assigned:
+                    local_port = self._find_free_port(local_port + 1)
+                next_port = local_port + 1
+            assigned.add(local_port)
+            allocated.append(local_port)
+        return allocated
+
+    @traced("tunnel.create", kind="bulk_static")
+    def create_bulk_static_tunnels(
+        self,
+        ssh_user: str,
+        ssh_host: Optional[str],
+        forwards: List[Dict],
+        local_port_start: Optional[int] = None,
+        execute: bool = True,
+        via: Optional[List[str]] = None,
+        transport: Optional[str] = None,
+    ) -> Dict:
+        """Bring up many local forwards at once, sharing SSH connections.
+
+        forwards are dicts with remote_host, remote_port and an optional
+        service label. Local ports are allocated in one pass, forwards are
+        packed BULK_FORWARDS_PER_SSH to an ssh process (one SSH connection
+        carrying many -L), and the processes start in parallel.
+
+        Returns:
+            Dict with the mapping table (local_port -> remote_host:remote_port,
+            tunnel_id), the per-process tunnels and any errors.
+        """
+        ssh_user = self._validate_input(ssh_user, "SSH user")
+        self._transport_options(transport)  # Fail before anything starts, not once per batch
+        if not forwards:
+            raise ValueError("No services to tunnel")
+        entries = []
+        for forward in forwards:
+            entries.append({
+                "remote_host": self._validate_input(forward["remote_host"], "target host"),
+                "remote_port": int(forward["remote_port"]),
+                "service": forward.get("service"),
+            })
+
+        ssh_host, jump_metadata = self._resolve_ssh_host(ssh_host, via)
+        local_ports = self._allocate_local_ports([e["remote_port"] for e in entries], local_port_start)
+        for entry, local_port in zip(entries, local_ports):
+            entry["local_port"] = local_port
+
+        size = max(1, config.BULK_FORWARDS_PER_SSH)
+        batches = [entries[i:i + size] for i in range(0, len(entries), size)]
+
+        def launch(batch: List[Dict]) -> Tuple[str, str]:
+            cmd_list = ["ssh"]
+            for entry in batch:
+                cmd_list += ["-L", f"{entry['local_port']}:{entry['remote_host']}:{entry['remote_port']}"]
+            cmd_list += [f"{ssh_user}@{ssh_host}", "-N", "-f"]
+            first = batch[0]
+            return self._register_and_execute_tunnel(
+                tunnel_id=self._generate_tunnel_id(),
+                tunnel_type="static",
+                cmd_list=cmd_list,
+                log_message=f"Bulk static tunnel created: {len(batch)} forward(s) over one SSH connection",
+                metadata={
+                    "local_port": first["local_port"],
+                    "remote_host": first["remote_host"],
+                    "remote_port": first["remote_port"],
+                    "forwards": batch,
+                    "forward_count": len(batch),
+                    "ssh_user": ssh_user,
+                    "ssh_host": ssh_host,
+                    **jump_metadata,
+                },
+                execute=execute,
+                transport=transport,
+            )
+
+        tunnels, errors, mapping = [], [], []
+        with ThreadPoolExecutor(max_workers=min(len(batches), config.BULK_MAX_PARALLEL)) as executor:
+            futures = [executor.submit(bind(launch), batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            try:
+                tunnel_id, command = future.result()
+            except Exception as e:
+                errors.append({"forwards": len(batch), "error": str(e)})
+                continue
+            tunnels.append({"tunnel_id": tunnel_id, "command": command, "forward_count": len(batch)})
+            mapping += [{**entry, "tunnel_id": tunnel_id} for entry in batch]
+
+        return {"ssh_host": ssh_host, "mapping": mapping, "tunnels": tunnels, "errors": errors, **jump_metadata}
+
+    @traced("tunnel.create", kind="dynamic")
     def create_dynamic_tunnel(
         self,
         ssh_user: str,
         ssh_host: str,
         local_port: Optional[int] = None,
-        execute: bool = True
+        execute: bool = True,
+        via: Optional[List[str]] = None,
+        transport: Optional[str] = None,
     ) -> Tuple[str, str]:
-        """Create a dynamic SSH tunnel (SOCKS proxy)."""
+        """Create a dynamic SSH tunnel (SOCKS proxy). See create_static_tunnel for via."""
         ssh_user = self._validate_input(ssh_user, "SSH user")
-        ssh_host = self._validate_input(ssh_host, "SSH host")
 
         if local_port is None:
             for port in config.DEFAULT_SOCKS_PORTS:
@@ -267,6 +659,7 @@ class TunnelManager:
         if self._is_port_in_use(local_port):
             raise ValueError(f"Local port {local_port} is already in use")
 
+        ssh_host, jump_metadata = self._resolve_ssh_host(ssh_host, via)
         tunnel_id = self._generate_tunnel_id()
         cmd_list = ["ssh", "-D", str(local_port),
                      f"{ssh_user}@{ssh_host}", "-N", "-f"]
@@ -280,10 +673,13 @@ class TunnelManager:
                 "local_port": local_port,
                 "ssh_user": ssh_user,
                 "ssh_host": ssh_host,
+                **jump_metadata,
             },
             execute=execute,
+            transport=transport,
         )
 
+    @traced("tunnel.create", kind="remote")
     def create_remote_tunnel(
         self,
         ssh_user: str,
@@ -292,14 +688,16 @@ class TunnelManager:
         target_host: str,
         target_port: int,
         bind_address: str = "127.0.0.1",
-        execute: bool = True
+        execute: bool = True,
+        via: Optional[List[str]] = None,
+        transport: Optional[str] = None,
     ) -> Tuple[str, str]:
-        """Create a remote SSH tunnel (reverse port forwarding)."""
+        """Create a remote SSH tunnel (reverse port forwarding). See create_static_tunnel for via."""
         ssh_user = self._validate_input(ssh_user, "SSH user")
-        ssh_host = self._validate_input(ssh_host, "SSH host")
         target_host = self._validate_input(target_host, "target host")
         bind_address = self._validate_input(bind_address, "bind address")
 
+        ssh_host, jump_metadata = self._resolve_ssh_host(ssh_host, via)
         tunnel_id = self._generate_tunnel_id()
         cmd_list = ["ssh", "-R",
                      f"{bind_address}:{remote_bind_port}:{target_host}:{target_port}",
@@ -317,23 +715,31 @@ class TunnelManager:
                 "bind_address": bind_address,
                 "ssh_user": ssh_user,
                 "ssh_host": ssh_host,
+                **jump_metadata,
             },
             execute=execute,
+            transport=transport,
         )
 
+    @traced("tunnel.create", kind="remote_dynamic")
     def create_remote_dynamic_tunnel(
         self,
         ssh_user: str,
         ssh_host: str,
         remote_socks_port: int,
         bind_address: str = "127.0.0.1",
-        execute: bool = True
+        execute: bool = True,
+        via: Optional[List[str]] = None,
+        transport: Optional[str] = None,
     ) -> Tuple[str, str]:
-        """Create a remote dynamic SSH tunnel (reverse SOCKS proxy). Requires OpenSSH 7.6+."""
+        """Create a remote dynamic SSH tunnel (reverse SOCKS proxy). Requires OpenSSH 7.6+.
+
+        See create_static_tunnel for via.
+        """
         ssh_user = self._validate_input(ssh_user, "SSH user")
-        ssh_host = self._validate_input(ssh_host, "SSH host")
         bind_address = self._validate_input(bind_address, "bind address")
 
+        ssh_host, jump_metadata = self._resolve_ssh_host(ssh_host, via)
         tunnel_id = self._generate_tunnel_id()
         cmd_list = ["ssh", "-R", f"{bind_address}:{remote_socks_port}",
                      f"{ssh_user}@{ssh_host}", "-N", "-f"]
@@ -348,12 +754,148 @@ class TunnelManager:
                 "bind_address": bind_address,
                 "ssh_user": ssh_user,
                 "ssh_host": ssh_host,
+                **jump_metadata,
             },
             execute=execute,
+            transport=transport,
         )
 
+    @traced("tunnel.create", kind="chain")
+    def create_chain_tunnel(
+        self,
+        hops: List[str],
+        forward_type: str = "dynamic",
+        local_port: Optional[int] = None,
+        target_host: Optional[str] = None,
+        target_port: Optional[int] = None,
+        ssh_user: Optional[str] = None,
+        execute: bool = True,
+        transport: Optional[str] = None,
+    ) -> Tuple[str, str]:
+        """Create a multi-hop pivot chain as one ssh process using ProxyJump (-J).
+
+        hops are ordered '[user@]host[:port]' entries; ssh_user is the default
+        user for hops without one. The last hop is the SSH destination and
+        carries the forward: a SOCKS proxy (forward_type="dynamic") or a local
+        port forward to target_host:target_port (forward_type="static").
+        Requires OpenSSH 7.3+.
+        """
+        if len(hops) < 2:
+            raise ValueError("A chain needs at least two hops (use a static or dynamic tunnel for one)")
+        if len(hops) > config.MAX_CHAIN_HOPS:
+            raise ValueError(f"A chain can have at most {config.MAX_CHAIN_HOPS} hops")
+        if ssh_user:
+            ssh_user = self._validate_input(ssh_user, "SSH user")
+        parsed = [self._parse_hop(hop, ssh_user) for hop in hops]
+        final = parsed[-1]
+
+        if forward_type == "dynamic":
+            if local_port is None:
+                local_port = self._find_free_port(config.SOCKS_PORT_START)
+            forward = ["-D", str(local_port)]
+            description = f"SOCKS proxy on port {local_port}"
+        elif forward_type == "static":
+            if not target_port:
+                raise ValueError("Static chains require target_host and target_port")
+            target_host = self._validate_input(target_host, "target host")
+            if local_port is None:
+                local_port = target_port
+            forward = ["-L", f"{local_port}:{target_host}:{target_port}"]
+            description = f"{local_port} -> {target_host}:{target_port}"
+        else:
+            raise ValueError(f"Unknown chain forward type '{forward_type}' (expected dynamic or static)")
+
+        if self._is_port_in_use(local_port):
+            raise ValueError(f"Local port {local_port} is already in use")
+
+        tunnel_id = self._generate_tunnel_id()
+        cmd_list = ["ssh", "-J", ",".join(self._hop_spec(hop) for hop in parsed[:-1]), *forward]
+        if final["port"]:
+            cmd_list += ["-p", str(final["port"])]
+        cmd_list += [f"{final['user']}@{final['host']}", "-N", "-f"]
+
+        chain = " -> ".join(hop["host"] for hop in parsed)
+        metadata = {
+            "forward_type": forward_type,
+            "local_port": local_port,
+            "hops": [{"index": i, **hop} for i, hop in enumerate(parsed)],
+            "hop_count": len(parsed),
+            "chain": chain,
+            "ssh_user": final["user"],
+            "ssh_host": final["host"],
+        }
+        if forward_type == "static":
+            metadata.update(remote_host=target_host, remote_port=target_port)
+
+        try:
+            return self._register_and_execute_tunnel(
+                tunnel_id=tunnel_id,
+                tunnel_type="chain",
+                cmd_list=cmd_list,
+                log_message=f"Chain tunnel created: {chain} ({description})",
+                metadata=metadata,
+                execute=execute,
+                transport=transport,
+            )
+        except RuntimeError as e:
+            index = self._failed_hop_index(str(e), parsed)
+            if index is None:
+                raise
+            raise RuntimeError(f"Chain failed at hop {index + 1} ({parsed[index]['host']}): {e}") from e
+
+    def check_chain_health(self, tunnel_id: str) -> Dict:
+        """Tunnel health plus a per-hop view of a chain tunnel.
+
+        ssh -J exits as soon as any hop fails, so a running chain process
+        means no hop has failed. The first hop is additionally timed with a
+        direct SSH handshake probe; when the process has died, the stderr
+        kept by its reader thread is used to point at the failing hop.
+        """
+        health = self.check_tunnel_health(tunnel_id)
+        with self.lock:
+            tunnel = self.active_tunnels.get(tunnel_id)
+            if not tunnel or tunnel.get("type") != "chain":
+                return health
+            hops = [dict(hop) for hop in tunnel["hops"]]
+
+        if health.get("process_running"):
+            for hop in hops:
+                hop["status"] = "up" if health["healthy"] else "unknown"
+        else:
+            error = self._ssh_output_tail(tunnel_id, wait=1.0)
+            failed = self._failed_hop_index(error, hops)
+            for hop in hops:
+                hop["status"] = "failed" if hop["index"] == failed else "unknown"
+            if failed is not None:
+                hops[failed]["error"] = error.strip().splitlines()[-1]
+
+        first_probe = self._probe_ssh_handshake(hops[0]["host"], hops[0]["port"])
+        hops[0].update(reachable=first_probe["ok"], rtt_ms=first_probe["rtt_ms"])
+        if not first_probe["ok"]:
+            hops[0]["status"] = "failed"
+            hops[0]["error"] = first_probe["error"]
+
+        health["hops"] = hops
+        return health
+
     # ── Tunnel management ───────────────────────────────────────
 
+    def poll_revision(self) -> int:
+        """Refresh process status for all tunnels and return the current revision.
+
+        Cheap enough to call on every poll: one non-blocking poll() per process,
+        no copies. The revision only changes when a tunnel actually changes.
+        """
+        with self.lock:
+            tunnel_items = list(self.active_tunnels.values())
+
+        for tunnel_info in tunnel_items:
+            process = tunnel_info.get("process")
+            if process:
+                self._set_status(tunnel_info, "stopped" if process.poll() is not None else "active")
+
+        return self.revision
+
     def list_tunnels(self) -> List[Dict]:
         """List all tunnels (active and inactive)."""
         with self.lock:
@@ -364,11 +906,10 @@ class TunnelManager:
             process = tunnel_info.get("process")
             if process:
                 if process.poll() is not None:
-                    tunnel_info["status"] = "stopped"
+                    self._set_status(tunnel_info, "stopped")
                 else:
-                    tunnel_info["status"] = "active"
-                    with self.lock:
-                        self._update_metrics(tunnel_id)
+                    self._set_status(tunnel_info, "active")
+                    self._update_metrics(tunnel_id)
 
             tunnel_copy = tunnel_info.copy()
             tunnel_copy.pop("process", None)
@@ -376,6 +917,23 @@ class TunnelManager:
 
         return tunnels
 
+    def iter_tunnels(self, after: Optional[str] = None) -> Iterator[Dict]:
+        """Yield tunnel copies in creation order, starting after tunnel id after.
+
+        Raises ValueError if after is no longer registered (deleted).
+        """
+        self.poll_revision()
+        with self.lock:
+            tunnel_ids = list(self.active_tunnels)
+        if after is not None:
+            if after not in tunnel_ids:
+                raise ValueError(f"Cursor '{after}' is no longer valid: that tunnel was deleted")
+            tunnel_ids = tunnel_ids[tunnel_ids.index(after) + 1:]
+        for tunnel_id in tunnel_ids:
+            tunnel = self.get_tunnel(tunnel_id)
+            if tunnel is not None:
+                yield tunnel
+
     def get_tunnel(self, tunnel_id: str) -> Optional[Dict]:
         """Get tunnel details by ID."""
         with self.lock:
@@ -385,8 +943,10 @@ class TunnelManager:
                 return tunnel
             return None
 
+    @traced("tunnel.stop")
     def stop_tunnel(self, tunnel_id: str) -> bool:
         """Stop a specific tunnel."""
+        current_span().set("tunnel.id", tunnel_id)
         with self.lock:
             if tunnel_id not in self.active_tunnels:
                 return False
@@ -396,25 +956,27 @@ class TunnelManager:
 
             if process:
                 try:
-                    is_windows = platform.system() == "Windows"
-                    if is_windows:
-                        process.terminate()
-                    else:
-                        os.killpg(os.getpgid(process.pid), signal.SIGTERM)
-
-                    try:
-                        process.wait(timeout=config.SSH_PROCESS_TIMEOUT)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
+                    with tracer.span("tunnel.terminate", **{"process.pid": process.pid}) as span:
+                        is_windows = platform.system() == "Windows"
+                        if is_windows:
+                            process.terminate()
+                        else:
+                            os.killpg(os.getpgid(process.pid), signal.SIGTERM)
+
+                        try:
+                            process.wait(timeout=config.SSH_PROCESS_TIMEOUT)
+                        except subprocess.TimeoutExpired:
+                            span.set("killed", True)
+                            process.kill()
 
                     self._log_tunnel_event(tunnel_id, "Tunnel stopped")
-                    tunnel["status"] = "stopped"
+                    self._set_status(tunnel, "stopped")
                     return True
                 except Exception as e:
                     self._log_tunnel_event(tunnel_id, f"Error stopping tunnel: {str(e)}", "ERROR")
                     return False
             else:
-                tunnel["status"] = "stopped"
+                self._set_status(tunnel, "stopped")
                 return True
 
     def stop_all_tunnels(self) -> int:
@@ -447,9 +1009,135 @@ class TunnelManager:
                     created = datetime.fromisoformat(metrics["created_at"])
                     uptime = (datetime.now() - created).total_seconds()
                     metrics["uptime_seconds"] = uptime
+                if tunnel_id in self.tunnel_resources:
+                    metrics["resource_series"] = list(self.tunnel_resources[tunnel_id])
                 return metrics
             return None
 
+    def record_probe(
+        self,
+        tunnel_id: str,
+        ok: bool,
+        rtt_ms: Optional[float] = None,
+        error: Optional[str] = None,
+    ) -> Dict:
+        """Record a data-plane probe result and return rolling latency stats.
+
+        Stats are stored under the "latency" key of the tunnel's metrics.
+        """
+        now = datetime.now().isoformat()
+        with self.lock:
+            samples = self.tunnel_latency.setdefault(tunnel_id, deque(maxlen=config.PROBE_WINDOW))
+            previous = (self.tunnel_metrics.get(tunnel_id) or {}).get("latency") or {}
+
+            stats = {
+                "probes": previous.get("probes", 0) + 1,
+                "failures": previous.get("failures", 0) + (0 if ok else 1),
+                "consecutive_failures": 0 if ok else previous.get("consecutive_failures", 0) + 1,
+                "last_probe_at": now,
+                "last_ok_at": now if ok else previous.get("last_ok_at"),
+                "last_error": None if ok else error,
+            }
+            if ok and rtt_ms is not None:
+                samples.append(rtt_ms)
+
+            if samples:
+                ordered = sorted(samples)
+                stats.update({
+                    "samples": len(ordered),
+                    "last_rtt_ms": round(samples[-1], 2),
+                    "min_rtt_ms": round(ordered[0], 2),
+                    "avg_rtt_ms": round(sum(ordered) / len(ordered), 2),
+                    "p50_rtt_ms": round(ordered[len(ordered) // 2], 2),
+                    "p95_rtt_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                    "max_rtt_ms": round(ordered[-1], 2),
+                })
+
+            self._update_metrics(tunnel_id, latency=stats)
+
+        if not ok and stats["consecutive_failures"] == 1:
+            self._log_tunnel_event(tunnel_id, f"Probe failed: {error}", "WARNING")
+        elif ok and previous.get("consecutive_failures"):
+            self._log_tunnel_event(tunnel_id, f"Probe recovered after {previous['consecutive_failures']} failure(s)")
+        return stats
+
+    @staticmethod
+    def _resource_alerts(point: Dict) -> Dict[str, str]:
+        """Thresholds a resource sample is over, with a description of each (0 disables a limit)."""
+        alerts = {}
+        cpu_percent = point.get("cpu_percent")
+        if config.RESOURCE_CPU_PERCENT_MAX and cpu_percent is not None and cpu_percent > config.RESOURCE_CPU_PERCENT_MAX:
+            alerts["cpu"] = f"CPU {cpu_percent}% > {config.RESOURCE_CPU_PERCENT_MAX:g}%"
+        rss_mb = point["rss_bytes"] / (1024 * 1024)
+        if config.RESOURCE_RSS_MAX_MB and rss_mb > config.RESOURCE_RSS_MAX_MB:
+            alerts["rss"] = f"RSS {rss_mb:.1f} MiB > {config.RESOURCE_RSS_MAX_MB:g} MiB"
+        if config.RESOURCE_FDS_MAX and point["fds"] > config.RESOURCE_FDS_MAX:
+            alerts["fds"] = f"{point['fds']} open fds ({point['sockets']} sockets) > {config.RESOURCE_FDS_MAX}"
+        return alerts
+
+    def record_resources(self, tunnel_id: str, sample: Dict) -> Dict:
+        """Record a process group resource sample and return the derived stats.
+
+        sample has at (epoch seconds), processes, cpu_seconds, rss_bytes, fds
+        and sockets. CPU percent is the CPU time used since the previous
+        sample over the wall time between them. Samples are kept in a
+        RESOURCE_WINDOW series, stats under the "resources" key of the
+        tunnel's metrics; crossing a threshold (either way) logs an event.
+        """
+        with self.lock:
+            series = self.tunnel_resources.setdefault(tunnel_id, deque(maxlen=config.RESOURCE_WINDOW))
+            cpu_percent = None
+            if series and sample["at"] > series[-1]["at"] and sample["cpu_seconds"] >= series[-1]["cpu_seconds"]:
+                last = series[-1]
+                cpu_percent = round((sample["cpu_seconds"] - last["cpu_seconds"]) / (sample["at"] - last["at"]) * 100, 1)
+            point = {
+                "at": round(sample["at"], 3),
+                "processes": sample["processes"],
+                "cpu_seconds": round(sample["cpu_seconds"], 2),
+                "cpu_percent": cpu_percent,
+                "rss_bytes": sample["rss_bytes"],
+                "fds": sample["fds"],
+                "sockets": sample["sockets"],
+            }
+            series.append(point)
+
+            previous = (self.tunnel_metrics.get(tunnel_id) or {}).get("resources") or {}
+            alerts = self._resource_alerts(point)
+            stats = {
+                **{k: v for k, v in point.items() if k != "at"},
+                "sampled_at": datetime.fromtimestamp(sample["at"]).isoformat(),
+                "samples": len(series),
+                "peak_rss_bytes": max(previous.get("peak_rss_bytes", 0), point["rss_bytes"]),
+                "peak_fds": max(previous.get("peak_fds", 0), point["fds"]),
+                "alerts": sorted(alerts),
+            }
+            self._update_metrics(tunnel_id, resources=stats)
+
+        was_over = set(previous.get("alerts", ()))
+        for name in sorted(set(alerts) - was_over):
+            self._log_tunnel_event(tunnel_id, f"Resource threshold exceeded: {alerts[name]}", "WARNING")
+        for name in sorted(was_over - set(alerts)):
+            self._log_tunnel_event(tunnel_id, f"Resource usage back under the {name} threshold")
+        return stats
+
+    def resource_snapshot(self) -> Dict[str, Dict]:
+        """Latest resource stats of every active tunnel that has been sampled."""
+        with self.lock:
+            return {
+                tunnel_id: dict(self.tunnel_metrics[tunnel_id]["resources"])
+                for tunnel_id, tunnel in self.active_tunnels.items()
+                if tunnel.get("status") == "active" and "resources" in self.tunnel_metrics.get(tunnel_id, {})
+            }
+
+    def record_benchmark(self, tunnel_id: str, result: Dict):
+        """Keep the last benchmark result under the "benchmark" key of the tunnel's metrics."""
+        throughput = result["throughput"]
+        self._update_metrics(tunnel_id, benchmark={**result, "at": datetime.now().isoformat()})
+        self._log_tunnel_event(
+            tunnel_id,
+            f"Benchmark ({result['mode']}): {throughput['mbit_per_s']} Mbit/s over {throughput['streams']} stream(s)",
+        )
+
     def check_tunnel_health(self, tunnel_id: str) -> Dict:
         """Check if tunnel is healthy (port listening, process running)."""
         with self.lock:
@@ -472,7 +1160,7 @@ class TunnelManager:
                     health["process_running"] = True
                 else:
                     health["reason"] = "Process terminated"
-                    tunnel["status"] = "stopped"
+                    self._set_status(tunnel, "stopped")
                     return health
             else:
                 health["reason"] = "Process not found"
@@ -485,6 +1173,134 @@ class TunnelManager:
                     health["reason"] = f"Port {local_port} not listening"
                     return health
 
-            health["healthy"] = True
-            self._update_metrics(tunnel_id, last_status_check=datetime.now().isoformat())
+            if tunnel.get("type") not in REMOTE_TUNNEL_TYPES or not config.REMOTE_VERIFY_ENABLED:
+                health["healthy"] = True
+                self._update_metrics(tunnel_id, last_status_check=datetime.now().isoformat())
+                return health
+
+        # Outside the lock: may run one ssh command on the server (shared, cached per host)
+        remote_bind = self.verify_remote_bind(tunnel_id)
+        health["remote_bind"] = remote_bind
+        if remote_bind["verified"] is False:
+            health["reason"] = remote_bind["reason"]
             return health
+        health["healthy"] = True
+        self._update_metrics(tunnel_id, last_status_check=datetime.now().isoformat())
+        return health
+
+    # ── Remote bind verification ────────────────────────────────
+
+    def _start_output_reader(self, tunnel_id: str, process: subprocess.Popen):
+        """Drain a tunnel's ssh stderr on a daemon thread for the process's life.
+
+        ssh logs a line for every refused channel ("channel N: open failed");
+        left unread, the pipe fills and ssh blocks on write, so the tunnel
+        stops forwarding while it still looks active.
+        """
+        if process.stderr is None:
+            return
+        thread = threading.Thread(
+            target=self._drain_ssh_output, args=(tunnel_id, process.stderr),
+            name="ssh-output", daemon=True,
+        )
+        with self.lock:
+            self._ssh_readers[tunnel_id] = thread
+        thread.start()
+
+    def _drain_ssh_output(self, tunnel_id: str, stream):
+        """Keep the last _SSH_OUTPUT_TAIL bytes of ssh's stderr and log each line as an event."""
+        try:
+            for raw in iter(stream.readline, b""):
+                line = raw.decode(errors="replace")
+                with self.lock:
+                    self._ssh_output[tunnel_id] = (self._ssh_output.get(tunnel_id, "") + line)[-_SSH_OUTPUT_TAIL:]
+                if line.strip():
+                    self._log_tunnel_event(tunnel_id, f"ssh: {line.strip()}", "WARNING")
+        except (OSError, ValueError):
+            pass  # Pipe closed under us
+
+    def _ssh_output_tail(self, tunnel_id: str, wait: float = 0.0) -> str:
+        """ssh's recent stderr; wait lets the reader catch up with an exited process."""
+        with self.lock:
+            reader = self._ssh_readers.get(tunnel_id)
+        if reader is not None and wait:
+            reader.join(wait)
+        with self.lock:
+            return self._ssh_output.get(tunnel_id, "")
+
+    @staticmethod
+    def _remote_port(tunnel: Dict) -> Optional[int]:
+        port = tunnel.get("remote_bind_port", tunnel.get("remote_socks_port"))
+        return None if port is None else int(port)
+
+    def verify_remote_bind(self, tunnel_id: str, listeners: Optional[Dict] = None) -> Dict:
+        """Confirm a remote/remote_dynamic tunnel's listener exists on the SSH server.
+
+        ssh's "remote port forwarding failed" output decides first; otherwise
+        the server's listening sockets (listeners, or a cached per-host check)
+        must include the port. verified is None when neither could tell.
+        The result is kept under the "remote_bind" key of the tunnel's metrics
+        and a change to or from a failed bind is logged.
+        """
+        tunnel = self.get_tunnel(tunnel_id)
+        if tunnel is None or tunnel.get("type") not in REMOTE_TUNNEL_TYPES:
+            return {"verified": None, "source": None, "reason": "Not a remote tunnel"}
+        output = self._ssh_output_tail(tunnel_id)
+        reported = parse_ssh_output(output)
+        port = self._remote_port(tunnel)
+        if not port and reported["allocated_ports"]:
+            port = reported["allocated_ports"][-1]  # -R 0: the server picked the port
+            with self.lock:
+                self.active_tunnels[tunnel_id]["allocated_port"] = port
+        host = tunnel.get("ssh_host")
+        result = {"verified": None, "source": None, "port": port, "host": host, "reason": "", "checked_at": datetime.now().isoformat()}
+
+        if port in reported["failed_ports"]:
+            result.update(verified=False, source="ssh_output", reason=f"Server refused remote bind on {host}:{port}")
+        elif port:
+            if listeners is None:
+                created_at = datetime.fromisoformat(tunnel["created_at"]).timestamp() if tunnel.get("created_at") else 0.0
+                listeners = self.remote_listeners.check(tunnel.get("ssh_user"), host, newer_than=created_at)
+            result["source"] = "listener_check"
+            result["cached"] = listeners.get("cached", False)
+            if not listeners["ok"]:
+                result["reason"] = f"Could not list listeners on {host}: {listeners['error']}"
+            else:
+                addresses = [f"{address}:{p}" for address, p in listeners["listeners"] if p == port]
+                if addresses:
+                    result.update(verified=True, listening_on=addresses)
+                else:
+                    result.update(verified=False, reason=f"Nothing listening on {host}:{port}")
+        else:
+            result["reason"] = "Remote port not known yet"
+
+        with self.lock:
+            previous = (self.tunnel_metrics.get(tunnel_id) or {}).get("remote_bind") or {}
+        self._update_metrics(tunnel_id, remote_bind=result)
+        if result["verified"] is False and previous.get("verified") is not False:
+            self._log_tunnel_event(tunnel_id, f"Remote bind not verified: {result['reason']}", "WARNING")
+        elif result["verified"] and previous.get("verified") is False:
+            self._log_tunnel_event(tunnel_id, f"Remote bind verified on {host}:{port}")
+        return result
+
+    def verify_remote_tunnels(self) -> Dict[str, Dict]:
+        """Verify every active remote tunnel, with one listener check per (user, host)."""
+        self.poll_revision()
+        with self.lock:
+            tunnels = [
+                (tunnel_id, tunnel.get("ssh_user"), tunnel.get("ssh_host"), tunnel.get("created_at"))
+                for tunnel_id, tunnel in self.active_tunnels.items()
+                if tunnel.get("status") == "active" and tunnel.get("type") in REMOTE_TUNNEL_TYPES
+            ]
+        if not tunnels:
+            return {}
+        # Per server: skip a cached listing taken before its newest tunnel started
+        newest: Dict[Tuple[str, str], float] = {}
+        for _, user, host, created_at in tunnels:
+            started = datetime.fromisoformat(created_at).timestamp() if created_at else 0.0
+            newest[(user, host)] = max(newest.get((user, host), 0.0), started)
+        by_host = self.remote_listeners.check_many(newest)
+        return {
+            tunnel_id: self.verify_remote_bind(tunnel_id, by_host[(user, host)])
+            for tunnel_id, user, host, _ in tunnels
+        }
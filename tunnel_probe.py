@@ -0,0 +1,206 @@
+"""
+TunnelProber - Active end-to-end latency probing through tunnels.
+
+check_tunnel_health only proves the ssh process is alive and the local port
+is bound. The prober pushes real traffic through each tunnel on one asyncio
+event loop:
+
+- static:  TCP connect to the local forward, then a short wait to catch ssh
+           closing the channel because the target is unreachable
+- dynamic: SOCKS5 greeting + CONNECT through the proxy to a probe target
+           on the far side (default 127.0.0.1:22, i.e. the pivot's own sshd)
+- chain:   probed like its forward type (static or dynamic) on the last hop
+
+Results are recorded in TunnelManager.tunnel_metrics as rolling latency stats.
+"""
+import asyncio
+import ipaddress
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+from tunnel_manager import TunnelManager
+import config
+
+
+PROBED_TUNNEL_TYPES = ("static", "dynamic", "chain")
+
+_SOCKS5_REPLY_ERRORS = {
+    1: "general SOCKS server failure",
+    2: "connection not allowed by ruleset",
+    3: "network unreachable",
+    4: "host unreachable",
+    5: "connection refused",
+    6: "TTL expired",
+    7: "command not supported",
+    8: "address type not supported",
+}
+
+
+class ProbeError(Exception):
+    """Raised when traffic does not make it through a tunnel."""
+
+
+# ── Probe primitives ────────────────────────────────────────
+
+async def _close(writer: asyncio.StreamWriter):
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except Exception:
+        pass
+
+
+def socks5_connect_request(host: str, port: int) -> bytes:
+    """Build a SOCKS5 CONNECT request for an IPv4/IPv6 address or hostname."""
+    try:
+        address = ipaddress.ip_address(host)
+        if address.version == 4:
+            dest = b"\x01" + address.packed
+        else:
+            dest = b"\x04" + address.packed
+    except ValueError:
+        encoded = host.encode("idna")
+        dest = b"\x03" + bytes([len(encoded)]) + encoded
+    return b"\x05\x01\x00" + dest + struct.pack("!H", port)
+
+
+async def socks5_handshake(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    dest_host: str,
+    dest_port: int,
+):
+    """Perform a no-auth SOCKS5 greeting and CONNECT on an open connection."""
+    writer.write(b"\x05\x01\x00")
+    await writer.drain()
+    version, method = await reader.readexactly(2)
+    if version != 5 or method != 0:
+        raise ProbeError("SOCKS5 proxy rejected no-auth method")
+
+    writer.write(socks5_connect_request(dest_host, dest_port))
+    await writer.drain()
+    version, reply, _, atyp = await reader.readexactly(4)
+    if version != 5:
+        raise ProbeError("Invalid SOCKS5 reply")
+    if reply != 0:
+        raise ProbeError(f"SOCKS5 CONNECT failed: {_SOCKS5_REPLY_ERRORS.get(reply, f'code {reply}')}")
+
+    # Consume the bound address so the stream is positioned at payload data
+    if atyp == 1:
+        await reader.readexactly(4 + 2)
+    elif atyp == 4:
+        await reader.readexactly(16 + 2)
+    elif atyp == 3:
+        length = (await reader.readexactly(1))[0]
+        await reader.readexactly(length + 2)
+
+
+async def probe_tcp_forward(port: int, timeout: float, host: str = "127.0.0.1") -> float:
+    """Connect through a local port forward. Returns connect RTT in milliseconds."""
+    started = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError) as e:
+        raise ProbeError(f"Connect to {host}:{port} failed: {e or 'timeout'}")
+    rtt_ms = (time.perf_counter() - started) * 1000
+
+    try:
+        # ssh accepts locally before opening the remote channel; if the target
+        # is unreachable it closes the connection right away.
+        data = await asyncio.wait_for(reader.read(1), config.PROBE_CLOSE_WAIT)
+        if data == b"":
+            raise ProbeError("Forward closed by remote side (target unreachable?)")
+    except asyncio.TimeoutError:
+        pass  # Silent but open: the channel is up
+    except (OSError, asyncio.IncompleteReadError) as e:
+        raise ProbeError(f"Forward reset: {e}")
+    finally:
+        await _close(writer)
+    return rtt_ms
+
+
+async def probe_socks5(
+    port: int,
+    dest_host: str,
+    dest_port: int,
+    timeout: float,
+    host: str = "127.0.0.1",
+) -> float:
+    """SOCKS5 CONNECT through a dynamic tunnel. Returns handshake RTT in milliseconds."""
+    started = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        await asyncio.wait_for(socks5_handshake(reader, writer, dest_host, dest_port), timeout)
+    except asyncio.TimeoutError:
+        raise ProbeError(f"SOCKS5 probe to {dest_host}:{dest_port} timed out")
+    except (OSError, asyncio.IncompleteReadError) as e:
+        raise ProbeError(f"SOCKS5 probe failed: {e}")
+    finally:
+        if writer is not None:
+            await _close(writer)
+    return (time.perf_counter() - started) * 1000
+
+
+# ── Prober ──────────────────────────────────────────────────
+
+class TunnelProber:
+    """Runs data-plane probes for all tunnels concurrently on one event loop."""
+
+    def __init__(self, tunnel_manager: TunnelManager):
+        self.tunnel_manager = tunnel_manager
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _probe_target(self, tunnel: Dict) -> Tuple[str, int]:
+        """Far-side destination for SOCKS probes (per-tunnel override or config default)."""
+        return (
+            tunnel.get("probe_host") or config.PROBE_SOCKS_TARGET_HOST,
+            int(tunnel.get("probe_port") or config.PROBE_SOCKS_TARGET_PORT),
+        )
+
+    async def probe_tunnel(self, tunnel: Dict) -> Dict:
+        """Probe one tunnel and record the result in its metrics."""
+        tunnel_id = tunnel["id"]
+        tunnel_type = tunnel.get("type")
+        if tunnel_type not in PROBED_TUNNEL_TYPES or not tunnel.get("local_port"):
+            return {"tunnel_id": tunnel_id, "ok": None, "reason": f"Probing not supported for {tunnel_type} tunnels"}
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(config.PROBE_CONCURRENCY)
+
+        async with self._semaphore:
+            try:
+                if tunnel.get("forward_type", tunnel_type) == "dynamic":
+                    dest_host, dest_port = self._probe_target(tunnel)
+                    rtt_ms = await probe_socks5(tunnel["local_port"], dest_host, dest_port, config.PROBE_TIMEOUT)
+                else:
+                    rtt_ms = await probe_tcp_forward(tunnel["local_port"], config.PROBE_TIMEOUT)
+            except ProbeError as e:
+                stats = self.tunnel_manager.record_probe(tunnel_id, ok=False, error=str(e))
+                return {"tunnel_id": tunnel_id, "ok": False, "error": str(e), "latency": stats}
+
+        stats = self.tunnel_manager.record_probe(tunnel_id, ok=True, rtt_ms=rtt_ms)
+        return {"tunnel_id": tunnel_id, "ok": True, "rtt_ms": round(rtt_ms, 2), "latency": stats}
+
+    async def probe_all(self) -> List[Dict]:
+        """Probe every active tunnel concurrently."""
+        tunnels = [
+            t for t in self.tunnel_manager.list_tunnels()
+            if t.get("status") == "active" and t.get("type") in PROBED_TUNNEL_TYPES
+        ]
+        if not tunnels:
+            return []
+        return list(await asyncio.gather(*(self.probe_tunnel(t) for t in tunnels)))
+
+    async def run(self, interval: Optional[float] = None):
+        """Probe all tunnels forever, every interval seconds."""
+        interval = config.PROBE_INTERVAL if interval is None else interval
+        while True:
+            try:
+                await self.probe_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass  # A probe round must never kill the loop
+            await asyncio.sleep(interval)
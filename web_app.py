@@ -5,102 +5,229 @@ import asyncio
 import subprocess
 import platform
 import os
-from typing import Dict, List, Optional
+import uuid
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from jinja2 import Environment, FileSystemLoader
-from pydantic import BaseModel
 import json
 
-from tunnel_manager import TunnelManager
-from nmap_parser import parse_nmap_services
+from tunnel_manager import SSH_TRANSPORT_PROFILES, TunnelManager
+from admission import AdmissionRejected
+from api_models import (
+    ScanRequest, StaticTunnelRequest, DynamicTunnelRequest,
+    RemoteTunnelRequest, RemoteDynamicTunnelRequest, ChainTunnelRequest,
+    ProxychainsConfig, ProxychainsSyncRequest, JumpHostProbeRequest, BulkTunnelRequest,
+    SocksPoolRequest, SocksPoolScaleRequest, BenchmarkRequest, OfflineBenchmarkRequest,
+)
+from nmap_parser import parse_nmap_services, services_to_forwards
+from service_catalog import ServiceCatalog
+from scan_store import ScanStore
+from api_responses import CompressionMiddleware, FastJSONResponse, dumps, send_json
+from node_pool import AGENT_TOKEN_HEADER, AgentError, NodePool
+from profiling import RequestTimingMiddleware, RequestTimings, SamplingProfiler, lock_stats
+from tunnel_probe import TunnelProber
+from remote_verify import REMOTE_TUNNEL_TYPES
+from proc_stats import PROC_AVAILABLE, ResourceCollector
+from static_assets import CachedPage, StaticAssets
+from export import EXPORT_COLUMNS, EXPORT_FORMATS, encode, open_records
+from tunnel_bench import BenchmarkError, run_benchmark, run_offline_benchmark
+from socks_pool import SocksPool
+from socks_scan import SOCKS_SCAN_PROFILES, SocksScanner, find_proxychains, parse_ports
+from port_scan import CONNECT_SCAN_PROFILES, check_target_size, expand_targets, run_connect_scan
+from target_set import TargetSet, nmap_target_args
+from tracing import TracingMiddleware, bind, current_span, traced, tracer
+import proxychains
 import config
 
-app = FastAPI(title="MudaleTunnel Web Interface")
+app = FastAPI(title="MudaleTunnel Web Interface", default_response_class=FastJSONResponse)
 
-# Mount static files and templates
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Opt-in profiling: request timings (outermost, so compression time is included)
+request_timings: Optional[RequestTimings] = None
+sampling_profiler = SamplingProfiler()
+if config.PROFILING_ENABLED:
+    request_timings = RequestTimings()
+    app.add_middleware(RequestTimingMiddleware, timings=request_timings)
+
+# Lifecycle tracing: one root span per HTTP request, see /api/traces
+if tracer.enabled:
+    app.add_middleware(TracingMiddleware)
+
+# Static files: served from memory, precompressed, immutable under hashed names
 if os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    static_assets: Optional[StaticAssets] = StaticAssets("static")
+    static_assets.preload()
+    app.mount("/static", static_assets, name="static")
+else:
+    static_assets = None
 
-# Jinja2 template environment
+# Jinja2 template environment; the dashboard is rendered once per template/asset version
 if os.path.exists("templates"):
     jinja_env = Environment(loader=FileSystemLoader("templates"))
+    jinja_env.globals["static_url"] = static_assets.url if static_assets else (lambda name: f"/static/{name}")
+    dashboard_page: Optional[CachedPage] = CachedPage(jinja_env, "index.html", static_assets)
 else:
     jinja_env = None
+    dashboard_page = None
 
 # Shared tunnel manager instance (can be set from main.py)
 tunnel_manager = TunnelManager()
 
+# Tunnel creations can wait in the admission queue; their threads must not
+# starve the default executor that other asyncio.to_thread calls share
+tunnel_create_executor = ThreadPoolExecutor(
+    max_workers=config.ADMISSION_QUEUE_MAX + 16, thread_name_prefix="tunnel-create"
+)
+
+# Remote agents managed in coordinator mode (can be set from main.py)
+node_pool = NodePool.from_specs(config.AGENT_NODES, token=config.AGENT_TOKEN)
+
+# Data-plane prober; created at startup so it binds the final tunnel_manager
+tunnel_prober: Optional[TunnelProber] = None
+resource_collector: Optional[ResourceCollector] = None
+_background_tasks: set = set()
+
 # WebSocket connections for real-time updates (using set for O(1) operations)
 active_connections: set = set()
 
-# Scan tasks storage
-scan_tasks: Dict[str, Dict] = {}
+# Load-balanced SOCKS front ends, by pool id
+socks_pools: Dict[str, SocksPool] = {}
 
+# Keeps the proxychains config file pointed at the fastest healthy tunnel
+proxychains_writer: Optional[proxychains.ProxychainsWriter] = None
+_proxychains_task: Optional[asyncio.Task] = None
 
-class ScanRequest(BaseModel):
-    target: str
-    scan_type: str = "full"  # quick, full, service, stealth, udp
+# Scan storage: small summaries in memory, raw nmap output compressed and spilled to disk
+scan_store = ScanStore()
 
+# Compiled targets of queued/running scans, by scan id: (scan_type, ports, targets)
+active_scan_targets: Dict[str, Tuple[str, Optional[str], TargetSet]] = {}
 
-class StaticTunnelRequest(BaseModel):
-    ssh_user: str
-    ssh_host: str
-    target_host: str
-    remote_port: int
-    local_port: Optional[int] = None
-    execute: bool = True
+# Per-process token so ETags from a previous server run never match
+_ETAG_INSTANCE = uuid.uuid4().hex[:8]
 
+# Deduplicated, indexed view of services from completed scans
+service_catalog = ServiceCatalog()
 
-class DynamicTunnelRequest(BaseModel):
-    ssh_user: str
-    ssh_host: str
-    local_port: Optional[int] = None
-    execute: bool = True
 
+async def broadcast_tunnel_update(message: dict):
+    """Broadcast tunnel update to all connected WebSocket clients. Optimized with set."""
+    with tracer.span("ws.broadcast", **{"ws.connections": len(active_connections), "message.type": message.get("type")}):
+        payload = dumps(message).decode("utf-8")  # Serialize once for all clients
+        disconnected = set()
+        for connection in active_connections.copy():  # Copy to avoid modification during iteration
+            try:
+                await connection.send_text(payload)
+            except Exception:
+                disconnected.add(connection)
+    
+    # Remove disconnected connections (O(1) with set)
+    active_connections.difference_update(disconnected)
 
-class RemoteTunnelRequest(BaseModel):
-    ssh_user: str
-    ssh_host: str
-    remote_bind_port: int
-    target_host: str
-    target_port: int
-    bind_address: str = "127.0.0.1"
-    execute: bool = True
 
+def _revision_etag(kind: str, *revisions: int) -> str:
+    """Build a weak ETag from change counters instead of hashing the body."""
+    return f'W/"{_ETAG_INSTANCE}-{kind}-{"-".join(str(r) for r in revisions)}"'
 
-class RemoteDynamicTunnelRequest(BaseModel):
-    ssh_user: str
-    ssh_host: str
-    remote_socks_port: int
-    bind_address: str = "127.0.0.1"
-    execute: bool = True
 
+def _etag_headers(etag: str) -> Dict[str, str]:
+    """Headers that make clients revalidate with If-None-Match on every poll."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
 
-class ProxychainsConfig(BaseModel):
-    proxy_type: str = "socks5"  # socks4, socks5, http
-    proxy_host: str
-    proxy_port: int
-    chain_type: str = "strict_chain"  # strict_chain, dynamic_chain, random_chain
 
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already has this revision, else None."""
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=_etag_headers(etag))
+    return None
 
-async def broadcast_tunnel_update(message: dict):
-    """Broadcast tunnel update to all connected WebSocket clients. Optimized with set."""
-    disconnected = set()
-    for connection in active_connections.copy():  # Copy to avoid modification during iteration
-        try:
-            await connection.send_json(message)
-        except Exception:
-            disconnected.add(connection)
-    
-    # Remove disconnected connections (O(1) with set)
-    active_connections.difference_update(disconnected)
+
+# ── List windows (dashboard virtual scrolling) ─────────────
+
+def _port_number(port: Optional[str]) -> int:
+    """'22/tcp' -> 22 (0 if unparsable)."""
+    number = str(port or "").split("/", 1)[0]
+    return int(number) if number.isdigit() else 0
+
+
+_TUNNEL_SORTS = {
+    "created_at": lambda t: t.get("created_at") or "",
+    "type": lambda t: t.get("type") or "",
+    "status": lambda t: t.get("status") or "",
+    "local_port": lambda t: t.get("local_port") or 0,
+    "ssh_host": lambda t: t.get("ssh_host") or "",
+}
+_TUNNEL_SEARCH_FIELDS = ("id", "type", "ssh_user", "ssh_host", "local_port", "remote_host", "remote_port", "target_host", "chain")
+
+_SERVICE_SORTS = {
+    "port": lambda s: (_port_number(s.get("port")), s.get("host") or ""),
+    "host": lambda s: (s.get("host") or "", _port_number(s.get("port"))),
+    "service": lambda s: (s.get("service") or "", _port_number(s.get("port"))),
+    "state": lambda s: (s.get("state") or "", _port_number(s.get("port"))),
+}
+_SERVICE_SEARCH_FIELDS = ("host", "port", "service", "state", "version")
+
+
+def _window(
+    items: List[Dict],
+    sorts: Dict,
+    search_fields: Tuple[str, ...],
+    sort: Optional[str],
+    q: Optional[str],
+    offset: int,
+    limit: Optional[int],
+) -> Tuple[List[Dict], int]:
+    """Filter (substring match), sort ("field" or "-field") and slice. Returns the rows and the filtered total."""
+    if q:
+        needle = q.lower()
+        items = [item for item in items if any(needle in str(item.get(f) or "").lower() for f in search_fields)]
+    if sort:
+        field = sort.lstrip("-")
+        if field not in sorts:
+            raise HTTPException(status_code=400, detail=f"Cannot sort by '{field}' (use {', '.join(sorts)})")
+        items = sorted(items, key=sorts[field], reverse=sort.startswith("-"))
+    offset = max(0, offset)
+    limit = len(items) if limit is None else max(1, min(limit, config.LIST_WINDOW_MAX))
+    return items[offset:offset + limit], len(items)
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Start periodic tunnel probing, resource sampling (and proxychains file sync if enabled)."""
+    global tunnel_prober, resource_collector
+    tunnel_prober = TunnelProber(tunnel_manager)
+    if config.PROBE_ENABLED:
+        task = asyncio.create_task(tunnel_prober.run())
+        _background_tasks.add(task)
+    resource_collector = ResourceCollector(tunnel_manager)
+    if config.RESOURCE_ENABLED and PROC_AVAILABLE:
+        _background_tasks.add(asyncio.create_task(resource_collector.run()))
+    if config.PROXYCHAINS_AUTO_WRITE:
+        _start_proxychains_sync()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """Cancel background tasks, stop SOCKS pools and close agent connections."""
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    _stop_proxychains_sync()
+    for pool in list(socks_pools.values()):
+        await pool.stop()
+    socks_pools.clear()
+    node_pool.close()
 
 
-def get_nmap_command(target: str, scan_type: str) -> list:
-    """Get nmap command based on scan type."""
+def get_nmap_command(targets: TargetSet, scan_type: str, target_args: Optional[List[str]] = None) -> list:
+    """Get nmap command based on scan type (target_args replaces the inline target list, e.g. -iL)."""
     base_cmd = ["nmap"]
     
     scan_types = {
@@ -118,96 +245,336 @@ def get_nmap_command(target: str, scan_type: str) -> list:
         # Default to full scan
         base_cmd.extend(["-p-", "-sV"])
     
-    base_cmd.append(target)
+    if targets.v6:
+        base_cmd.append("-6")
+    base_cmd.extend(target_args if target_args is not None else targets.to_nmap_args())
     return base_cmd
 
 
-def run_nmap_scan(target: str, scan_id: str, scan_type: str = "full"):
-    """Run nmap scan in background with specified scan type."""
+def _nmap_shards(targets: TargetSet) -> List[TargetSet]:
+    """Partition targets for parallel nmap processes (one process for small scans)."""
+    count = min(config.NMAP_PARALLEL_SHARDS, -(-targets.size // config.NMAP_SHARD_MIN_HOSTS))
+    # nmap can't mix IPv4 and IPv6 in one run: shard each family separately
+    return [
+        chunk
+        for part in targets.by_family()
+        for chunk in part.chunk(max(1, round(count * part.size / targets.size)))
+    ]
+
+
+def _finish_scan(scan_id: str, **fields):
+    """Store a scan's final status; it no longer covers targets for deduplication."""
+    scan_store.update(scan_id, **fields)
+    active_scan_targets.pop(scan_id, None)
+
+
+def _complete_scan(
+    scan_id: str,
+    target: str,
+    scan_type: str,
+    output: str,
+    services: List[Dict],
+    stderr: str = "",
+    **extra,
+):
+    """Store a finished scan's output and services and feed the service catalog."""
+    current_span().set("scan.services", len(services))
+    with tracer.span("scan.catalog", **{"scan.id": scan_id}):
+        service_catalog.ingest_scan(scan_id, target, scan_type, services)
+    
+    fields = {
+        "status": "completed",
+        "output": output,
+        "progress": "Scan completed",
+        "services": services,
+        "service_count": len(services),
+        **extra,
+    }
+    
+    # Log for debugging if no services found
+    if len(services) == 0:
+        # Check if there are any "open" lines at all
+        open_lines = [l for l in output.splitlines() if "open" in l.lower()]
+        fields["parse_debug"] = {
+            "output_lines": len(output.splitlines()),
+            "open_lines_found": len(open_lines),
+            "sample_open_lines": open_lines[:5] if open_lines else [],
+            "sample_output": output[:1000] if output else "No output",
+            "stderr": stderr[:500] if stderr else "No stderr"
+        }
+    
+    with tracer.span("scan.store", **{"scan.id": scan_id, "output_bytes": len(output)}):
+        _finish_scan(scan_id, **fields)
+
+
+@traced("scan.run", **{"scan.engine": "nmap"})
+def run_nmap_scan(target: str, scan_id: str, scan_type: str = "full", targets: Optional[TargetSet] = None):
+    """Run nmap scan in background with specified scan type.
+
+    Large target sets are split into equal shards run by parallel nmap
+    processes; their outputs are concatenated in shard order.
+    """
+    span = current_span()
+    span.set("scan.id", scan_id)
+    span.set("scan.type", scan_type)
     try:
-        scan_tasks[scan_id]["status"] = "running"
-        scan_tasks[scan_id]["progress"] = f"Starting {scan_type} scan..."
-        scan_tasks[scan_id]["scan_type"] = scan_type
-        
-        nmap_cmd = get_nmap_command(target, scan_type)
-        result = subprocess.run(
-            nmap_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=config.NMAP_SCAN_TIMEOUT
+        scan_store.update(
+            scan_id,
+            status="running",
+            progress=f"Starting {scan_type} scan...",
+            scan_type=scan_type,
         )
         
-        scan_tasks[scan_id]["status"] = "completed"
-        scan_tasks[scan_id]["output"] = result.stdout
-        scan_tasks[scan_id]["progress"] = "Scan completed"
+        shards = _nmap_shards(targets if targets is not None else TargetSet.parse(target))
+        span.set("scan.shards", len(shards))
+        done = []
         
-        # Parse services from nmap output using shared parser
-        services = parse_nmap_services(result.stdout)
+        def run_shard(shard: TargetSet) -> subprocess.CompletedProcess:
+            with tracer.span("scan.nmap_shard", **{"scan.id": scan_id, "target_count": shard.size}) as shard_span, \
+                    nmap_target_args(shard.to_nmap_args()) as target_args:
+                result = subprocess.run(
+                    get_nmap_command(shard, scan_type, target_args),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                    timeout=config.NMAP_SCAN_TIMEOUT
+                )
+                shard_span.set("exit_code", result.returncode)
+            done.append(shard)
+            if len(shards) > 1:
+                scan_store.update(scan_id, progress=f"{len(done)}/{len(shards)} shards completed")
+            return result
         
-        scan_tasks[scan_id]["services"] = services
-        scan_tasks[scan_id]["service_count"] = len(services)
+        with ThreadPoolExecutor(max_workers=len(shards)) as executor:
+            futures = [executor.submit(bind(run_shard), shard) for shard in shards]
+            results = [future.result() for future in futures]
+        output = "\n".join(r.stdout for r in results)
         
-        # Log for debugging if no services found
-        if len(services) == 0:
-            # Check if there are any "open" lines at all
-            open_lines = [l for l in result.stdout.splitlines() if "open" in l.lower()]
-            scan_tasks[scan_id]["parse_debug"] = {
-                "output_lines": len(result.stdout.splitlines()),
-                "open_lines_found": len(open_lines),
-                "sample_open_lines": open_lines[:5] if open_lines else [],
-                "sample_output": result.stdout[:1000] if result.stdout else "No output",
-                "stderr": result.stderr[:500] if result.stderr else "No stderr"
-            }
+        # Parse services from nmap output using shared parser
+        services = parse_nmap_services(output)
+        _complete_scan(
+            scan_id, target, scan_type, output, services,
+            "\n".join(r.stderr for r in results if r.stderr),
+            shards=len(shards),
+        )
         
     except subprocess.TimeoutExpired:
-        scan_tasks[scan_id]["status"] = "failed"
-        scan_tasks[scan_id]["error"] = "Scan timed out"
+        span.set_error("Scan timed out")
+        _finish_scan(scan_id, status="failed", error="Scan timed out")
+    except Exception as e:
+        span.set_error(e)
+        _finish_scan(scan_id, status="failed", error=str(e))
+
+
+@traced("scan.run", **{"scan.engine": "socks"})
+def run_socks_scan(
+    target: str,
+    scan_id: str,
+    scan_type: str,
+    tunnels: List[Dict],
+    ports: Optional[str] = None,
+    targets: Optional[TargetSet] = None,
+):
+    """Run a sharded connect scan through dynamic tunnels in background."""
+    span = current_span()
+    span.set("scan.id", scan_id)
+    span.set("scan.type", scan_type)
+    span.set("scan.tunnels", len(tunnels))
+    try:
+        scan_store.update(
+            scan_id,
+            status="running",
+            progress=f"Starting {scan_type} scan through {len(tunnels)} tunnel(s)...",
+            scan_type=scan_type,
+        )
+        
+        def progress(done: int, total: int):
+            scan_store.update(scan_id, progress=f"{done}/{total} shards completed")
+        
+        result = SocksScanner(tunnels).run(
+            targets if targets is not None else target, scan_type, ports=ports, progress=progress,
+        )
+        shard_errors = result["errors"]
+        _complete_scan(
+            scan_id, target, scan_type, result["output"], result["services"],
+            "\n".join(e["error"] for e in shard_errors),
+            tunnel_ids=[t["id"] for t in tunnels],
+            shards=result["shards"],
+            shards_per_tunnel=result["shards_per_tunnel"],
+            shard_errors=shard_errors,
+        )
+        
     except Exception as e:
-        scan_tasks[scan_id]["status"] = "failed"
-        scan_tasks[scan_id]["error"] = str(e)
+        span.set_error(e)
+        _finish_scan(scan_id, status="failed", error=str(e))
+
+
+@traced("scan.run", **{"scan.engine": "connect"})
+def run_builtin_scan(
+    target: str,
+    scan_id: str,
+    scan_type: str,
+    tunnels: Optional[List[Dict]] = None,
+    ports: Optional[str] = None,
+    targets: Optional[TargetSet] = None,
+):
+    """Run the asyncio connect scanner in background, direct or through dynamic tunnels."""
+    span = current_span()
+    span.set("scan.id", scan_id)
+    span.set("scan.type", scan_type)
+    span.set("scan.tunnels", len(tunnels or []))
+    try:
+        transport = f"through {len(tunnels)} tunnel(s)" if tunnels else "direct"
+        scan_store.update(
+            scan_id,
+            status="running",
+            progress=f"Starting {scan_type} scan ({transport})...",
+            scan_type=scan_type,
+        )
+        
+        def progress(done: int, total: int):
+            scan_store.update(scan_id, progress=f"{done}/{total} probes completed")
+        
+        result = run_connect_scan(
+            expand_targets(targets if targets is not None else target),
+            parse_ports(ports if ports else CONNECT_SCAN_PROFILES[scan_type]["ports"]),
+            socks_proxies=[("127.0.0.1", t["local_port"]) for t in tunnels or []],
+            progress=progress,
+        )
+        _complete_scan(
+            scan_id, target, scan_type, result["output"], result["services"],
+            scan_stats=result["stats"],
+            tunnel_ids=[t["id"] for t in tunnels or []],
+        )
+        
+    except Exception as e:
+        span.set_error(e)
+        _finish_scan(scan_id, status="failed", error=str(e))
+
+
+def _uncovered_targets(scan_type: str, ports: Optional[str], targets: TargetSet) -> Tuple[TargetSet, List[str]]:
+    """Subtract targets already covered by queued/running scans of the same kind.
+
+    Returns the remaining targets and the ids of the scans that cover the rest.
+    """
+    covered_by = []
+    for scan_id, (other_type, other_ports, other_targets) in list(active_scan_targets.items()):
+        summary = scan_store.get(scan_id)
+        if not summary or summary.get("status") not in ("queued", "running"):
+            del active_scan_targets[scan_id]
+            continue
+        if (other_type, other_ports) != (scan_type, ports):
+            continue
+        remaining = targets - other_targets
+        if remaining.size < targets.size:
+            covered_by.append(scan_id)
+            targets = remaining
+    return targets, covered_by
+
+
+def _resolve_scan_tunnels(tunnel_ids: Optional[List[str]]) -> List[Dict]:
+    """Active SOCKS tunnels for a socks_* scan: the requested ones, or all of them."""
+    socks_tunnels = {p["tunnel_id"] for p in proxychains.collect_proxies(tunnel_manager)}
+    if not tunnel_ids:
+        if not socks_tunnels:
+            raise HTTPException(status_code=400, detail="No active dynamic tunnels to scan through")
+        return [t for t in tunnel_manager.list_tunnels() if t["id"] in socks_tunnels]
+    
+    tunnels = []
+    for tunnel_id in dict.fromkeys(tunnel_ids):
+        if tunnel_id not in socks_tunnels:
+            raise HTTPException(status_code=400, detail=f"Tunnel {tunnel_id} is not an active dynamic tunnel")
+        tunnels.append(tunnel_manager.get_tunnel(tunnel_id))
+    return tunnels
 
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Serve the main dashboard."""
-    if jinja_env is None:
+    if dashboard_page is None:
         return HTMLResponse(content="<h1>Templates directory not found</h1>", status_code=500)
-    template = jinja_env.get_template("index.html")
-    html_content = template.render(request=request)
-    return HTMLResponse(content=html_content)
+    return dashboard_page.response(request.headers)
 
 
 @app.post("/api/scan")
 async def initiate_scan(scan_request: ScanRequest, background_tasks: BackgroundTasks):
-    """Initiate an nmap scan."""
-    import uuid
+    """Initiate an nmap scan.
+
+    The target is compiled (minus exclude) and, with dedupe, reduced by what
+    queued/running scans of the same type and ports already cover.
+    """
+    socks_tunnels = None
+    builtin = scan_request.scan_type in CONNECT_SCAN_PROFILES
+    if scan_request.scan_type in SOCKS_SCAN_PROFILES and not find_proxychains():
+        raise HTTPException(status_code=400, detail="proxychains4 is not installed (required for SOCKS scans)")
+    try:
+        targets = TargetSet.parse(scan_request.target, scan_request.exclude)
+        if scan_request.ports:
+            parse_ports(scan_request.ports)
+        if builtin:
+            check_target_size(targets)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not targets:
+        raise HTTPException(status_code=400, detail="No targets left to scan after exclusions")
+    if scan_request.scan_type in SOCKS_SCAN_PROFILES or (builtin and scan_request.tunnel_ids):
+        socks_tunnels = _resolve_scan_tunnels(scan_request.tunnel_ids)
+    
+    covered_by = []
+    if scan_request.dedupe:
+        targets, covered_by = _uncovered_targets(scan_request.scan_type, scan_request.ports, targets)
+        if not targets:
+            return {"scan_id": covered_by[0], "status": "deduplicated", "covered_by": covered_by}
+    
     scan_id = str(uuid.uuid4())
     
-    scan_tasks[scan_id] = {
-        "id": scan_id,
-        "target": scan_request.target,
-        "status": "queued",
-        "progress": "Queued for execution",
-        "created_at": datetime.now().isoformat()
-    }
+    scan_store.create(
+        scan_id,
+        target=scan_request.target,
+        exclude=scan_request.exclude,
+        target_count=targets.size,
+        covered_by=covered_by,
+        status="queued",
+        progress="Queued for execution",
+        scan_type=scan_request.scan_type,
+        created_at=datetime.now().isoformat(),
+    )
+    active_scan_targets[scan_id] = (scan_request.scan_type, scan_request.ports, targets)
+    current_span().set("scan.id", scan_id)
+    current_span().set("target_count", targets.size)
     
-    background_tasks.add_task(run_nmap_scan, scan_request.target, scan_id, scan_request.scan_type)
+    if builtin:
+        background_tasks.add_task(
+            run_builtin_scan, scan_request.target, scan_id, scan_request.scan_type,
+            socks_tunnels, scan_request.ports, targets,
+        )
+    elif socks_tunnels is not None:
+        background_tasks.add_task(
+            run_socks_scan, scan_request.target, scan_id, scan_request.scan_type,
+            socks_tunnels, scan_request.ports, targets,
+        )
+    else:
+        background_tasks.add_task(run_nmap_scan, scan_request.target, scan_id, scan_request.scan_type, targets)
     
-    return {"scan_id": scan_id, "status": "queued"}
+    return {"scan_id": scan_id, "status": "queued", "target_count": targets.size, "covered_by": covered_by}
 
 
 @app.get("/api/scan/status/{scan_id}")
-async def get_scan_status(scan_id: str):
-    """Get scan status and results."""
-    if scan_id not in scan_tasks:
+async def get_scan_status(scan_id: str, include_output: bool = False):
+    """Get scan status and results.
+
+    Raw nmap output is served by /api/scan/{scan_id}/output; pass
+    include_output=true to embed it here as well.
+    """
+    task = scan_store.get(scan_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Scan not found")
     
-    task = scan_tasks[scan_id].copy()
-    # Remove large output if scan is still running (to reduce payload)
+    # Remove debug info if scan is still running (to reduce payload)
     if task.get("status") == "running":
-        task.pop("output", None)
         task.pop("parse_debug", None)
+    elif include_output and scan_store.has_output(scan_id):
+        task["output"] = scan_store.read_output(scan_id)
     
     # Always include services (even if empty list)
     # This ensures the frontend always gets a services array
@@ -219,16 +586,90 @@ async def get_scan_status(scan_id: str):
         # Keep parse_debug for completed scans with no services
         pass
     
-    return task
+    return FastJSONResponse(task)
+
+
+@app.get("/api/scan/{scan_id}/services")
+async def get_scan_services(
+    scan_id: str,
+    q: Optional[str] = None,
+    sort: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+):
+    """A filtered, sorted window of one scan's services (for virtual scrolling)."""
+    task = scan_store.get(scan_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    services, total = _window(task.get("services") or [], _SERVICE_SORTS, _SERVICE_SEARCH_FIELDS, sort, q, offset, limit)
+    return FastJSONResponse(
+        {"scan_id": scan_id, "status": task.get("status"), "services": services, "total": total, "offset": max(0, offset)},
+    )
+
+
+@app.get("/api/scan/{scan_id}/output")
+async def get_scan_output(scan_id: str):
+    """Stream a scan's raw nmap output on demand."""
+    if scan_id not in scan_store:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    if not scan_store.has_output(scan_id):
+        raise HTTPException(status_code=404, detail="No output recorded for this scan")
+    return StreamingResponse(scan_store.iter_output(scan_id), media_type="text/plain; charset=utf-8")
+
+
+@app.post("/api/scan/{scan_id}/tunnel-all")
+async def tunnel_all_services(scan_id: str, bulk_request: BulkTunnelRequest):
+    """Forward every open TCP service from a scan in one call.
+
+    Local ports are allocated in one pass and forwards share SSH connections
+    (BULK_FORWARDS_PER_SSH per ssh process), started in parallel.
+    """
+    task = scan_store.get(scan_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    if task.get("status") != "completed":
+        raise HTTPException(status_code=409, detail=f"Scan is {task.get('status')}, not completed")
+
+    # A bare single-host target can stand in for services without a host
+    target = task.get("target", "")
+    default_host = target if target and not any(c in target for c in "/-, ") else None
+    forwards = services_to_forwards(task.get("services", []), default_host, bulk_request.ports)
+    if not forwards:
+        raise HTTPException(status_code=400, detail="No open TCP services to tunnel")
+
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            tunnel_create_executor, bind(tunnel_manager.create_bulk_static_tunnels),
+            bulk_request.ssh_user, bulk_request.ssh_host, forwards,
+            bulk_request.local_port_start, bulk_request.execute, bulk_request.via,
+            bulk_request.transport,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create tunnels: {str(e)}")
+
+    if result["tunnels"] and bulk_request.execute:
+        await broadcast_tunnel_update({
+            "type": "tunnels_created",
+            "tunnel_ids": [t["tunnel_id"] for t in result["tunnels"]],
+            "tunnel_type": "static",
+        })
+    return {"success": not result["errors"], "scan_id": scan_id, **result}
 
 
 @app.get("/api/scans")
-async def get_all_scans():
+async def get_all_scans(request: Request):
     """Get all scan history."""
+    etag = _revision_etag("scans", scan_store.revision)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    
     scans = []
-    for scan_id, task in scan_tasks.items():
+    for task in scan_store.list_scans():
         scan_info = {
-            "id": scan_id,
+            "id": task["id"],
             "target": task.get("target", "unknown"),
             "status": task.get("status", "unknown"),
             "scan_type": task.get("scan_type", "full"),
@@ -239,27 +680,82 @@ async def get_all_scans():
         scans.append(scan_info)
     # Sort by created_at descending (newest first)
     scans.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-    return {"scans": scans}
+    return FastJSONResponse({"scans": scans}, headers=_etag_headers(etag))
 
 
 @app.get("/api/services")
-async def get_services():
-    """Get all discovered services from completed scans."""
-    all_services = []
-    for scan_id, task in scan_tasks.items():
-        if task.get("status") == "completed" and "services" in task:
-            for service in task["services"]:
-                service["scan_id"] = scan_id
-                service["target"] = task.get("target", "unknown")
-                service["scan_type"] = task.get("scan_type", "full")
-                all_services.append(service)
-    return {"services": all_services}
+async def get_services(
+    request: Request,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    protocol: Optional[str] = None,
+    service: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """Get discovered services from completed scans (deduplicated, filtered, paginated)."""
+    etag = _revision_etag("services", service_catalog.revision)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    try:
+        page = service_catalog.query(
+            host=host, port=port, protocol=protocol, service=service,
+            cursor=cursor, limit=limit,
+        )
+        return FastJSONResponse(page, headers=_etag_headers(etag))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/export/{dataset}.{fmt}")
+async def export_dataset(
+    dataset: str,
+    fmt: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_cursor: bool = False,
+    scan_id: Optional[str] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    protocol: Optional[str] = None,
+    service: Optional[str] = None,
+    status: Optional[str] = None,
+    kind: Optional[str] = Query(None, alias="type"),
+):
+    """Stream services, scans or tunnels as NDJSON or CSV, in constant memory.
+
+    With include_cursor=true every record carries a cursor; pass the last one
+    back as ?cursor= to resume an interrupted export.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format '{fmt}' (use {', '.join(EXPORT_FORMATS)})")
+    try:
+        records = open_records(
+            dataset, catalog=service_catalog, scan_store=scan_store, tunnel_manager=tunnel_manager,
+            cursor=cursor, scan_id=scan_id, host=host, port=port, protocol=protocol, service=service,
+            status=status, kind=kind,
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    chunks = encode(records, fmt, EXPORT_COLUMNS[dataset], include_cursor, limit)
+    # A sync iterator: Starlette pulls each batch in a worker thread, off the event loop
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'},
+    )
 
 
 async def _handle_tunnel_creation(tunnel_type: str, create_func, *args) -> dict:
     """Shared handler for tunnel creation endpoints."""
     try:
-        tunnel_id, ssh_command = create_func(*args)
+        # Runs in a worker thread: admission queueing, jump host probing and ssh startup block
+        tunnel_id, ssh_command = await asyncio.get_running_loop().run_in_executor(
+            tunnel_create_executor, bind(create_func), *args
+        )
         await broadcast_tunnel_update({
             "type": "tunnel_created",
             "tunnel_id": tunnel_id,
@@ -274,6 +770,8 @@ async def _handle_tunnel_creation(tunnel_type: str, create_func, *args) -> dict:
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create tunnel: {str(e)}")
 
@@ -286,6 +784,7 @@ async def create_static_tunnel(tunnel_request: StaticTunnelRequest):
         tunnel_request.ssh_user, tunnel_request.ssh_host,
         tunnel_request.target_host, tunnel_request.remote_port,
         tunnel_request.local_port, tunnel_request.execute,
+        tunnel_request.via, tunnel_request.transport,
     )
 
 
@@ -296,6 +795,7 @@ async def create_dynamic_tunnel(tunnel_request: DynamicTunnelRequest):
         "dynamic", tunnel_manager.create_dynamic_tunnel,
         tunnel_request.ssh_user, tunnel_request.ssh_host,
         tunnel_request.local_port, tunnel_request.execute,
+        tunnel_request.via, tunnel_request.transport,
     )
 
 
@@ -307,7 +807,7 @@ async def create_remote_tunnel(tunnel_request: RemoteTunnelRequest):
         tunnel_request.ssh_user, tunnel_request.ssh_host,
         tunnel_request.remote_bind_port, tunnel_request.target_host,
         tunnel_request.target_port, tunnel_request.bind_address,
-        tunnel_request.execute,
+        tunnel_request.execute, tunnel_request.via, tunnel_request.transport,
     )
 
 
@@ -318,15 +818,67 @@ async def create_remote_dynamic_tunnel(tunnel_request: RemoteDynamicTunnelReques
         "remote_dynamic", tunnel_manager.create_remote_dynamic_tunnel,
         tunnel_request.ssh_user, tunnel_request.ssh_host,
         tunnel_request.remote_socks_port, tunnel_request.bind_address,
-        tunnel_request.execute,
+        tunnel_request.execute, tunnel_request.via, tunnel_request.transport,
+    )
+
+
+@app.post("/api/tunnels/chain")
+async def create_chain_tunnel(tunnel_request: ChainTunnelRequest):
+    """Create a multi-hop pivot chain (one ssh process using ProxyJump)."""
+    return await _handle_tunnel_creation(
+        "chain", tunnel_manager.create_chain_tunnel,
+        tunnel_request.hops, tunnel_request.forward_type,
+        tunnel_request.local_port, tunnel_request.target_host,
+        tunnel_request.target_port, tunnel_request.ssh_user,
+        tunnel_request.execute, tunnel_request.transport,
     )
 
 
+@app.get("/api/transport-profiles")
+async def list_transport_profiles():
+    """SSH transport profiles selectable per tunnel, and the server default."""
+    return {"default": config.SSH_TRANSPORT_PROFILE or "default", "profiles": SSH_TRANSPORT_PROFILES}
+
+
+@app.post("/api/jump-hosts/probe")
+async def probe_jump_hosts(probe_request: JumpHostProbeRequest):
+    """Probe candidate jump hosts in parallel and rank them by SSH handshake latency."""
+    try:
+        results = await asyncio.to_thread(tunnel_manager.probe_jump_hosts, probe_request.candidates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": results, "selected": results[0]["host"] if results[0]["ok"] else None}
+
+
 @app.get("/api/tunnels")
-async def list_tunnels():
-    """List all tunnels."""
+async def list_tunnels(
+    request: Request,
+    status: Optional[str] = None,
+    tunnel_type: Optional[str] = Query(None, alias="type"),
+    q: Optional[str] = None,
+    sort: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+):
+    """List tunnels: all of them, or a filtered, sorted window (offset/limit) of them."""
+    etag = _revision_etag("tunnels", tunnel_manager.poll_revision())
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
     tunnels = tunnel_manager.list_tunnels()
-    return {"tunnels": tunnels}
+    if status or tunnel_type:
+        tunnels = [
+            t for t in tunnels
+            if (not status or t.get("status") == status) and (not tunnel_type or t.get("type") == tunnel_type)
+        ]
+    tunnels, total = _window(tunnels, _TUNNEL_SORTS, _TUNNEL_SEARCH_FIELDS, sort, q, offset, limit)
+    return FastJSONResponse({"tunnels": tunnels, "total": total, "offset": max(0, offset)}, headers=_etag_headers(etag))
+
+
+@app.get("/api/admission")
+async def get_admission_state():
+    """Tunnel slots in use, requests waiting for a slot or handshake, and counters."""
+    return tunnel_manager.admission.snapshot()
 
 
 @app.get("/api/tunnels/{tunnel_id}")
@@ -388,11 +940,379 @@ async def get_tunnel_metrics(tunnel_id: str):
 
 @app.get("/api/tunnels/{tunnel_id}/health")
 async def check_tunnel_health(tunnel_id: str):
-    """Check tunnel health."""
+    """Check tunnel health (with per-hop status for chain tunnels)."""
+    tunnel = tunnel_manager.get_tunnel(tunnel_id)
+    if tunnel and tunnel.get("type") == "chain":
+        return await asyncio.to_thread(tunnel_manager.check_chain_health, tunnel_id)
+    if tunnel and tunnel.get("type") in REMOTE_TUNNEL_TYPES:
+        # Remote bind verification may run ssh on the server
+        return await asyncio.to_thread(tunnel_manager.check_tunnel_health, tunnel_id)
     health = tunnel_manager.check_tunnel_health(tunnel_id)
     return health
 
 
+@app.get("/api/remote-binds")
+async def verify_remote_binds():
+    """Verify every active remote/remote_dynamic tunnel's server-side listener (one check per server)."""
+    results = await asyncio.to_thread(tunnel_manager.verify_remote_tunnels)
+    return FastJSONResponse({
+        "enabled": config.REMOTE_VERIFY_ENABLED,
+        "interval_s": tunnel_manager.remote_listeners.interval,
+        "tunnels": results,
+        "stats": dict(tunnel_manager.remote_listeners.stats),
+    })
+
+
+@app.post("/api/tunnels/{tunnel_id}/probe")
+async def probe_tunnel(tunnel_id: str):
+    """Probe a tunnel end-to-end now and return the RTT and rolling latency stats."""
+    tunnel = tunnel_manager.get_tunnel(tunnel_id)
+    if not tunnel:
+        raise HTTPException(status_code=404, detail="Tunnel not found")
+    prober = tunnel_prober or TunnelProber(tunnel_manager)
+    return await prober.probe_tunnel(tunnel)
+
+
+@app.get("/api/resources")
+async def get_resources():
+    """Latest CPU/RSS/fd sample of every active tunnel's process group."""
+    tunnel_manager.poll_revision()
+    return FastJSONResponse({
+        "available": PROC_AVAILABLE,
+        "enabled": config.RESOURCE_ENABLED and PROC_AVAILABLE,
+        "interval_s": config.RESOURCE_INTERVAL,
+        "thresholds": {
+            "cpu_percent": config.RESOURCE_CPU_PERCENT_MAX,
+            "rss_mb": config.RESOURCE_RSS_MAX_MB,
+            "fds": config.RESOURCE_FDS_MAX,
+        },
+        "tunnels": tunnel_manager.resource_snapshot(),
+    })
+
+
+@app.post("/api/tunnels/{tunnel_id}/benchmark")
+async def benchmark_tunnel(tunnel_id: str, bench_request: BenchmarkRequest):
+    """Push data through a tunnel to an echo/sink destination; report throughput, setup time and latency."""
+    tunnel = tunnel_manager.get_tunnel(tunnel_id)
+    if not tunnel:
+        raise HTTPException(status_code=404, detail="Tunnel not found")
+    if tunnel.get("type") not in ("static", "dynamic", "chain") or not tunnel.get("local_port"):
+        raise HTTPException(status_code=400, detail=f"Benchmarking not supported for {tunnel.get('type')} tunnels")
+    if tunnel.get("status") != "active":
+        raise HTTPException(status_code=409, detail="Tunnel is not active")
+
+    socks_dest = None
+    if tunnel.get("forward_type", tunnel["type"]) == "dynamic":
+        if not bench_request.target_host or not bench_request.target_port:
+            raise HTTPException(status_code=400, detail="target_host and target_port are required for dynamic tunnels")
+        socks_dest = (bench_request.target_host, bench_request.target_port)
+
+    try:
+        result = await asyncio.to_thread(
+            run_benchmark, tunnel["local_port"], socks_dest, bench_request.mode,
+            int(bench_request.megabytes * 1024 * 1024), bench_request.streams,
+            bench_request.connections, bench_request.pings,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BenchmarkError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    tunnel_manager.record_benchmark(tunnel_id, result)
+    return {"tunnel_id": tunnel_id, **result}
+
+
+@app.post("/api/benchmark/offline")
+async def offline_benchmark(bench_request: OfflineBenchmarkRequest):
+    """Benchmark the forwarding path against a local echo/sink server (direct, or ssh -L to this machine)."""
+    loop = asyncio.get_running_loop()
+    try:
+        # May create a tunnel, which can wait for admission
+        return await loop.run_in_executor(
+            tunnel_create_executor, bind(run_offline_benchmark),
+            tunnel_manager, bench_request.ssh_user, bench_request.ssh_host, bench_request.transport,
+            bench_request.mode, int(bench_request.megabytes * 1024 * 1024), bench_request.streams,
+            bench_request.connections, bench_request.pings,
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after))})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (BenchmarkError, RuntimeError) as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+def _proxychains_instructions(path: Optional[str] = None) -> Dict[str, str]:
+    return {
+        "linux": f"Kept up to date at {path}" if path else "Save as ~/.proxychains/proxychains.conf or /etc/proxychains4.conf",
+        "usage": "proxychains4 nmap -sT -Pn <target>",
+        "note": "Only TCP connect traffic is proxied (use -sT -Pn with nmap; no ICMP or SYN scans).",
+    }
+
+
+@app.post("/api/proxychains/generate")
+async def generate_proxychains_config(request: ProxychainsConfig):
+    """Generate a proxychains config from live dynamic tunnels, fastest healthy proxy first."""
+    extra = []
+    if request.proxy_host or request.proxy_port:
+        if not (request.proxy_host and request.proxy_port):
+            raise HTTPException(status_code=400, detail="proxy_host and proxy_port must be given together")
+        if request.proxy_type not in ("socks4", "socks5", "http"):
+            raise HTTPException(status_code=400, detail=f"Unknown proxy type: {request.proxy_type}")
+        try:
+            host = tunnel_manager._validate_input(request.proxy_host, "proxy host")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        extra.append({"proxy_type": request.proxy_type, "host": host, "port": request.proxy_port})
+
+    try:
+        result = await asyncio.to_thread(
+            proxychains.generate, tunnel_manager, request.chain_type,
+            request.max_proxies, request.include_unhealthy, extra,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not result["proxies"]:
+        raise HTTPException(status_code=409, detail="No healthy dynamic tunnel to build a proxy list from")
+
+    written_to = None
+    if request.write:
+        path = os.path.expanduser(config.PROXYCHAINS_OUTPUT_PATH)
+        try:
+            await asyncio.to_thread(proxychains.write_atomic, path, result["config"])
+        except OSError as e:
+            raise HTTPException(status_code=500, detail=f"Failed to write {path}: {e}")
+        written_to = path
+
+    return {**result, "written_to": written_to, "instructions": _proxychains_instructions(written_to)}
+
+
+def _start_proxychains_sync(**options):
+    global proxychains_writer, _proxychains_task
+    _stop_proxychains_sync()
+    proxychains_writer = proxychains.ProxychainsWriter(tunnel_manager, **options)
+    _proxychains_task = asyncio.create_task(proxychains_writer.run())
+
+
+def _stop_proxychains_sync():
+    global _proxychains_task
+    if _proxychains_task is not None:
+        _proxychains_task.cancel()
+        _proxychains_task = None
+
+
+@app.get("/api/proxychains/sync")
+async def get_proxychains_sync():
+    """Status of the proxychains file sync."""
+    if proxychains_writer is None:
+        return {"enabled": False, "path": os.path.expanduser(config.PROXYCHAINS_OUTPUT_PATH)}
+    return proxychains_writer.status()
+
+
+@app.post("/api/proxychains/sync")
+async def set_proxychains_sync(request: ProxychainsSyncRequest):
+    """Start or stop rewriting PROXYCHAINS_OUTPUT_PATH whenever the best proxies change."""
+    if not request.enabled:
+        _stop_proxychains_sync()
+        await asyncio.sleep(0)  # let the task observe cancellation
+        return await get_proxychains_sync()
+    if request.chain_type not in ("auto", *proxychains.CHAIN_TYPES):
+        raise HTTPException(status_code=400, detail=f"Unknown chain type: {request.chain_type}")
+    _start_proxychains_sync(
+        chain_type=request.chain_type,
+        max_proxies=request.max_proxies,
+        include_unhealthy=request.include_unhealthy,
+    )
+    await asyncio.sleep(0)
+    return proxychains_writer.status()
+
+
+def _get_socks_pool(pool_id: str) -> SocksPool:
+    pool = socks_pools.get(pool_id)
+    if pool is None:
+        raise HTTPException(status_code=404, detail="SOCKS pool not found")
+    return pool
+
+
+@app.post("/api/socks-pools")
+async def create_socks_pool(pool_request: SocksPoolRequest):
+    """Start a local SOCKS5 front end load-balancing over a pool of dynamic tunnels."""
+    try:
+        pool = SocksPool(tunnel_manager, executor=tunnel_create_executor, **pool_request.model_dump())
+        snapshot = await pool.start()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (RuntimeError, OSError) as e:
+        raise HTTPException(status_code=500, detail=f"Failed to start SOCKS pool: {str(e)}")
+    socks_pools[pool.id] = pool
+    await broadcast_tunnel_update({"type": "socks_pool_created", "pool_id": pool.id})
+    return {"success": True, "pool": snapshot}
+
+
+@app.get("/api/socks-pools")
+async def list_socks_pools():
+    """List SOCKS pools with per-member connection counts and health."""
+    return {"pools": [pool.snapshot() for pool in socks_pools.values()]}
+
+
+@app.get("/api/socks-pools/{pool_id}")
+async def get_socks_pool(pool_id: str):
+    """Get one SOCKS pool."""
+    return _get_socks_pool(pool_id).snapshot()
+
+
+@app.post("/api/socks-pools/{pool_id}/scale")
+async def scale_socks_pool(pool_id: str, scale_request: SocksPoolScaleRequest):
+    """Grow or shrink a SOCKS pool; retired members drain before their tunnel stops."""
+    pool = _get_socks_pool(pool_id)
+    try:
+        snapshot = await pool.scale(scale_request.size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await broadcast_tunnel_update({"type": "socks_pool_scaled", "pool_id": pool_id})
+    return {"success": True, "pool": snapshot}
+
+
+@app.delete("/api/socks-pools/{pool_id}")
+async def stop_socks_pool(pool_id: str):
+    """Stop a SOCKS pool and all of its member tunnels."""
+    pool = _get_socks_pool(pool_id)
+    await pool.stop()
+    socks_pools.pop(pool_id, None)
+    await broadcast_tunnel_update({"type": "socks_pool_stopped", "pool_id": pool_id})
+    return {"success": True, "message": "SOCKS pool stopped"}
+
+
+def _node_summary(snapshot: Dict) -> Dict:
+    """Node status without its tunnel list."""
+    return {k: v for k, v in snapshot.items() if k != "tunnels"}
+
+
+async def _refresh_nodes() -> List[Dict]:
+    """Fan out to all agents (cached per node) without blocking the event loop."""
+    if not node_pool:
+        return []
+    return await asyncio.to_thread(node_pool.refresh)
+
+
+@app.get("/api/nodes")
+async def list_nodes():
+    """List this instance and all agent nodes with their cached status."""
+    snapshots = await _refresh_nodes()
+    local = {
+        "name": config.LOCAL_NODE_NAME,
+        "url": None,
+        "online": True,
+        "stale": False,
+        "tunnel_count": len(tunnel_manager.list_tunnels()),
+    }
+    return {"nodes": [local] + [_node_summary(snapshot) for snapshot in snapshots]}
+
+
+@app.get("/api/nodes/tunnels")
+async def list_node_tunnels():
+    """Aggregate tunnels, health and metrics from this instance and every agent."""
+    tunnels = [{**tunnel, "node": config.LOCAL_NODE_NAME} for tunnel in tunnel_manager.list_tunnels()]
+    snapshots = await _refresh_nodes()
+    for snapshot in snapshots:
+        for tunnel in snapshot["tunnels"]:
+            tunnels.append({**tunnel, "node": snapshot["name"], "stale": snapshot["stale"]})
+    return {"tunnels": tunnels, "nodes": [_node_summary(snapshot) for snapshot in snapshots]}
+
+
+@app.api_route("/api/nodes/{node_name}/tunnels{path:path}", methods=["GET", "POST", "DELETE"])
+async def proxy_node_tunnels(node_name: str, path: str, request: Request):
+    """Forward a tunnel API call (/api/tunnels/...) to one agent node."""
+    node = node_pool.get(node_name)
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Unknown node: {node_name}")
+
+    body = await request.json() if request.method == "POST" else None
+    target = f"/api/tunnels{path}"
+    if request.url.query:
+        target = f"{target}?{request.url.query}"
+
+    try:
+        status, data = await asyncio.to_thread(node.request, request.method, target, body)
+    except AgentError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+    if request.method != "GET":
+        node.invalidate()
+        await broadcast_tunnel_update({"type": "node_tunnels_changed", "node": node_name})
+    return FastJSONResponse(data, status_code=status)
+
+
+def _require_profiling(request: Request):
+    """Admin profiling endpoints exist only with profiling enabled (and the token, if set)."""
+    if not config.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set MUDALETUNNEL_PROFILING=1)")
+    if config.PROFILE_TOKEN and not hmac.compare_digest(
+        request.headers.get(AGENT_TOKEN_HEADER, ""), config.PROFILE_TOKEN
+    ):
+        raise HTTPException(status_code=401, detail="Invalid profiling token")
+
+
+@app.get("/api/admin/profiling")
+async def get_profiling_stats(request: Request):
+    """Per-route request timings, recent slow requests and lock-wait stats."""
+    _require_profiling(request)
+    return {
+        "requests": request_timings.snapshot() if request_timings else None,
+        "locks": lock_stats(),
+        "profile_capture_running": sampling_profiler.busy,
+    }
+
+
+@app.get("/api/admin/profile")
+async def capture_profile(request: Request, seconds: float = 5.0, interval_ms: Optional[float] = None, format: str = "collapsed"):
+    """Sample all thread stacks for N seconds.
+
+    Returns collapsed stacks (one "frame;frame;frame count" line per stack)
+    for flamegraph.pl / speedscope, or format=json for the counts as well.
+    """
+    _require_profiling(request)
+    if not 0 < seconds <= config.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be in (0, {config.PROFILE_MAX_SECONDS}]")
+    if interval_ms is not None and interval_ms < 1:
+        raise HTTPException(status_code=400, detail="interval_ms must be at least 1")
+    try:
+        profile = await asyncio.to_thread(sampling_profiler.capture, seconds, interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "json":
+        return profile
+    return Response(content=profile["collapsed"] + "\n", media_type="text/plain")
+
+
+@app.get("/api/traces")
+async def list_traces(
+    min_duration_ms: float = 0.0,
+    name: Optional[str] = None,
+    errors_only: bool = False,
+    limit: int = 50,
+):
+    """Recent traces from the in-memory buffer, slowest first.
+
+    name filters on the root span (e.g. "POST /api/tunnels/static" or "scan.run").
+    """
+    if not tracer.enabled:
+        raise HTTPException(status_code=404, detail="Tracing is disabled")
+    limit = max(1, min(limit, 500))
+    return {
+        "tracing": tracer.status(),
+        "traces": tracer.traces(min_duration_ms, name, errors_only, limit),
+    }
+
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """All buffered spans of one trace, in start order."""
+    spans = tracer.get_trace(trace_id)
+    if not spans:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {"trace_id": trace_id, "spans": spans}
+
+
 @app.websocket("/ws/tunnels")
 async def websocket_tunnels(websocket: WebSocket):
     """WebSocket endpoint for real-time tunnel updates."""
@@ -402,7 +1322,7 @@ async def websocket_tunnels(websocket: WebSocket):
     try:
         # Send initial tunnel list
         tunnels = tunnel_manager.list_tunnels()
-        await websocket.send_json({
+        await send_json(websocket, {
             "type": "initial_state",
             "tunnels": tunnels
         })